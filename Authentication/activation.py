@@ -0,0 +1,52 @@
+# Authentication/activation.py
+
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+
+from .authentication import forget_users
+from credit_unions.tenancy import tenant_id_for_user
+
+User = get_user_model()
+
+
+def manageable_users(user):
+    """
+    Users `user` may list and (de)activate: everyone for superusers, otherwise the
+    non-staff members of their credit union (or only themselves without one), so a
+    union's admins cannot be locked out by one another.
+    """
+    if user.is_superuser:
+        return User.objects.all()
+    tenant_id = tenant_id_for_user(user)
+    if tenant_id is None:
+        users = User.objects.filter(pk=user.pk)
+    else:
+        users = User.objects.filter(profile__credit_union_id=tenant_id)
+    return users.filter(is_staff=False, is_superuser=False)
+
+
+def set_users_active(users, ids, is_active):
+    """
+    Activates or deactivates the users of `users` whose id is in `ids` with a single
+    UPDATE; users already in that state are left untouched. Their cached JWT
+    users (Authentication/authentication.py) are dropped, since update() sends no signals.
+    Returns {'updated': [ids], 'unchanged': [ids], 'not_found': [ids]}.
+    """
+    ids = list(dict.fromkeys(ids))
+    using = router.db_for_write(User)
+
+    with transaction.atomic(using=using):
+        rows = list(users.using(using).select_for_update().filter(pk__in=ids).values_list('pk', 'is_active'))
+        to_update = [pk for pk, current in rows if current != is_active]
+        found = {pk for pk, _ in rows}
+        if to_update:
+            User.objects.using(using).filter(pk__in=to_update).update(is_active=is_active)
+            forget_users(*to_update)
+            transaction.on_commit(lambda: forget_users(*to_update), using=using)
+
+    updated = set(to_update)
+    return {
+        'updated': to_update,
+        'unchanged': [pk for pk in ids if pk in found and pk not in updated],
+        'not_found': [pk for pk in ids if pk not in found],
+    }
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Authentication'
+
+    def ready(self):
+        # Registers the signal receivers (JWT user cache invalidation)
+        from . import signals  # noqa: F401
@@ -0,0 +1,152 @@
+# Authentication/authentication.py
+"""
+JWT authentication without a User query per request.
+
+CachedJWTAuthentication (the default DRF authentication class) validates the
+token as JWTAuthentication does, then takes the user from a small in-process
+cache keyed by the token's user id. Entries live AUTH_USER_CACHE_SECONDS and
+are dropped as soon as the user is saved or deleted, or their groups or
+permissions change in this process (Authentication/signals.py), e.g. when
+ActivateUserView toggles is_active. Other workers notice within the TTL.
+
+The cache keeps field values, not User objects: each request gets its own
+instance, so nothing set on request.user leaks into another request.
+
+Tokens carry the user's credit union as a signed claim (Authentication/serializers.py):
+it becomes the request's tenant without a UserProfile query per request, as long as the
+claimed profile_version is still the user's (cached, bumped when the user moves)
+and the claimed tenant_version is still the union's policy_version.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from credit_unions.tenancy import (
+    PROFILE_VERSION_CLAIM,
+    TENANT_CLAIM,
+    TENANT_VERSION_CLAIM,
+    tenant_policy_version,
+    user_tenant_claims,
+)
+
+# Defaults, overridable in settings.py
+DEFAULT_AUTH_USER_CACHE_SECONDS = 60
+# Users kept per process; the least recently used ones are dropped
+MAX_CACHED_USERS = 10000
+
+
+class UserCache:
+    """
+    user id -> (field values, expiry), behind one lock.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_model, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            values, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        field_names = [field.attname for field in user_model._meta.concrete_fields]
+        return user_model.from_db(None, field_names, values)
+
+    def put(self, user_id, user):
+        ttl = getattr(settings, 'AUTH_USER_CACHE_SECONDS', DEFAULT_AUTH_USER_CACHE_SECONDS)
+        if not ttl:
+            return
+        values = tuple(getattr(user, field.attname) for field in user._meta.concrete_fields)
+        with self._lock:
+            self._entries[user_id] = (values, time.monotonic() + ttl)
+            self._entries.move_to_end(user_id)
+            if len(self._entries) > MAX_CACHED_USERS:
+                self._entries.popitem(last=False)
+
+    def forget(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def forget_users(*user_ids):
+    """
+    Drops cached users; call after changing users with update()/bulk_update(),
+    which send no signals.
+    """
+    user_cache.forget(*user_ids)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication whose user lookup is served from user_cache when possible.
+    The is_active and password-change (CHECK_REVOKE_TOKEN) checks still run on
+    every request, against the cached values.
+    """
+
+    def get_user(self, validated_token):
+        user = self.get_cached_user(validated_token)
+        self.apply_tenant_claims(user, validated_token)
+        return user
+
+    def get_cached_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            # Raises InvalidToken
+            return super().get_user(validated_token)
+
+        user_id = str(user_id)
+        user = user_cache.get(self.user_model, user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.put(user_id, user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    def apply_tenant_claims(self, user, validated_token):
+        """
+        Sets the claimed credit union as the user's tenant (read by tenant_id_for_user).
+        Tokens issued before the claims existed fall back to the profile lookup.
+        """
+        if TENANT_CLAIM not in validated_token:
+            return
+        credit_union_id = validated_token[TENANT_CLAIM]
+        # The user was moved since the token was issued (tokens older than the profile_version claim count as version 1)
+        claimed = (credit_union_id, validated_token.get(PROFILE_VERSION_CLAIM, 1))
+        stale = claimed != user_tenant_claims(user.pk)
+        if stale:
+            # This worker may still cache the claims from before the move: a freshly
+            # refreshed token must not be refused until the entry expires
+            stale = claimed != user_tenant_claims(user.pk, refresh=True)
+        # ... or the whole union's tokens were expired (policy_version bumped)
+        if not stale and credit_union_id is not None:
+            stale = validated_token.get(TENANT_VERSION_CLAIM) != tenant_policy_version(credit_union_id)
+        if stale:
+            raise AuthenticationFailed(_("The credit union claims are out of date; refresh the token."), code="tenant_claims_stale")
+        user._tenant_id = credit_union_id
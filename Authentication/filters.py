@@ -0,0 +1,18 @@
+# Authentication/filters.py
+
+import django_filters
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class UserAdminFilter(django_filters.FilterSet):
+    """
+    Filters of the user-admin listing (allusers/): credit_union=<id>, is_active=true|false.
+    """
+    credit_union = django_filters.NumberFilter(field_name='profile__credit_union_id')
+    is_active = django_filters.BooleanFilter()
+
+    class Meta:
+        model = User
+        fields = []
@@ -0,0 +1,61 @@
+# Authentication/hashing.py
+"""
+Password hashing on a process pool, for bulk provisioning (Authentication/provisioning.py).
+PBKDF2 is CPU-bound, so threads would not help. This module imports no models:
+spawned workers import it before Django is set up.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# Defaults, overridable in settings.py
+DEFAULT_PASSWORD_HASH_PROCESSES = None  # os.cpu_count()
+# Below this many passwords the pool's start-up costs more than it saves
+MIN_PARALLEL_PASSWORDS = 8
+
+_hash_pool = None
+
+
+def _init_worker():
+    # Spawned workers start with a fresh interpreter (DJANGO_SETTINGS_MODULE is inherited)
+    if not apps.ready:
+        django.setup()
+
+
+def _processes():
+    return getattr(settings, 'PASSWORD_HASH_PROCESSES', DEFAULT_PASSWORD_HASH_PROCESSES) or os.cpu_count() or 1
+
+
+def hash_pool():
+    """
+    The process-wide pool hashing passwords, created on first use. Workers are
+    spawned rather than forked: forking a threaded web server process is unsafe.
+    """
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=_processes(),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+        )
+    return _hash_pool
+
+
+def hash_passwords(passwords):
+    """
+    make_password() of every password (None -> unusable), in parallel when worth it.
+    """
+    to_hash = [password for password in passwords if password]
+    processes = _processes()
+    if processes > 1 and len(to_hash) >= MIN_PARALLEL_PASSWORDS:
+        chunksize = max(1, len(to_hash) // (processes * 4))
+        hashed = iter(list(hash_pool().map(make_password, to_hash, chunksize=chunksize)))
+    else:
+        hashed = iter([make_password(password) for password in to_hash])
+    return [next(hashed) if password else make_password(None) for password in passwords]
@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from Authentication.serializers import users_with_email
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the email lookup of login and registration as auth_user grows. The users "
+        "are created inside a transaction that is rolled back, so nothing is kept. Password "
+        "hashing, the constant part of a login, is left out."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="Users in the table for each run.")
+        parser.add_argument('--lookups', type=int, default=200, help="Lookups timed per run.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                created = 0
+                for size in sorted(options['sizes']):
+                    User.objects.bulk_create(
+                        [User(username=f'bench-login-{n}', email=f'Bench.Login.{n}@Example.com', password='!') for n in range(created, size)],
+                        batch_size=1000,
+                    )
+                    created = max(created, size)
+                    self.report(created, options['lookups'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def report(self, size, lookups):
+        timings = []
+        for n in range(lookups):
+            # Spread over the table, and in another case than stored
+            email = f'bench.login.{(n * 7919) % size}@example.com'
+            started = time.perf_counter()
+            list(users_with_email(email).values_list('username', flat=True)[:2])
+            timings.append((time.perf_counter() - started) * 1000)
+
+        plan = users_with_email('someone@example.com').explain()
+        index_used = 'auth_user_email_lower_idx' in plan
+        timings.sort()
+        self.stdout.write(
+            f"{size:>8} users  median {statistics.median(timings):.3f} ms  "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms  "
+            f"index {'used' if index_used else 'NOT used'} ({connection.vendor})"
+        )
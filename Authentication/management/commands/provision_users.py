@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Authentication.provisioning import provision_users, read_csv_rows
+from credit_unions.models import CreditUnion
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates user accounts and their profiles from a CSV file with the columns "
+        "username,email,password and optionally credit_union_id,first_name,last_name. "
+        "Passwords are hashed on a process pool (PASSWORD_HASH_PROCESSES) and rows inserted in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the .csv file.")
+        parser.add_argument('--credit-union-id', type=int, default=None, help="Credit union of every row (overrides the column).")
+        parser.add_argument('--batch-size', type=int, default=None, help="Users per multi-row INSERT (default: 500).")
+
+    def handle(self, *args, **options):
+        credit_union_id = options['credit_union_id']
+        if credit_union_id is not None and not CreditUnion.objects.filter(pk=credit_union_id).exists():
+            raise CommandError(f"Credit union {credit_union_id} does not exist.")
+
+        with open(options['path'], newline='', encoding='utf-8-sig') as handle:
+            rows = read_csv_rows(handle)
+
+        started = time.perf_counter()
+        result = provision_users(rows, credit_union_id=credit_union_id, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        for index, errors in sorted(result['errors'].items()):
+            # +2: the header is line 1
+            self.stderr.write(f"Line {index + 2}: {errors}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(result['created'])} user(s) in {elapsed:.1f}s; {len(result['errors'])} row(s) rejected."
+        ))
@@ -0,0 +1,187 @@
+# Authentication/provisioning.py
+"""
+Bulk creation of user accounts (e.g. a new credit union's officers) from CSV rows:
+
+    username,email,password,credit_union_id,first_name,last_name
+
+Rows are validated together (a handful of queries for the whole file instead of
+RegisterSerializer's per-row UniqueValidator lookups), passwords are hashed on a
+process pool (Authentication/hashing.py) since PBKDF2 is CPU-bound and dominates
+the cost, then User and UserProfile rows are inserted with bulk_create in batches.
+Invalid rows are reported with their errors and skipped; the others are created.
+
+A blank password creates the account with an unusable password (the officer
+sets one through a password reset).
+"""
+
+import csv
+import io
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, password_validation
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, router, transaction
+from django.db.models.functions import Lower
+
+from .hashing import hash_passwords
+from credit_unions.models import CreditUnion, UserProfile
+from credit_unions.tenancy import tenant_scope
+from loan_appraiser_project.response_cache import invalidate
+
+User = get_user_model()
+
+# Defaults, overridable in settings.py
+DEFAULT_PROVISION_BATCH_SIZE = 500
+OPTIONAL_COLUMNS = ('first_name', 'last_name')
+
+
+def read_csv_rows(handle):
+    """
+    Rows of a CSV file (text or binary handle) as dicts with stripped values.
+    """
+    if isinstance(handle.read(0), bytes):
+        handle = io.StringIO(handle.read().decode('utf-8-sig'), newline='')
+    return [
+        {(key or '').strip(): (value or '').strip() for key, value in row.items()}
+        for row in csv.DictReader(handle)
+    ]
+
+
+def _validate_rows(rows, credit_union_id):
+    """
+    Returns ([(row_index, unsaved User, credit_union_id, password)], {row_index: errors}).
+    """
+    errors = {}
+    candidates = []
+    for index, row in enumerate(rows):
+        row_errors = {}
+        username = row.get('username', '')
+        email = row.get('email', '')
+        try:
+            if not username:
+                raise ValidationError("This field is required.")
+            User.username_validator(username)
+        except ValidationError as exc:
+            row_errors['username'] = exc.messages
+        try:
+            if not email:
+                raise ValidationError("This field is required.")
+            validate_email(email)
+        except ValidationError as exc:
+            row_errors['email'] = exc.messages
+
+        row_credit_union_id = credit_union_id
+        if credit_union_id is None and row.get('credit_union_id'):
+            if row['credit_union_id'].isdigit():
+                row_credit_union_id = int(row['credit_union_id'])
+            else:
+                row_errors['credit_union_id'] = ["A valid integer is required."]
+
+        user = User(
+            username=username,
+            email=User.objects.normalize_email(email),
+            **{column: row.get(column, '') for column in OPTIONAL_COLUMNS},
+        )
+        password = row.get('password') or None
+        if password and not row_errors:
+            try:
+                password_validation.validate_password(password, user)
+            except ValidationError as exc:
+                row_errors['password'] = exc.messages
+
+        if row_errors:
+            errors[index] = row_errors
+        else:
+            candidates.append((index, user, row_credit_union_id, password))
+
+    # Uniqueness for the whole file: one query per column, plus duplicates inside the file
+    usernames = {user.username for _, user, _, _ in candidates}
+    emails = {user.email.lower() for _, user, _, _ in candidates}
+    taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    # LOWER(email) IN (...), served by auth_user_email_lower_idx
+    taken_emails = set(
+        User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=emails).values_list('email_lower', flat=True)
+    )
+    known_credit_unions = set(
+        CreditUnion.objects.filter(pk__in={pk for _, _, pk, _ in candidates if pk is not None}).values_list('pk', flat=True)
+    )
+
+    valid = []
+    for index, user, row_credit_union_id, password in candidates:
+        row_errors = {}
+        if user.username in taken_usernames:
+            row_errors['username'] = ["This username is already used"]
+        if user.email.lower() in taken_emails:
+            row_errors['email'] = ["This email is already used"]
+        if row_credit_union_id is not None and row_credit_union_id not in known_credit_unions:
+            row_errors['credit_union_id'] = [f"Credit union {row_credit_union_id} does not exist."]
+        if row_errors:
+            errors[index] = row_errors
+            continue
+        taken_usernames.add(user.username)
+        taken_emails.add(user.email.lower())
+        valid.append((index, user, row_credit_union_id, password))
+    return valid, errors
+
+
+def _insert_batch(batch, using):
+    """
+    Inserts one batch of (row_index, User, credit_union_id); returns the row indexes
+    refused by the database (e.g. a username registered meanwhile).
+    """
+    try:
+        with transaction.atomic(using=using):
+            User.objects.using(using).bulk_create([user for _, user, _ in batch])
+            if any(user.pk is None for _, user, _ in batch):
+                # Backends without INSERT ... RETURNING (MySQL) leave pk unset
+                ids = dict(User.objects.using(using).filter(username__in=[user.username for _, user, _ in batch]).values_list('username', 'pk'))
+                for _, user, _ in batch:
+                    user.pk = ids[user.username]
+            UserProfile.objects.using(using).bulk_create(
+                [UserProfile(user_id=user.pk, credit_union_id=credit_union_id) for _, user, credit_union_id in batch]
+            )
+        return []
+    except IntegrityError:
+        if len(batch) == 1:
+            batch[0][1].pk = None
+            return [batch[0][0]]
+    # Find the offending rows one by one
+    refused = []
+    for row in batch:
+        row[1].pk = None
+        refused += _insert_batch([row], using)
+    return refused
+
+
+def provision_users(rows, credit_union_id=None, batch_size=None):
+    """
+    Creates the users described by `rows` (dicts with username, email, password and
+    optionally credit_union_id, first_name, last_name), each with a UserProfile.
+    `credit_union_id` overrides the rows' own column.
+
+    Returns {'created': [(row_index, user), ...], 'errors': {row_index: {field: [messages]}}}.
+    """
+    rows = list(rows)
+    batch_size = batch_size or getattr(settings, 'PROVISION_BATCH_SIZE', DEFAULT_PROVISION_BATCH_SIZE)
+    valid, errors = _validate_rows(rows, credit_union_id)
+
+    for (_, user, _, _), password_hash in zip(valid, hash_passwords([password for _, _, _, password in valid])):
+        user.password = password_hash
+
+    using = router.db_for_write(User)
+    created = []
+    for start in range(0, len(valid), batch_size):
+        batch = [(index, user, row_credit_union_id) for index, user, row_credit_union_id, _ in valid[start:start + batch_size]]
+        refused = set(_insert_batch(batch, using))
+        for index, user, _ in batch:
+            if index in refused:
+                errors[index] = {'username': ["This username or email was registered meanwhile."]}
+            else:
+                created.append((index, user))
+
+    # bulk_create sends no signals: refresh the cached profile listings here
+    if created:
+        credit_union_ids = {row_credit_union_id for index, _, row_credit_union_id, _ in valid if index not in errors}
+        invalidate('all', *(tenant_scope(pk) for pk in credit_union_ids), using=router.db_for_write(UserProfile))
+    return {'created': created, 'errors': errors}
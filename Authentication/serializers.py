@@ -3,11 +3,25 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 # from django.contrib.auth.models import User
 from rest_framework.validators import UniqueValidator
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.exceptions import AuthenticationFailed
 from credit_unions.serializers import CreditUnionSerializer
 from credit_unions.models import CreditUnion, UserProfile
+from credit_unions.tenancy import TENANT_CLAIM, tenant_claims_for_user, tenant_id_for_user
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
 User = get_user_model()
+
+
+def users_with_email(email):
+    """
+    Users whose email matches `email` case-insensitively, as LOWER(email) = ... so
+    the auth_user_email_lower_idx index (Authentication/migrations/0001) serves it.
+    """
+    return User.objects.filter(Exact(Lower('email'), email.strip().lower()))
+
 class RegisterSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
         required=True,
@@ -16,12 +30,8 @@ class RegisterSerializer(serializers.ModelSerializer):
         )]
     )
 
-    email = serializers.EmailField(
-        required=True,
-        validators=[UniqueValidator(queryset=User.objects.all(),
-        message="This email is already used"
-        )]
-    )
+    # Uniqueness is case-insensitive and checked through the LOWER(email) index (validate_email)
+    email = serializers.EmailField(required=True)
 
     # A write-only field for password, so it's not included in read operations.
     password = serializers.CharField(
@@ -40,6 +50,11 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id','username', 'email', 'password', 'credit_union_id')
 
+    def validate_email(self, value):
+        if users_with_email(value).exists():
+            raise serializers.ValidationError("This email is already used")
+        return value
+
     def create(self, validated_data):
         profile_data = validated_data.pop('profile', {})
         credit_union_instance = profile_data.get('credit_union') # Get the CreditUnion instance or None
@@ -69,6 +84,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_token(cls, user):
         token = super().get_token(user)
         token['username'] = user.username
+        # NEW: Signed tenant claims, so requests never look the profile up (copied into the access token)
+        claims = tenant_claims_for_user(user)
+        for claim, value in claims.items():
+            token[claim] = value
+        user._tenant_id = claims[TENANT_CLAIM]
         return token
 
     def validate(self, attrs):
@@ -81,12 +101,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             )
 
         if '@' in username:
-            try:
-                user = User.objects.get(email=username)
-            except User.DoesNotExist:
-                pass # Let the default authentication handle invalid credentials
-            else:
-                attrs[self.username_field] = user.username
+            # Indexed, case-insensitive; an email shared by several accounts resolves to none of them
+            usernames = list(users_with_email(username).values_list('username', flat=True)[:2])
+            if len(usernames) == 1:
+                attrs[self.username_field] = usernames[0]
+            # Otherwise let the default authentication handle invalid credentials
         
         
         try:
@@ -96,21 +115,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
                 "detail": "Bien vouloir verifier votre nom ou email et mot de passe."
             })
             
-        # Initialize variables
-        authenticated_user = self.user
-        credit_union_id = None
+        # The credit union was read once for the token claims (get_token)
+        credit_union_id = tenant_id_for_user(self.user)
         credit_union_name = None
-
-        try:
-            # Access the UserProfile using the related_name='profile'
-            user_profile = authenticated_user.profile
-            if user_profile.credit_union:
-                # Access the CreditUnion object
-                credit_union_id = user_profile.credit_union.id
-                credit_union_name = user_profile.credit_union.name
-        except UserProfile.DoesNotExist:
-            # The user might not have a profile, set to None
-            pass 
+        if credit_union_id is not None:
+            credit_union_name = CreditUnion.objects.filter(pk=credit_union_id).values_list('name', flat=True).first()
 
         # Update the response data with user and credit union info
         data.update({
@@ -134,14 +143,66 @@ class UserInfoSerializer(serializers.ModelSerializer):
 
     def get_credit_union(self, user):
         """
-        Retrieves the CreditUnion data via the user's profile and serializes it.
+        Retrieves the user's CreditUnion (the token's claim, else the profile) and serializes it.
         """
+        credit_union_id = tenant_id_for_user(user)
+        if credit_union_id is None:
+            return None
+        cu = CreditUnion.objects.filter(pk=credit_union_id).first()
+        if cu:
+            # Use your CreditUnionSerializer to serialize the object
+            return CreditUnionSerializer(cu).data
+        return None
+
+
+class TenantRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry tenant claims read from the database
+    at refresh time, not the ones copied from login, so a moved user or a bumped
+    policy_version is picked up by the next refresh.
+    """
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = User(pk=self.payload.get(api_settings.USER_ID_CLAIM))
+        for claim, value in tenant_claims_for_user(user).items():
+            access[claim] = value
+        return access
+
+
+class TenantTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER']: revalidates the tenant claims on every refresh.
+    """
+    token_class = TenantRefreshToken
+
+
+class UserAdminSerializer(serializers.ModelSerializer):
+    """
+    Read-only row of the user-admin listing; expects users loaded with
+    select_related('profile__credit_union').
+    """
+    credit_union = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'email', 'is_active', 'is_staff', 'date_joined', 'last_login', 'credit_union')
+        read_only_fields = fields
+
+    def get_credit_union(self, user):
         try:
-            # Access the profile model (related_name='profile') and then the credit_union field
             cu = user.profile.credit_union
-            if cu:
-                # Use your CreditUnionSerializer to serialize the object
-                return CreditUnionSerializer(cu).data
-            return None
         except UserProfile.DoesNotExist:
             return None
+        if cu is None:
+            return None
+        return {'id': cu.id, 'name': cu.name}
+
+
+class UserActivationSerializer(serializers.Serializer):
+    """
+    Input of the bulk activation endpoint (users/activation/).
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    is_active = serializers.BooleanField()
@@ -0,0 +1,36 @@
+# Authentication/signals.py
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_users, user_cache
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user(sender, instance, raw=False, **kwargs):
+    """
+    Drops the user from the JWT user cache now and again after commit, so a
+    request authenticating in between cannot keep the old row cached.
+    """
+    if raw:
+        return
+    forget_users(instance.pk)
+    transaction.on_commit(lambda: forget_users(instance.pk), using=instance._state.db)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def forget_cached_user_on_access_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    # Changed from the group/permission side, `instance` is the group and pk_set the users (None on clear)
+    if not reverse:
+        user_ids = [instance.pk]
+    elif pk_set:
+        user_ids = list(pk_set)
+    else:
+        user_cache.clear()
+        return
+    forget_users(*user_ids)
@@ -1,3 +1,276 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .authentication import user_cache
+from credit_unions.models import CreditUnion, UserProfile
+from credit_unions.tenancy import bump_tenant_policy_version
+
+PASSWORD = 'S3cure-pass'
+
+
+class AuthenticationTestCase(TestCase):
+    """
+    Two credit unions with members; tokens are obtained through login/.
+    """
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.credit_union = CreditUnion.objects.create(name='First Union')
+        self.other_credit_union = CreditUnion.objects.create(name='Second Union')
+
+    def create_user(self, username, credit_union=None, **extra):
+        user = User.objects.create_user(username, f'{username}@example.com', PASSWORD, **extra)
+        if credit_union is not None:
+            UserProfile.objects.create(user=user, credit_union=credit_union)
+        return user
+
+    def login(self, username):
+        response = APIClient().post('/api/auth/login/', {'username': username, 'password': PASSWORD}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def get(self, access, path='/api/calculator/all-loan/'):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client.get(path)
+
+
+class TenantClaimTests(AuthenticationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mover = self.create_user('mover', self.credit_union)
+        self.colleague = self.create_user('colleague', self.credit_union)
+        self.newcomer_colleague = self.create_user('newcolleague', self.other_credit_union)
+
+    def test_login_returns_the_credit_union(self):
+        tokens = self.login('mover')
+        self.assertEqual(tokens['credit_union_id'], self.credit_union.pk)
+        self.assertEqual(self.get(tokens['access']).status_code, 200)
+
+    def test_moving_a_user_only_expires_their_tokens(self):
+        mover, colleague, newcomer_colleague = self.login('mover'), self.login('colleague'), self.login('newcolleague')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = UserProfile.objects.get(user=self.mover)
+            profile.credit_union = self.other_credit_union
+            profile.save()
+
+        response = self.get(mover['access'])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'].code, 'tenant_claims_stale')
+        self.assertEqual(self.get(colleague['access']).status_code, 200)
+        self.assertEqual(self.get(newcomer_colleague['access']).status_code, 200)
+
+        refreshed = APIClient().post('/api/auth/token/refresh/', {'refresh': mover['refresh']}, format='json')
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(self.get(refreshed.data['access']).status_code, 200)
+
+    def test_moving_back_does_not_revive_old_tokens(self):
+        old = self.login('mover')
+        profile = UserProfile.objects.get(user=self.mover)
+        for credit_union in (self.other_credit_union, self.credit_union):
+            with self.captureOnCommitCallbacks(execute=True):
+                profile.credit_union = credit_union
+                profile.save()
+        self.assertEqual(self.get(old['access']).status_code, 401)
+
+    def test_removed_profile_expires_tokens(self):
+        tokens = self.login('mover')
+        with self.captureOnCommitCallbacks(execute=True):
+            UserProfile.objects.filter(user=self.mover).get().delete()
+        self.assertEqual(self.get(tokens['access']).status_code, 401)
+
+    def test_policy_version_bump_expires_the_union(self):
+        mover, newcomer_colleague = self.login('mover'), self.login('newcolleague')
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_tenant_policy_version(self.credit_union.pk)
+        self.assertEqual(self.get(mover['access']).status_code, 401)
+        self.assertEqual(self.get(newcomer_colleague['access']).status_code, 200)
+
+
+class UserActivationTests(AuthenticationTestCase):
+    url = '/api/auth/users/activation/'
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user('admin', self.credit_union, is_staff=True)
+        self.other_admin = self.create_user('otheradmin', self.credit_union, is_staff=True)
+        self.member = self.create_user('member', self.credit_union)
+        self.outsider = self.create_user('outsider', self.other_credit_union)
+
+    def post(self, user, ids, is_active=False):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(self.url, {'ids': ids, 'is_active': is_active}, format='json')
+
+    def test_plain_member_gets_403(self):
+        response = self.post(self.member, [self.admin.pk, self.other_admin.pk])
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+
+    def test_staff_cannot_deactivate_other_staff_or_other_unions(self):
+        response = self.post(self.admin, [self.member.pk, self.other_admin.pk, self.outsider.pk])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], [self.member.pk])
+        self.assertEqual(response.data['not_found'], [self.other_admin.pk, self.outsider.pk])
+        self.assertFalse(User.objects.get(pk=self.member.pk).is_active)
+        self.assertTrue(User.objects.get(pk=self.other_admin.pk).is_active)
+
+    def test_deactivated_user_is_refused_at_once(self):
+        access = self.login('member')['access']
+        self.assertEqual(self.get(access).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(self.admin, [self.member.pk])
+        self.assertEqual(self.get(access).status_code, 401)
+
+    def test_superuser_manages_everyone(self):
+        root = self.create_user('root', is_staff=True, is_superuser=True)
+        response = self.post(root, [self.admin.pk, self.outsider.pk])
+        self.assertEqual(response.data['updated'], [self.admin.pk, self.outsider.pk])
+
+    def test_listing_is_limited_to_manageable_users(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/auth/allusers/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user['username'] for user in response.data['results']], ['member'])
+
+    def test_members_cannot_list_users(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        self.assertEqual(client.get('/api/auth/allusers/').status_code, 403)
+
+    def toggle(self, user, pk):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.delete(f'/api/auth/activate/{pk}/')
+
+    def test_single_toggle_follows_the_same_rules(self):
+        self.assertEqual(self.toggle(self.member, self.admin.pk).status_code, 403)
+        for pk in (self.other_admin.pk, self.outsider.pk, 0):
+            with self.subTest(pk=pk):
+                self.assertEqual(self.toggle(self.admin, pk).status_code, 404)
+        self.assertTrue(User.objects.get(pk=self.other_admin.pk).is_active)
+
+        self.assertEqual(self.toggle(self.admin, self.member.pk).status_code, 204)
+        self.assertFalse(User.objects.get(pk=self.member.pk).is_active)
+        self.assertEqual(self.toggle(self.admin, self.member.pk).status_code, 204)
+        self.assertTrue(User.objects.get(pk=self.member.pk).is_active)
+
+
+class UserCacheTests(AuthenticationTestCase):
+
+    def test_authenticated_user_is_cached(self):
+        member = self.create_user('member', self.credit_union)
+        access = self.login('member')['access']
+        self.assertIsNone(user_cache.get(User, str(member.pk)))
+        self.assertEqual(self.get(access).status_code, 200)
+        self.assertEqual(user_cache.get(User, str(member.pk)).username, 'member')
+
+    def test_saved_user_is_reread(self):
+        member = self.create_user('member', self.credit_union)
+        access = self.login('member')['access']
+        self.assertEqual(self.get(access).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            member.is_active = False
+            member.save()
+        self.assertEqual(self.get(access).status_code, 401)
+
+
+class LoginTests(AuthenticationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member', self.credit_union)
+        self.member.email = 'Member@Example.com'
+        self.member.save()
+
+    def test_login_with_email_ignores_case(self):
+        response = APIClient().post('/api/auth/login/', {'username': 'MEMBER@example.COM', 'password': PASSWORD}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'member')
+        self.assertEqual(response.data['credit_union_name'], 'First Union')
+
+    def test_shared_email_logs_nobody_in(self):
+        self.create_user('twin')
+        User.objects.filter(username='twin').update(email='member@example.com')
+        response = APIClient().post('/api/auth/login/', {'username': 'member@example.com', 'password': PASSWORD}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_wrong_password(self):
+        response = APIClient().post('/api/auth/login/', {'username': 'member', 'password': 'nope'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_register_refuses_an_email_in_another_case(self):
+        client = APIClient()
+        response = client.post('/api/auth/register/', {
+            'username': 'newcomer', 'email': 'MEMBER@example.com', 'password': PASSWORD,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.data)
+
+        response = client.post('/api/auth/register/', {
+            'username': 'newcomer', 'email': 'newcomer@example.com', 'password': PASSWORD,
+            'credit_union_id': self.other_credit_union.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.login('newcomer')['credit_union_id'], self.other_credit_union.pk)
+
+
+class UserProvisioningTests(AuthenticationTestCase):
+    url = '/api/auth/users/provision/'
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user('admin', self.credit_union, is_staff=True)
+        self.create_user('taken', self.credit_union)
+
+    def upload(self, user, text):
+        client = APIClient()
+        client.force_authenticate(user)
+        upload = SimpleUploadedFile('users.csv', text.encode('utf-8'), content_type='text/csv')
+        return client.post(self.url, {'file': upload}, format='multipart')
+
+    def test_valid_rows_are_created_and_bad_ones_reported(self):
+        response = self.upload(self.admin, (
+            'username,email,password,credit_union_id,first_name\n'
+            f'alice,alice@example.com,{PASSWORD},{self.other_credit_union.pk},Alice\n'
+            f'taken,new@example.com,{PASSWORD},,\n'
+            f'bob,TAKEN@example.com,{PASSWORD},,\n'
+            'carol,not-an-email,,,\n'
+            'dave,dave@example.com,,,\n'
+        ))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['username'] for row in response.data['created']], ['alice', 'dave'])
+        self.assertEqual({row['line']: sorted(row['errors']) for row in response.data['errors']}, {
+            3: ['username'], 4: ['email'], 5: ['email'],
+        })
+
+        alice = User.objects.get(username='alice')
+        self.assertEqual(alice.first_name, 'Alice')
+        # Staff provision into their own credit union, whatever the file says
+        self.assertEqual(alice.profile.credit_union, self.credit_union)
+        self.assertEqual(self.login('alice')['credit_union_id'], self.credit_union.pk)
+        self.assertFalse(User.objects.get(username='dave').has_usable_password())
+
+    def test_superuser_uses_the_files_credit_union(self):
+        root = self.create_user('root', is_staff=True, is_superuser=True)
+        response = self.upload(root, f'username,email,password,credit_union_id\nalice,alice@example.com,{PASSWORD},{self.other_credit_union.pk}\n')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(User.objects.get(username='alice').profile.credit_union, self.other_credit_union)
+
+    def test_members_cannot_provision(self):
+        member = self.create_user('member', self.credit_union)
+        response = self.upload(member, f'username,email,password\nalice,alice@example.com,{PASSWORD}\n')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(User.objects.filter(username='alice').exists())
+
+    def test_nothing_valid_is_a_400(self):
+        response = self.upload(self.admin, 'username,email,password\ntaken,taken2@example.com,\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], [])
@@ -1,7 +1,7 @@
 # users/urls.py
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView
-from .views import RegisterView, LoginView, LogoutView, UserProfileView, UsersManagement, ActivateUserView # Import the new LoginView
+from .views import RegisterView, LoginView, LogoutView, UserProfileView, UsersManagement, ActivateUserView, UserActivationView, UserProvisioningView # Import the new LoginView
 
 # Define the URL patterns for the users app.
 urlpatterns = [
@@ -12,4 +12,6 @@ urlpatterns = [
     path('logout/', LogoutView.as_view(), name='logout'),
     path('update-profile/', UserProfileView.as_view(), name='update-profile'),
     path('activate/<int:pk>/', ActivateUserView.as_view(), name='activate-user'),
+    path('users/activation/', UserActivationView.as_view(), name='users-activation'),
+    path('users/provision/', UserProvisioningView.as_view(), name='users-provision'),
 ]
\ No newline at end of file
@@ -4,7 +4,15 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth.models import User
-from .serializers import RegisterSerializer, UserInfoSerializer, CustomTokenObtainPairSerializer
+from django.conf import settings
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.permissions import IsAdminUser
+from .serializers import RegisterSerializer, UserInfoSerializer, CustomTokenObtainPairSerializer, UserAdminSerializer, UserActivationSerializer
+from .filters import UserAdminFilter
+from .activation import manageable_users, set_users_active
+from .provisioning import provision_users, read_csv_rows
+from credit_unions.tenancy import tenant_id_for_user
 from rest_framework.parsers import JSONParser
 from rest_framework_simplejwt.views import TokenObtainPairView
 # This view handles user registration.
@@ -36,19 +44,113 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
+class UserAdminPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
 class UsersManagement(APIView):
-    permission_classes = [IsAuthenticated]
+    """
+    Paginated user-admin listing (?page=, ?page_size=), filtered by credit_union=<id>
+    and is_active=true|false. Staff only: superusers see every user, others their credit union's
+    non-staff members. Profiles and credit unions are joined in, so a page costs a COUNT and one SELECT.
+    """
+    permission_classes = [IsAdminUser]
+    pagination_class = UserAdminPagination
 
     def get(self,request, format=None):
-        users = User.objects.all()
-        serializer = RegisterSerializer(users, many=True)
-        return Response(serializer.data)   
+        users = manageable_users(request.user).select_related('profile__credit_union').order_by('username')
+        filterset = UserAdminFilter(request.query_params, queryset=users, request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(filterset.qs, request, view=self)
+        serializer = UserAdminSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+# Defaults, overridable in settings.py
+DEFAULT_USER_ACTIVATION_MAX_IDS = 1000
+
+class UserActivationView(APIView):
+    """
+    Activates or deactivates many users at once: POST users/activation/
+    {"ids": [...], "is_active": true | false}, with a single UPDATE limited to the
+    users the caller manages. Staff only. Returns the ids updated, unchanged and not found.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, format=None):
+        serializer = UserActivationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        max_ids = getattr(settings, 'USER_ACTIVATION_MAX_IDS', DEFAULT_USER_ACTIVATION_MAX_IDS)
+        if len(data['ids']) > max_ids:
+            return Response(
+                {'detail': f'At most {max_ids} users can be updated per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not data['is_active'] and request.user.pk in data['ids']:
+            return Response({'detail': 'You cannot deactivate your own account.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = set_users_active(manageable_users(request.user), data['ids'], data['is_active'])
+        result['is_active'] = data['is_active']
+        return Response(result)
 
+# One-user toggle kept for existing clients; users/activation/ sets many users at once.
+# Same rules as UserActivationView: staff only, limited to the users the caller manages.
 class ActivateUserView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAdminUser]
 
     def delete(self,request, pk,format=None):
-        users = User.objects.get(pk=pk)
-        users.is_active = not users.is_active
-        users.save()
-        return Response(status=status.HTTP_204_NO_CONTENT)   
\ No newline at end of file
+        users = manageable_users(request.user)
+        is_active = users.filter(pk=pk).values_list('is_active', flat=True).first()
+        if is_active is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if is_active and pk == request.user.pk:
+            return Response({'detail': 'You cannot deactivate your own account.'}, status=status.HTTP_400_BAD_REQUEST)
+        set_users_active(users, [pk], not is_active)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+# Defaults, overridable in settings.py
+DEFAULT_PROVISION_MAX_ROWS = 500
+
+class UserProvisioningView(APIView):
+    """
+    Creates many accounts at once from an uploaded CSV: POST users/provision/ with
+    `file` (username,email,password[,credit_union_id,first_name,last_name]).
+    Staff only; accounts are created in the caller's credit union unless the caller
+    is a superuser. Returns the users created and the errors of rejected rows
+    (1-based CSV lines). Larger files: python manage.py provision_users.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, format=None):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['Upload a CSV file.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rows = read_csv_rows(upload)
+        except (UnicodeDecodeError, ValueError):
+            return Response({'file': ['The file is not a UTF-8 CSV.']}, status=status.HTTP_400_BAD_REQUEST)
+        max_rows = getattr(settings, 'PROVISION_MAX_ROWS', DEFAULT_PROVISION_MAX_ROWS)
+        if len(rows) > max_rows:
+            return Response(
+                {'detail': f'At most {max_rows} users can be provisioned per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        credit_union_id = None
+        if not request.user.is_superuser:
+            credit_union_id = tenant_id_for_user(request.user)
+            if credit_union_id is None:
+                return Response({'detail': 'You do not belong to a credit union.'}, status=status.HTTP_403_FORBIDDEN)
+
+        result = provision_users(rows, credit_union_id=credit_union_id)
+        response_data = {
+            'created': [{'line': index + 2, 'id': user.pk, 'username': user.username} for index, user in result['created']],
+            'errors': [{'line': index + 2, 'errors': errors} for index, errors in sorted(result['errors'].items())],
+        }
+        response_status = status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(response_data, status=response_status)
@@ -1,11 +1,41 @@
 from django.contrib import admin
-from .models import LoanApplication, MortgageLoanApplication 
+from .models import LoanApplication, MortgageLoanApplication, AppraisalCriterionResult
+from .search import matching_applications
+from loan_appraiser_project.db_routing import ReplicaReadAdminMixin
 # Assuming your models are in a file named models.py in the same app directory
 
+## -------------------------------------------------------------
+## Inline for the normalized appraisal breakdown (read-only)
+## -------------------------------------------------------------
+class AppraisalCriterionResultInline(admin.TabularInline):
+    model = AppraisalCriterionResult
+    fields = ('criterion', 'passed', 'weight_awarded')
+    readonly_fields = ('criterion', 'passed', 'weight_awarded')
+    extra = 0
+    can_delete = False
+
+## -------------------------------------------------------------
+## Staff users only see their own credit union's applications
+## -------------------------------------------------------------
+class TenantScopedAdminMixin:
+    def get_queryset(self, request):
+        return super().get_queryset(request).for_user(request.user)
+
+## -------------------------------------------------------------
+## Search through the applicant search index
+## -------------------------------------------------------------
+class ApplicantSearchMixin:
+    def get_search_results(self, request, queryset, search_term):
+        # Look the term up in ApplicantSearchToken instead of icontains scans over search_fields.
+        # Child models share the parent's primary key, so the same lookup works for them.
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(pk__in=matching_applications(search_term).values('application_id')), False
+
 ## -------------------------------------------------------------
 ## Custom Admin Class for LoanApplication
 ## -------------------------------------------------------------
-class LoanApplicationAdmin(admin.ModelAdmin):
+class LoanApplicationAdmin(ReplicaReadAdminMixin, TenantScopedAdminMixin, ApplicantSearchMixin, admin.ModelAdmin):
     # Fields to display in the list view of the admin site
     list_display = ('applicant_name', 'loan_type', 'loan_amount', 'submission_date', 'approved')
     
@@ -15,7 +45,7 @@ class LoanApplicationAdmin(admin.ModelAdmin):
     # Fields to allow filtering in the right sidebar
     list_filter = ('loan_type', 'approved', 'submission_date')
     
-    # Fields to allow searching
+    # Fields to allow searching (served by the applicant search index, see get_search_results)
     search_fields = ('applicant_name', 'applicant_email', 'account_number', 'identity_card_number')
     
     # Organize fields into fieldsets for the detail view
@@ -41,10 +71,13 @@ class LoanApplicationAdmin(admin.ModelAdmin):
     # Make 'submission_date' read-only
     readonly_fields = ('submission_date',)
 
+    # Per-criterion appraisal outcomes
+    inlines = [AppraisalCriterionResultInline]
+
 ## -------------------------------------------------------------
 ## Custom Admin Class for MortgageLoanApplication
 ## -------------------------------------------------------------
-class MortgageLoanApplicationAdmin(admin.ModelAdmin):
+class MortgageLoanApplicationAdmin(ReplicaReadAdminMixin, TenantScopedAdminMixin, ApplicantSearchMixin, admin.ModelAdmin):
     # Inherits from LoanApplication, so it might have many common fields.
     # Customizing the display for Mortgage-specific fields
     list_display = ('applicant_name', 'loan_amount', 'land_title_document', 'no_existing_npl', 'approved')
@@ -0,0 +1,90 @@
+# calculator/analytics.py
+"""
+Portfolio analytics computed by the database: one GROUP BY per request, with
+window functions over the groups for each group's share of the portfolio and,
+by month, running totals. Only the aggregated rows leave the database.
+"""
+
+from django.db.models import Avg, Count, F, FloatField, Func, Q, Sum
+from django.db.models.functions import Cast, Lower, NullIf, TruncMonth
+
+class GroupWindowSum(Func):
+    """
+    SUM(<aggregate>) OVER (...), evaluated over the groups of a GROUP BY query:
+    the portfolio total next to every group's total, or a running total with
+    `order_by`. (Django's Window() does not accept an aggregate as its argument.)
+    """
+    contains_over_clause = True
+
+    def __init__(self, aggregate, order_by=None, output_field=None):
+        expressions = [aggregate] if order_by is None else [aggregate, order_by]
+        super().__init__(*expressions, output_field=output_field)
+
+    def _resolve_output_field(self):
+        return self.source_expressions[0].output_field
+
+    def as_sql(self, compiler, connection, **extra_context):
+        aggregate_sql, params = compiler.compile(self.source_expressions[0])
+        over = ''
+        if len(self.source_expressions) > 1:
+            order_sql, order_params = compiler.compile(self.source_expressions[1])
+            over = f'ORDER BY {order_sql}'
+            params = (*params, *order_params)
+        return f'SUM({aggregate_sql}) OVER ({over})', params
+
+
+# group_by value -> expression grouped on
+DIMENSIONS = {
+    'loan_type': F('loan_type'),
+    'month': TruncMonth('submission_date'),
+    'credit_union': F('credit_union_id'),
+    # Same expression as calc_loan_cu_profession_idx, so spellings differing in case group together
+    'profession': Lower('profession'),
+}
+
+
+def _measures():
+    approved = Count('pk', filter=Q(approved=True))
+    declined = Count('pk', filter=Q(approved=False))
+    return {
+        'applications': Count('pk'),
+        'total_amount': Sum('loan_amount'),
+        'average_amount': Avg('loan_amount'),
+        'average_score': Avg('appraisal_score'),
+        'approved_count': approved,
+        'declined_count': declined,
+        'pending_count': Count('pk', filter=Q(approved__isnull=True)),
+        # Approved share of the decided applications; None while none is decided
+        'approval_rate': Cast(approved, FloatField()) / NullIf(Cast(approved + declined, FloatField()), 0.0),
+    }
+
+
+def portfolio_summary(applications, group_by='loan_type'):
+    """
+    Totals of `applications` (e.g. one tenant's, already filtered) and one row per
+    `group_by` value, each with its share of the portfolio's count and amount.
+    Monthly rows, oldest first, also carry running totals.
+    """
+    dimension = DIMENSIONS[group_by]
+    measures = _measures()
+
+    groups = (
+        applications.order_by()
+        .annotate(group=dimension)
+        .values('group')
+        .annotate(**measures)
+        .annotate(
+            amount_share=Cast(Sum('loan_amount'), FloatField()) / NullIf(GroupWindowSum(Cast(Sum('loan_amount'), FloatField())), 0.0),
+            applications_share=Cast(Count('pk'), FloatField()) / GroupWindowSum(Cast(Count('pk'), FloatField())),
+        )
+    )
+    if group_by == 'month':
+        groups = groups.annotate(
+            cumulative_applications=GroupWindowSum(Count('pk'), order_by=dimension),
+            cumulative_amount=GroupWindowSum(Sum('loan_amount'), order_by=dimension),
+        ).order_by('group')
+    else:
+        groups = groups.order_by('-total_amount')
+
+    totals = applications.order_by().aggregate(**measures)
+    return {'group_by': group_by, 'totals': totals, 'groups': list(groups)}
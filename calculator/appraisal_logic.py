@@ -47,6 +47,26 @@ def calculate_monthly_payment(principal, annual_interest_rate, loan_term_years):
     except ZeroDivisionError:
         return principal / (Decimal(loan_term_years) * Decimal('12'))
 
+def calculate_outstanding_balance(principal, annual_interest_rate, loan_term_years, months_elapsed):
+    """
+    Calculates the remaining principal of an annuity loan after `months_elapsed` scheduled payments:
+    Balance = P * (1 + r)^k - M * ((1 + r)^k - 1) / r
+    """
+    number_of_payments = int(loan_term_years) * 12
+    if months_elapsed >= number_of_payments:
+        return Decimal('0')
+    if months_elapsed <= 0:
+        return principal
+
+    monthly_payment = calculate_monthly_payment(principal, annual_interest_rate, loan_term_years)
+    if annual_interest_rate == Decimal('0'):
+        return principal - monthly_payment * months_elapsed
+
+    monthly_interest_rate = (annual_interest_rate / Decimal('100')) / Decimal('12')
+    growth = (Decimal('1') + monthly_interest_rate) ** months_elapsed
+    balance = principal * growth - monthly_payment * (growth - Decimal('1')) / monthly_interest_rate
+    return max(balance, Decimal('0'))
+
 def calculate_dti_ratio(gross_monthly_income, total_monthly_debt):
     """
     Calculates the Debt-to-Income (DTI) ratio.
@@ -87,12 +107,26 @@ def _check_full_kyc(data):
         # If a non-zero value is strictly required, add a check like `and value == 0`
     return True
 
+def _record_criterion(breakdown, criterion, passed, weight_awarded=0):
+    """
+    Records the outcome of one appraisal criterion as a compact row
+    (criterion code, passed, weight awarded) alongside the display reasons.
+    These rows are stored in AppraisalCriterionResult for criterion-level analytics.
+    `passed` is the value the scoring branch used, never parsed back from the reason text.
+    """
+    breakdown.append({
+        'criterion': criterion,
+        'passed': bool(passed),
+        'weight_awarded': int(weight_awarded) if passed else 0,
+    })
+
 def appraise_mortgage_loan(data):
     """
     Appraises a Mortgage Loan application.
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = data.get('loan_amount')
     annual_interest_rate = data.get('annual_interest_rate_percent')
@@ -126,11 +160,13 @@ def appraise_mortgage_loan(data):
     # --- Appraisal Criteria ---
 
     # 1. Collateral (Land Title OR Power of Attorney) - Combined Check
-    if land_title_document_present or power_of_attorney_document_present:
+    collateral_met = land_title_document_present or power_of_attorney_document_present
+    if collateral_met:
         total_score += Decimal('25')
         reasons.append("✔ Primary Collateral (Land Title OR Power of Attorney) is provided. (+25%)")
     else:
         reasons.append("✖ Neither Land Title nor Power of Attorney provided for primary collateral. (+0%)")
+    _record_criterion(breakdown, 'collateral', collateral_met, 25)
 
     # 2. Legal Mortgage Agreement
     if legal_mortgage_agreement_document_provided:
@@ -138,14 +174,17 @@ def appraise_mortgage_loan(data):
         reasons.append("✔ Legal Mortgage Agreement on Land Title provided. (+30%)")
     else:
         reasons.append("✖ Legal Mortgage Agreement on Land Title not provided. (+0%)")
+    _record_criterion(breakdown, 'legal_mortgage_agreement', legal_mortgage_agreement_document_provided, 30)
 
     # 3. Purpose of Loan (Text Field) - Using the corrected field name 'loan_purpose_document'
     # This assumes loan_purpose_text is still a string
-    if loan_purpose_text and len(loan_purpose_text.strip()) >= 20:
+    loan_purpose_met = loan_purpose_text and len(loan_purpose_text.strip()) >= 20
+    if loan_purpose_met:
         total_score += Decimal('5')
         reasons.append("✔ Purpose of Loan clearly stated. (+5%)")
     else:
         reasons.append("ℹ️ Purpose of Loan not clearly stated or too short. (+0%)")
+    _record_criterion(breakdown, 'loan_purpose', loan_purpose_met, 5)
 
     # 4. Supporting Documents (BOOLEAN Field) - CORRECTED LOGIC
     if supporting_documents_present: # Simply check if the boolean is True
@@ -153,6 +192,7 @@ def appraise_mortgage_loan(data):
         reasons.append("✔ Supporting documents confirmed as present. (+5%)")
     else:
         reasons.append("ℹ️ Supporting documents not confirmed as present. (+0%)")
+    _record_criterion(breakdown, 'supporting_documents', supporting_documents_present, 5)
 
     # 5. No Existing Non-Performing Loan (NPL)
     if no_existing_npl:
@@ -160,55 +200,68 @@ def appraise_mortgage_loan(data):
         reasons.append("✔ No existing Non-Performing Loan (NPL) detected. (+5%)")
     else:
         reasons.append("✖ Existing Non-Performing Loan (NPL) detected. (+0%)")
+    _record_criterion(breakdown, 'no_existing_npl', no_existing_npl, 5)
 
     # 6. Full KYC (Character)
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('10')
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+10%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 10)
 
     # 7. Loan Amount Policy Check
     # Ensure MORTGAGE_LOAN_MAX_AMOUNT is defined (e.g., at the top of this file or imported)
-    if loan_amount <= MORTGAGE_LOAN_MAX_AMOUNT:
+    loan_amount_policy_met = loan_amount <= MORTGAGE_LOAN_MAX_AMOUNT
+    if loan_amount_policy_met:
         total_score += Decimal('5')
         reasons.append(f"✔ Loan Amount ({loan_amount:,.0f} XAF) is within Union Policy ({MORTGAGE_LOAN_MAX_AMOUNT:,.0f} XAF cap). (+5%)")
     else:
         reasons.append(f"✖ Loan Amount ({loan_amount:,.0f} XAF) exceeds Union Policy ({MORTGAGE_LOAN_MAX_AMOUNT:,.0f} XAF cap). (+0%)")
+    _record_criterion(breakdown, 'loan_amount_policy', loan_amount_policy_met, 5)
 
     # 8. Loan Term Policy Check
     # Ensure MORTGAGE_LOAN_MAX_TENURE_YEARS is defined
-    if loan_term_years <= MORTGAGE_LOAN_MAX_TENURE_YEARS:
+    loan_term_policy_met = loan_term_years <= MORTGAGE_LOAN_MAX_TENURE_YEARS
+    if loan_term_policy_met:
         total_score += Decimal('5')
         reasons.append(f"✔ Loan Duration ({loan_term_years} years) is within Union Policy ({MORTGAGE_LOAN_MAX_TENURE_YEARS} years max). (+5%)")
     else:
         reasons.append(f"✖ Loan Duration ({loan_term_years} years) exceeds Union Policy ({MORTGAGE_LOAN_MAX_TENURE_YEARS} years max). (+0%)")
+    _record_criterion(breakdown, 'loan_term_policy', loan_term_policy_met, 5)
 
     # 9. Debt-to-Income (DTI) Ratio (Capacity)
     dti_percentage = Decimal('0')
+    dti_met = False
     if borrower_gross_monthly_income > Decimal('0'):
         dti_percentage = (total_monthly_debt / borrower_gross_monthly_income) * Decimal('100')
 
         if dti_percentage <= Decimal('40'):
             total_score += Decimal('10')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 40% of Gross Income ({borrower_gross_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+10%)")
+            dti_met = True
         else:
             reasons.append(f"✖ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 40% of Gross Income ({borrower_gross_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Gross Monthly Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 10)
 
     # 10. Loan Amount to Annual Income Ratio (Capacity)
     loan_amount_to_annual_income_ratio = Decimal('0')
+    loan_to_income_met = False
     if annual_income > Decimal('0'):
         loan_amount_to_annual_income_ratio = (loan_amount / annual_income)
 
         if loan_amount_to_annual_income_ratio <= 3:
             total_score += Decimal('5')
             reasons.append(f"✔ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is within acceptable limits (≤3x). (+5%)")
+            loan_to_income_met = True
         else:
             reasons.append(f"ℹ️ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is high (>3x). (+0%)")
     else:
         reasons.append("✖ Cannot calculate loan to income ratio: Annual Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'loan_to_income', loan_to_income_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -227,6 +280,7 @@ def appraise_mortgage_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -241,6 +295,7 @@ def appraise_business_loan(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     # General loan parameters (from base LoanApplication)
     loan_amount = data.get('loan_amount')
@@ -273,6 +328,7 @@ def appraise_business_loan(data):
         reasons.append("✔ Valid source of income for repayment provided. (+30%)")
     else:
         reasons.append("✖ Valid source of income for repayment is required. (+0%)")
+    _record_criterion(breakdown, 'valid_source_of_income', valid_source_of_income_for_repayment, 30)
 
     # 2. Savings Balance >= 20% of Loan (25 points)
     if savings_balance_ge_20_percent_loan:
@@ -280,6 +336,7 @@ def appraise_business_loan(data):
         reasons.append("✔ Savings balance is at least 20% of the loan amount. (+25%)")
     else:
         reasons.append("✖ Savings balance is less than 20% of the loan amount. (+0%)")
+    _record_criterion(breakdown, 'savings_ge_20_percent', savings_balance_ge_20_percent_loan, 25)
 
     # 3. Cost Estimate Provided (15 points)
     if cost_estimate_provided:
@@ -287,6 +344,7 @@ def appraise_business_loan(data):
         reasons.append("✔ Cost estimate of purchases provided. (+15%)")
     else:
         reasons.append("✖ Cost estimate of purchases not provided. (+0%)")
+    _record_criterion(breakdown, 'cost_estimate', cost_estimate_provided, 15)
 
     # 4. Land Documents Attached (10 points)
     if land_documents_attached_provided:
@@ -294,34 +352,44 @@ def appraise_business_loan(data):
         reasons.append("✔ Copies of land documents attached. (+10%)")
     else:
         reasons.append("ℹ️ No land documents attached. (+0%)") # Can be info if not strictly required for all business loans
+    _record_criterion(breakdown, 'land_documents', land_documents_attached_provided, 10)
 
     # 5. Full KYC (Character) (10 points)
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('10')
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+10%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 10)
 
     # 6. Debt-to-Income (DTI) Ratio (Capacity) (10 points)
+    dti_met = False
     if borrower_gross_monthly_income > Decimal('0') and dti_percentage <= Decimal('50'): # A slightly higher DTI might be acceptable for business loans
         total_score += Decimal('10')
         reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 50% of Gross Income ({borrower_gross_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+10%)")
+        dti_met = True
     else:
         reasons.append(f"✖ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 50% of Gross Income ({borrower_gross_monthly_income:,.0f} XAF) or income is zero. DTI: {dti_percentage:.1f}%. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 10)
 
     # 7. Loan Amount Policy Check (implicitly part of overall score, but good to check explicitly)
-    if loan_amount <= BUSINESS_LOAN_MAX_AMOUNT:
+    loan_amount_policy_met = loan_amount <= BUSINESS_LOAN_MAX_AMOUNT
+    if loan_amount_policy_met:
         reasons.append(f"✔ Loan Amount ({loan_amount:,.0f} XAF) is within Union Policy ({BUSINESS_LOAN_MAX_AMOUNT:,.0f} XAF cap).")
     else:
         reasons.append(f"✖ Loan Amount ({loan_amount:,.0f} XAF) exceeds Union Policy ({BUSINESS_LOAN_MAX_AMOUNT:,.0f} XAF cap).")
         # No score added/subtracted here, as it's a hard policy check, but important for reasons.
+    _record_criterion(breakdown, 'loan_amount_policy', loan_amount_policy_met)
 
     # 8. Loan Term Policy Check
-    if loan_term_years <= BUSINESS_LOAN_MAX_TENURE_YEARS:
+    loan_term_policy_met = loan_term_years <= BUSINESS_LOAN_MAX_TENURE_YEARS
+    if loan_term_policy_met:
         reasons.append(f"✔ Loan Duration ({loan_term_years} years) is within Union Policy ({BUSINESS_LOAN_MAX_TENURE_YEARS} years max).")
     else:
         reasons.append(f"✖ Loan Duration ({loan_term_years} years) exceeds Union Policy ({BUSINESS_LOAN_MAX_TENURE_YEARS} years max).")
         # No score added/subtracted here, as it's a hard policy check, but important for reasons.
+    _record_criterion(breakdown, 'loan_term_policy', loan_term_policy_met)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -339,6 +407,7 @@ def appraise_business_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_percentage': float(dti_percentage),
@@ -352,6 +421,7 @@ def appraise_salary_backed_loan(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = Decimal(data.get('loan_amount', '0.00'))
     annual_interest_rate = Decimal(data.get('annual_interest_rate_percent', '0.00'))
@@ -383,24 +453,30 @@ def appraise_salary_backed_loan(data):
         'irrevocable_salary_transfer_document': {'weight': 20, 'notes': "Irrevocable Salary Transfer Document"},
     }
     for field, details in doc_criteria.items():
+        criterion_met = False
         if field == 'loan_purpose_document':
             if data.get(field) and len(data.get(field).strip()) > 0:
                 total_score += Decimal(str(details['weight']))
                 reasons.append(f"✔ {details['notes']} (Provided, +{details['weight']}%)")
+                criterion_met = True
             else:
                 reasons.append(f"ℹ️ {details['notes']} (Not Provided/Empty, +0%)")
         elif data.get(field): # For FileFields (converted to boolean in views), check if True
             total_score += Decimal(str(details['weight']))
             reasons.append(f"✔ {details['notes']} (Provided, +{details['weight']}%)")
+            criterion_met = True
         else:
             reasons.append(f"✖ {details['notes']} (Not Provided, +0%)")
+        _record_criterion(breakdown, field, criterion_met, details['weight'])
 
     # 2. KYC Fields
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('10') # Weight for Full KYC
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+10%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 10)
 
     # 3. System-Check Criteria (Boolean fields)
     sys_check_criteria = {
@@ -413,34 +489,43 @@ def appraise_salary_backed_loan(data):
             reasons.append(f"✔ {details['notes']} (Met, +{details['weight']}%)")
         else:
             reasons.append(f"✖ {details['notes']} (Not Met, +0%)")
+        _record_criterion(breakdown, field, data.get(field), details['weight'])
 
     # 4. Policy Check: Loan Amount <= 10M (15%)
-    if loan_amount <= SALARY_BACKED_LOAN_MAX_AMOUNT:
+    loan_amount_policy_met = loan_amount <= SALARY_BACKED_LOAN_MAX_AMOUNT
+    if loan_amount_policy_met:
         total_score += Decimal('15')
         reasons.append(f"✔ Loan Amount ({loan_amount:,.0f} XAF) is ≤ 10M XAF per Union Policy. (+15%)")
     else:
         reasons.append(f"✖ Loan Amount ({loan_amount:,.0f} XAF) exceeds 10M XAF per Union Policy. (+0%)")
+    _record_criterion(breakdown, 'loan_amount_policy', loan_amount_policy_met, 15)
 
     # 5. Capacity Checks (DTI and Loan-to-Income)
     estimated_net_monthly_income = borrower_gross_monthly_income * Decimal('0.8') # Assuming 80% is net after taxes/deductions
 
+    dti_met = False
     if estimated_net_monthly_income > Decimal('0'):
         if dti_percentage <= Decimal('45'): # Slightly more lenient DTI for salary-backed
             total_score += Decimal('5')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 45% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+5%)")
+            dti_met = True
         else:
             reasons.append(f"ℹ️ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 45% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Estimated Net Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 5)
 
+    loan_to_income_met = False
     if annual_income > Decimal('0'):
         if loan_amount_to_annual_income_ratio <= 1.5: # Salary-backed loans are typically smaller relative to income
             total_score += Decimal('5')
             reasons.append(f"✔ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is within acceptable limits (≤1.5x). (+5%)")
+            loan_to_income_met = True
         else:
             reasons.append(f"ℹ️ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is high (>1.5x). (+0%)")
     else:
         reasons.append("✖ Cannot calculate loan to income ratio: Annual Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'loan_to_income', loan_to_income_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -457,6 +542,7 @@ def appraise_salary_backed_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -471,6 +557,7 @@ def appraise_loan_within_savings(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = Decimal(data.get('loan_amount', '0.00'))
     annual_interest_rate = Decimal(data.get('annual_interest_rate_percent', '0.00'))
@@ -499,18 +586,22 @@ def appraise_loan_within_savings(data):
         'loan_purpose_document': {'weight': 5, 'notes': "Purpose of Loan Clearly Defined"},
     }
     for field, details in doc_criteria.items():
-        if data.get(field) and len(data.get(field).strip()) > 0:
+        criterion_met = data.get(field) and len(data.get(field).strip()) > 0
+        if criterion_met:
             total_score += Decimal(str(details['weight']))
             reasons.append(f"✔ {details['notes']} (Provided, +{details['weight']}%)")
         else:
             reasons.append(f"ℹ️ {details['notes']} (Not Provided/Empty, +0%)")
+        _record_criterion(breakdown, field, criterion_met, details['weight'])
 
     # 2. KYC Fields
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('10') # Weight for Full KYC
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+10%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 10)
 
     # 3. System-Check Criteria (Boolean fields)
     sys_check_criteria = {
@@ -524,27 +615,34 @@ def appraise_loan_within_savings(data):
             reasons.append(f"✔ {details['notes']} (Met, +{details['weight']}%)")
         else:
             reasons.append(f"✖ {details['notes']} (Not Met, +0%)")
+        _record_criterion(breakdown, field, data.get(field), details['weight'])
 
     # 4. Capacity Checks (DTI and Loan-to-Income)
     estimated_net_monthly_income = borrower_gross_monthly_income * Decimal('0.8')
 
+    dti_met = False
     if estimated_net_monthly_income > Decimal('0'):
         if dti_percentage <= Decimal('50'): # More lenient DTI as it's savings-backed
             total_score += Decimal('5')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 50% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+5%)")
+            dti_met = True
         else:
             reasons.append(f"ℹ️ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 50% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Estimated Net Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 5)
 
+    loan_to_income_met = False
     if annual_income > Decimal('0'):
         if loan_amount_to_annual_income_ratio <= 2: # Less critical for this loan type
             total_score += Decimal('5')
             reasons.append(f"✔ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is within acceptable limits (≤2x). (+5%)")
+            loan_to_income_met = True
         else:
             reasons.append(f"ℹ️ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is high (>2x). (+0%)")
     else:
         reasons.append("✖ Cannot calculate loan to income ratio: Annual Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'loan_to_income', loan_to_income_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -561,6 +659,7 @@ def appraise_loan_within_savings(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -575,6 +674,7 @@ def appraise_daily_savings_loan(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = Decimal(data.get('loan_amount', '0.00'))
     annual_interest_rate = Decimal(data.get('annual_interest_rate_percent', '0.00'))
@@ -608,24 +708,30 @@ def appraise_daily_savings_loan(data):
         'valid_surety_bond_document': {'weight': 20, 'notes': "Signed Surety Bond (Valid Surety)"},
     }
     for field, details in doc_criteria.items():
+        criterion_met = False
         if field == 'loan_purpose_document':
             if data.get(field) and len(data.get(field).strip()) > 0:
                 total_score += Decimal(str(details['weight']))
                 reasons.append(f"✔ {details['notes']} (Provided, +{details['weight']}%)")
+                criterion_met = True
             else:
                 reasons.append(f"ℹ️ {details['notes']} (Not Provided/Empty, +0%)")
         elif data.get(field):
             total_score += Decimal(str(details['weight']))
             reasons.append(f"✔ {details['notes']} (Provided, +{details['weight']}%)")
+            criterion_met = True
         else:
             reasons.append(f"✖ {details['notes']} (Not Provided, +0%)")
+        _record_criterion(breakdown, field, criterion_met, details['weight'])
 
     # 2. KYC Fields
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('10') # Weight for Full KYC
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+10%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 10)
 
     # 3. System-Check Criteria
     sys_check_criteria = {
@@ -639,27 +745,34 @@ def appraise_daily_savings_loan(data):
             reasons.append(f"✔ {details['notes']} (Met, +{details['weight']}%)")
         else:
             reasons.append(f"✖ {details['notes']} (Not Met, +0%)")
+        _record_criterion(breakdown, field, data.get(field), details['weight'])
 
     # 4. Capacity Checks (DTI and Loan-to-Income)
     estimated_net_monthly_income = borrower_gross_monthly_income * Decimal('0.8')
 
+    dti_met = False
     if estimated_net_monthly_income > Decimal('0'):
         if dti_percentage <= Decimal('45'):
             total_score += Decimal('10')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 45% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+10%)")
+            dti_met = True
         else:
             reasons.append(f"✖ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 45% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Estimated Net Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 10)
 
+    loan_to_income_met = False
     if annual_income > Decimal('0'):
         if loan_amount_to_annual_income_ratio <= 2.5:
             total_score += Decimal('5')
             reasons.append(f"✔ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is within acceptable limits (≤2.5x). (+5%)")
+            loan_to_income_met = True
         else:
             reasons.append(f"ℹ️ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is high (>2.5x). (+0%)")
     else:
         reasons.append("✖ Cannot calculate loan to income ratio: Annual Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'loan_to_income', loan_to_income_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -676,6 +789,7 @@ def appraise_daily_savings_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -690,6 +804,7 @@ def appraise_standing_order_loan(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = Decimal(data.get('loan_amount', '0.00'))
     annual_interest_rate = Decimal(data.get('annual_interest_rate_percent', '0.00'))
@@ -719,18 +834,22 @@ def appraise_standing_order_loan(data):
         'loan_purpose_document': {'weight': 5, 'notes': "Purpose of Loan Clearly Stated & Valid"},
     }
     for field, details in doc_criteria.items():
-        if data.get(field) and len(data.get(field).strip()) > 0:
+        criterion_met = data.get(field) and len(data.get(field).strip()) > 0
+        if criterion_met:
             total_score += Decimal(str(details['weight']))
             reasons.append(f"✔ {details['notes']} (Provided, +{details['weight']}%)")
         else:
             reasons.append(f"ℹ️ {details['notes']} (Not Provided/Empty, +0%)")
+        _record_criterion(breakdown, field, criterion_met, details['weight'])
 
     # 2. KYC Fields
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('15') # Weight for Full KYC for Standing Order (adjusted from 10% in others)
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+15%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 15)
 
     # 3. System-Check Criteria
     sys_check_criteria = {
@@ -745,30 +864,38 @@ def appraise_standing_order_loan(data):
             reasons.append(f"✔ {details['notes']} (Met, +{details['weight']}%)")
         else:
             reasons.append(f"✖ {details['notes']} (Not Met, +0%)")
+        _record_criterion(breakdown, field, data.get(field), details['weight'])
 
     # 4. Capacity Checks (DTI and Loan-to-Income)
     estimated_net_monthly_income = borrower_gross_monthly_income * Decimal('0.8')
 
+    dti_points = 0
     if estimated_net_monthly_income > Decimal('0'):
         if dti_percentage <= Decimal('40'):
+            dti_points = 10
             total_score += Decimal('10')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 40% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+10%)")
         elif dti_percentage <= Decimal('50'):
+            dti_points = 5
             total_score += Decimal('5')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 50% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+5%)")
         else:
             reasons.append(f"✖ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 50% of Estimated Net Income ({estimated_net_monthly_income:,.0f} XAF). DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Estimated Net Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_points > 0, dti_points)
 
+    loan_to_income_met = False
     if annual_income > Decimal('0'):
         if loan_amount_to_annual_income_ratio <= 1:
             total_score += Decimal('5')
             reasons.append(f"✔ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is within acceptable limits (≤1x). (+5%)")
+            loan_to_income_met = True
         else:
             reasons.append(f"ℹ️ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is high (>1x). (+0%)")
     else:
         reasons.append("✖ Cannot calculate loan to income ratio: Annual Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'loan_to_income', loan_to_income_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -785,6 +912,7 @@ def appraise_standing_order_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -799,6 +927,7 @@ def appraise_real_estate_loan(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = Decimal(data.get('loan_amount', '0.00'))
     annual_interest_rate = Decimal(data.get('annual_interest_rate_percent', '0.00'))
@@ -830,66 +959,81 @@ def appraise_real_estate_loan(data):
         reasons.append("✔ Loan duration is greater than or equal to 10 years. (+10%)")
     else:
         reasons.append("✖ Loan duration is less than 10 years. (+0%)")
+    _record_criterion(breakdown, 'loan_duration_ge_10_years', loan_duration_ge_10_years, 10)
 
     if loan_amount_le_10_percent_paid_up_capital:
         total_score += Decimal('15')
         reasons.append("✔ Loan amount does not exceed 10% of paid-up capital. (+15%)")
     else:
         reasons.append("✖ Loan amount exceeds 10% of paid-up capital. (+0%)")
+    _record_criterion(breakdown, 'loan_amount_le_10_percent_paid_up_capital', loan_amount_le_10_percent_paid_up_capital, 15)
 
     if legal_mortgage_agreement_document_re:
         total_score += Decimal('20')
         reasons.append("✔ Legal Mortgage Agreement signed and provided. (+20%)")
     else:
         reasons.append("✖ Legal Mortgage Agreement not provided. (+0%)")
+    _record_criterion(breakdown, 'legal_mortgage_agreement', legal_mortgage_agreement_document_re, 20)
 
     if land_title_in_borrowers_name:
         total_score += Decimal('15')
         reasons.append("✔ Land Title is in Borrower's Name. (+15%)")
     else:
         reasons.append("✖ Land Title is not in Borrower's Name. (+0%)")
+    _record_criterion(breakdown, 'land_title_in_borrowers_name', land_title_in_borrowers_name, 15)
 
     if valid_proof_of_source_of_income:
         total_score += Decimal('10')
         reasons.append("✔ Valid Proof of Source of Income provided. (+10%)")
     else:
         reasons.append("✖ No Valid Proof of Source of Income provided. (+0%)")
+    _record_criterion(breakdown, 'valid_proof_of_source_of_income', valid_proof_of_source_of_income, 10)
 
     # 2. Common Criteria (from other loan types, adjust weights if necessary)
     # Loan Purpose
-    if loan_purpose_document_text and len(loan_purpose_document_text.strip()) >= 20:
+    loan_purpose_met = loan_purpose_document_text and len(loan_purpose_document_text.strip()) >= 20
+    if loan_purpose_met:
         total_score += Decimal('5')
         reasons.append("✔ Purpose of Loan clearly stated. (+5%)")
     else:
         reasons.append("ℹ️ Purpose of Loan not clearly stated or too short. (+0%)")
+    _record_criterion(breakdown, 'loan_purpose', loan_purpose_met, 5)
 
     # KYC
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('10')
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+10%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 10)
 
     # DTI
     estimated_net_monthly_income = borrower_gross_monthly_income * Decimal('0.8')
+    dti_met = False
     if estimated_net_monthly_income > Decimal('0'):
         if dti_percentage <= Decimal('40'):
             total_score += Decimal('10')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 40% of Estimated Net Income. DTI: {dti_percentage:.1f}%. (+10%)")
+            dti_met = True
         else:
             reasons.append(f"✖ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 40% of Estimated Net Income. DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Estimated Net Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 10)
 
     # Loan to Annual Income Ratio
+    loan_to_income_met = False
     if annual_income > Decimal('0'):
         if loan_amount_to_annual_income_ratio <= 4: # Real estate loans can be higher relative to income
             total_score += Decimal('5')
             reasons.append(f"✔ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is within acceptable limits (≤4x). (+5%)")
+            loan_to_income_met = True
         else:
             reasons.append(f"ℹ️ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is high (>4x). (+0%)")
     else:
         reasons.append("✖ Cannot calculate loan to income ratio: Annual Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'loan_to_income', loan_to_income_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -907,6 +1051,7 @@ def appraise_real_estate_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -922,6 +1067,7 @@ def appraise_container_loan(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = Decimal(data.get('loan_amount', '0.00'))
     annual_interest_rate = Decimal(data.get('annual_interest_rate_percent', '0.00'))
@@ -953,12 +1099,14 @@ def appraise_container_loan(data):
         reasons.append("✔ Copy of Bill of Lading provided. (+20%)")
     else:
         reasons.append("✖ Copy of Bill of Lading not provided. (+0%)")
+    _record_criterion(breakdown, 'bill_of_lading', bill_of_lading_document, 20)
 
     if custom_clearance_plan_document:
         total_score += Decimal('15')
         reasons.append("✔ Custom Clearance Plan provided. (+15%)")
     else:
         reasons.append("✖ Custom Clearance Plan not provided. (+0%)")
+    _record_criterion(breakdown, 'custom_clearance_plan', custom_clearance_plan_document, 15)
 
     # The savings_balance_amount is for data collection. The scoring is on the checkbox.
     # Ensure SAVINGS_BALANCE_GE_1_5_LOAN_RATIO is defined (e.g., at the top of this file)
@@ -967,12 +1115,14 @@ def appraise_container_loan(data):
         reasons.append(f"✔ Savings balance is ≥ 1/5 ({SAVINGS_BALANCE_GE_1_5_LOAN_RATIO*100:.0f}%) of the loan amount ({loan_amount:,.0f} XAF). (+20%)")
     else:
         reasons.append(f"✖ Savings balance is < 1/5 ({SAVINGS_BALANCE_GE_1_5_LOAN_RATIO*100:.0f}%) of the loan amount ({loan_amount:,.0f} XAF). (+0%)")
+    _record_criterion(breakdown, 'savings_ge_1_5_loan', savings_balance_ge_1_5_loan, 20)
 
     if valid_proof_of_source_of_income:
         total_score += Decimal('15')
         reasons.append("✔ Valid Proof of Source of Income provided. (+15%)")
     else:
         reasons.append("✖ No Valid Proof of Source of Income provided. (+0%)")
+    _record_criterion(breakdown, 'valid_proof_of_source_of_income', valid_proof_of_source_of_income, 15)
 
     # Add the note if loan is above 10,000,000 XAF
     if loan_amount > Decimal('10000000'):
@@ -980,39 +1130,49 @@ def appraise_container_loan(data):
 
     # 2. Common Criteria (from other loan types, adjust weights if necessary)
     # Loan Purpose
-    if loan_purpose_document_text and len(loan_purpose_document_text.strip()) >= 20:
+    loan_purpose_met = loan_purpose_document_text and len(loan_purpose_document_text.strip()) >= 20
+    if loan_purpose_met:
         total_score += Decimal('5')
         reasons.append("✔ Purpose of Loan clearly stated. (+5%)")
     else:
         reasons.append("ℹ️ Purpose of Loan not clearly stated or too short. (+0%)")
+    _record_criterion(breakdown, 'loan_purpose', loan_purpose_met, 5)
 
     # KYC
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('10')
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+10%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 10)
 
     # DTI
     estimated_net_monthly_income = borrower_gross_monthly_income * Decimal('0.8')
+    dti_met = False
     if estimated_net_monthly_income > Decimal('0'):
         if dti_percentage <= Decimal('45'): # Slightly more lenient DTI for commercial loans
             total_score += Decimal('5')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 45% of Estimated Net Income. DTI: {dti_percentage:.1f}%. (+5%)")
+            dti_met = True
         else:
             reasons.append(f"✖ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 45% of Estimated Net Income. DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Estimated Net Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 5)
 
     # Loan to Annual Income Ratio (Container loans might have different income relation)
+    loan_to_income_met = False
     if annual_income > Decimal('0'):
         if loan_amount_to_annual_income_ratio <= 5: # Example: allowing higher ratio for business loans
             total_score += Decimal('5')
             reasons.append(f"✔ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is within acceptable limits (≤5x). (+5%)")
+            loan_to_income_met = True
         else:
             reasons.append(f"ℹ️ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is high (>5x). (+0%)")
     else:
         reasons.append("✖ Cannot calculate loan to income ratio: Annual Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'loan_to_income', loan_to_income_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -1029,6 +1189,7 @@ def appraise_container_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -1043,6 +1204,7 @@ def appraise_agricultural_loan(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = Decimal(data.get('loan_amount', '0.00'))
     annual_interest_rate = Decimal(data.get('annual_interest_rate_percent', '0.00'))
@@ -1071,31 +1233,39 @@ def appraise_agricultural_loan(data):
     # --- Appraisal Criteria ---
 
     # 1. Land Ownership and Authorization (25%)
+    land_points = 0
     if is_land_personal_belonging:
+        land_points = 25
         total_score += Decimal('25')
         reasons.append("✔ Land is a personal belonging of the loan applicant. (+25%)")
     elif not is_land_personal_belonging and has_authorization_of_usage:
+        land_points = 15
         total_score += Decimal('15') # Less weight if not personal but authorized
         reasons.append("✔ Land is not personal, but authorization of usage is provided. (+15%)")
     else:
         reasons.append("✖ Land ownership/authorization not confirmed. (+0%)")
+    _record_criterion(breakdown, 'land_ownership', land_points > 0, land_points)
 
     # 2. Loan Duration based on Purpose (15%)
     loan_term_months = loan_term_years * 12
+    loan_duration_for_purpose_met = False
     if loan_purpose_category == 'crops':
         if loan_term_months <= AGRICULTURAL_LOAN_CROPS_MAX_MONTHS:
+            loan_duration_for_purpose_met = True
             total_score += Decimal('15')
             reasons.append(f"✔ Loan duration ({loan_term_months} months) is suitable for crops (≤ {AGRICULTURAL_LOAN_CROPS_MAX_MONTHS} months). (+15%)")
         else:
             reasons.append(f"✖ Loan duration ({loan_term_months} months) exceeds maximum for crops (> {AGRICULTURAL_LOAN_CROPS_MAX_MONTHS} months). (+0%)")
     elif loan_purpose_category == 'livestock':
         if loan_term_months <= AGRICULTURAL_LOAN_LIVESTOCK_MAX_MONTHS:
+            loan_duration_for_purpose_met = True
             total_score += Decimal('15')
             reasons.append(f"✔ Loan duration ({loan_term_months} months) is suitable for livestock (≤ {AGRICULTURAL_LOAN_LIVESTOCK_MAX_MONTHS} months). (+15%)")
         else:
             reasons.append(f"✖ Loan duration ({loan_term_months} months) exceeds maximum for livestock (> {AGRICULTURAL_LOAN_LIVESTOCK_MAX_MONTHS} months). (+0%)")
     else:
         reasons.append("ℹ️ Loan purpose category not specified, duration check skipped. (+0%)")
+    _record_criterion(breakdown, 'loan_duration_for_purpose', loan_duration_for_purpose_met, 15)
 
     # 3. Savings Balance (20%)
     required_savings = loan_amount * SAVINGS_BALANCE_GE_1_5_LOAN_RATIO
@@ -1104,6 +1274,7 @@ def appraise_agricultural_loan(data):
         reasons.append(f"✔ Savings balance is ≥ 1/5 ({SAVINGS_BALANCE_GE_1_5_LOAN_RATIO*100:.0f}%) of the loan amount ({loan_amount:,.0f} XAF). (+20%)")
     else:
         reasons.append(f"✖ Savings balance is < 1/5 ({SAVINGS_BALANCE_GE_1_5_LOAN_RATIO*100:.0f}%) of the loan amount ({loan_amount:,.0f} XAF). (+0%)")
+    _record_criterion(breakdown, 'savings_ge_1_5_loan', savings_balance_ge_1_5_loan, 20)
 
     # 4. Total Cost Estimate Document (10%)
     if total_cost_estimate_document:
@@ -1111,6 +1282,7 @@ def appraise_agricultural_loan(data):
         reasons.append("✔ Total Cost Estimate of Products and Inputs document provided. (+10%)")
     else:
         reasons.append("✖ Total Cost Estimate document not provided. (+0%)")
+    _record_criterion(breakdown, 'total_cost_estimate', total_cost_estimate_document, 10)
 
     # 5. Valid Proof of Source of Income (10%)
     if valid_proof_of_source_of_income:
@@ -1118,41 +1290,52 @@ def appraise_agricultural_loan(data):
         reasons.append("✔ Valid Proof of Source of Income provided. (+10%)")
     else:
         reasons.append("✖ No Valid Proof of Source of Income provided. (+0%)")
+    _record_criterion(breakdown, 'valid_proof_of_source_of_income', valid_proof_of_source_of_income, 10)
 
     # 6. Loan Purpose (Text Field - 5%)
-    if loan_purpose_document_text and len(loan_purpose_document_text.strip()) >= 20:
+    loan_purpose_met = loan_purpose_document_text and len(loan_purpose_document_text.strip()) >= 20
+    if loan_purpose_met:
         total_score += Decimal('5')
         reasons.append("✔ Purpose of Loan clearly stated. (+5%)")
     else:
         reasons.append("ℹ️ Purpose of Loan not clearly stated or too short. (+0%)")
+    _record_criterion(breakdown, 'loan_purpose', loan_purpose_met, 5)
 
     # 7. KYC (Character - 5%)
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('5')
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+5%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 5)
 
     # 8. DTI (Capacity - 5%)
     estimated_net_monthly_income = borrower_gross_monthly_income * Decimal('0.8')
+    dti_met = False
     if estimated_net_monthly_income > Decimal('0'):
         if dti_percentage <= Decimal('50'): # Agricultural loans might have slightly higher DTI tolerance
             total_score += Decimal('5')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 50% of Estimated Net Income. DTI: {dti_percentage:.1f}%. (+5%)")
+            dti_met = True
         else:
             reasons.append(f"✖ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 50% of Estimated Net Income. DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Estimated Net Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 5)
 
     # 9. Loan to Annual Income Ratio (Capacity - 5%)
+    loan_to_income_met = False
     if annual_income > Decimal('0'):
         if loan_amount_to_annual_income_ratio <= 4: # Allowing higher ratio for agricultural business loans
             total_score += Decimal('5')
             reasons.append(f"✔ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is within acceptable limits (≤4x). (+5%)")
+            loan_to_income_met = True
         else:
             reasons.append(f"ℹ️ Loan amount to annual income ratio ({loan_amount_to_annual_income_ratio:.2f}x) is high (>4x). (+0%)")
     else:
         reasons.append("✖ Cannot calculate loan to income ratio: Annual Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'loan_to_income', loan_to_income_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -1170,6 +1353,7 @@ def appraise_agricultural_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -1185,6 +1369,7 @@ def appraise_express_loan(data):
     """
     total_score = Decimal('0')
     reasons = []
+    breakdown = []
 
     loan_amount = Decimal(data.get('loan_amount', '0.00'))
     annual_interest_rate = Decimal(data.get('annual_interest_rate_percent', '0.00'))
@@ -1213,11 +1398,13 @@ def appraise_express_loan(data):
 
     # 1. Loan Duration (25%) - Must not exceed 3 months (0.25 years)
     loan_term_months = loan_term_years * 12
-    if loan_term_months <= EXPRESS_LOAN_MAX_MONTHS:
+    loan_duration_met = loan_term_months <= EXPRESS_LOAN_MAX_MONTHS
+    if loan_duration_met:
         total_score += Decimal('25')
         reasons.append(f"✔ Loan duration ({loan_term_months} months) is within policy (≤ {EXPRESS_LOAN_MAX_MONTHS} months). (+25%)")
     else:
         reasons.append(f"✖ Loan duration ({loan_term_months} months) exceeds maximum for Express Loan (> {EXPRESS_LOAN_MAX_MONTHS} months). (+0%)")
+    _record_criterion(breakdown, 'loan_duration', loan_duration_met, 25)
 
     # 2. Salary Deduction at Source or Standing Order (20%)
     if salary_deducted_at_source_or_standing_order:
@@ -1225,6 +1412,7 @@ def appraise_express_loan(data):
         reasons.append("✔ Salary deducted at source or standing order available. (+20%)")
     else:
         reasons.append("✖ Salary deduction at source or standing order not confirmed. (+0%)")
+    _record_criterion(breakdown, 'salary_deduction_or_standing_order', salary_deducted_at_source_or_standing_order, 20)
 
     # 3. Effective Service Available (15%)
     if effective_service_available:
@@ -1232,6 +1420,7 @@ def appraise_express_loan(data):
         reasons.append("✔ Effective Service document available. (+15%)")
     else:
         reasons.append("✖ Effective Service document not available. (+0%)")
+    _record_criterion(breakdown, 'effective_service', effective_service_available, 15)
 
     # 4. Clearly/Valid Purpose of Loan (10%)
     if clearly_valid_purpose_of_loan:
@@ -1239,6 +1428,7 @@ def appraise_express_loan(data):
         reasons.append("✔ Clearly and valid purpose of loan confirmed. (+10%)")
     else:
         reasons.append("✖ Purpose of loan is not clear or valid. (+0%)")
+    _record_criterion(breakdown, 'clearly_valid_purpose', clearly_valid_purpose_of_loan, 10)
 
     # 5. Savings Balance (10%) - 1/10 or 10% of loan amount
     required_savings_express = loan_amount * EXPRESS_LOAN_SAVINGS_GE_1_10_LOAN_RATIO
@@ -1247,6 +1437,7 @@ def appraise_express_loan(data):
         reasons.append(f"✔ Savings balance is ≥ 1/10 ({EXPRESS_LOAN_SAVINGS_GE_1_10_LOAN_RATIO*100:.0f}%) of the loan amount ({loan_amount:,.0f} XAF). (+10%)")
     else:
         reasons.append(f"✖ Savings balance is < 1/10 ({EXPRESS_LOAN_SAVINGS_GE_1_10_LOAN_RATIO*100:.0f}%) of the loan amount ({loan_amount:,.0f} XAF). (+0%)")
+    _record_criterion(breakdown, 'savings_ge_1_10_loan', savings_balance_ge_1_10_loan, 10)
 
     # 6. No Existing Delinquent Loan (10%)
     if no_existing_delinquent_loan:
@@ -1254,24 +1445,30 @@ def appraise_express_loan(data):
         reasons.append("✔ No existing delinquent loan. (+10%)")
     else:
         reasons.append("✖ Existing delinquent loan detected. (+0%)")
+    _record_criterion(breakdown, 'no_existing_delinquent_loan', no_existing_delinquent_loan, 10)
 
     # 7. KYC (Character - 5%) - Reduced weight for express loans as speed is key
-    if _check_full_kyc(data):
+    full_kyc_met = _check_full_kyc(data)
+    if full_kyc_met:
         total_score += Decimal('5')
         reasons.append("✔ Full KYC (ID, Place of Birth, Address, etc.) Provided. (+5%)")
     else:
         reasons.append("✖ Full KYC (ID, Place of Birth, Address, etc.) Not Fully Provided. (+0%)")
+    _record_criterion(breakdown, 'full_kyc', full_kyc_met, 5)
 
     # 8. DTI (Capacity - 5%) - Express loans might have tighter DTI due to short term
     estimated_net_monthly_income = borrower_gross_monthly_income * Decimal('0.8')
+    dti_met = False
     if estimated_net_monthly_income > Decimal('0'):
         if dti_percentage <= Decimal('35'): # Tighter DTI for short-term, high-turnover loans
             total_score += Decimal('5')
             reasons.append(f"✔ Monthly Repayment ({total_monthly_debt:,.0f} XAF) is ≤ 35% of Estimated Net Income. DTI: {dti_percentage:.1f}%. (+5%)")
+            dti_met = True
         else:
             reasons.append(f"✖ Monthly Repayment ({total_monthly_debt:,.0f} XAF) exceeds 35% of Estimated Net Income. DTI: {dti_percentage:.1f}%. (+0%)")
     else:
         reasons.append("✖ Cannot calculate repayment affordability: Estimated Net Income is zero or negative. (+0%)")
+    _record_criterion(breakdown, 'dti', dti_met, 5)
 
     # --- Cap total_score at 100% ---
     total_score = min(total_score, Decimal('100'))
@@ -1289,6 +1486,7 @@ def appraise_express_loan(data):
         'score': float(total_score),
         'approved': approved_status,
         'reasons': reasons,
+        'breakdown': breakdown,
         'monthly_payment_new_loan': float(monthly_payment_new_loan),
         'total_monthly_debt': float(total_monthly_debt),
         'dti_ratio': float(dti_ratio),
@@ -1296,3 +1494,17 @@ def appraise_express_loan(data):
         'estimated_net_monthly_income': float(estimated_net_monthly_income),
         'loan_amount_to_annual_income_ratio': float(loan_amount_to_annual_income_ratio),
     }
+
+# --- Appraisal function for each LoanApplication.loan_type code ---
+APPRAISAL_FUNCTIONS = {
+    'mortgage': appraise_mortgage_loan,
+    'salary_backed': appraise_salary_backed_loan,
+    'within_savings': appraise_loan_within_savings,
+    'daily_savings': appraise_daily_savings_loan,
+    'standing_order': appraise_standing_order_loan,
+    'real_estate': appraise_real_estate_loan,
+    'container': appraise_container_loan,
+    'agricultural': appraise_agricultural_loan,
+    'express': appraise_express_loan,
+    'business': appraise_business_loan,
+}
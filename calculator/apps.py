@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CalculatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'calculator'
+
+    def ready(self):
+        # Registers the signal receivers (applicant search index)
+        from . import signals  # noqa: F401
@@ -0,0 +1,120 @@
+# calculator/archival.py
+
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    LoanApplication,
+    AppraisalCriterionResult,
+    ArchivedLoanApplication,
+    LOAN_TYPE_MODELS,
+    normalize_identifier,
+)
+
+# Defaults, overridable in settings.py
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+DEFAULT_ARCHIVE_BATCH_SIZE = 500
+
+
+def _snapshot(instance):
+    """
+    Returns every concrete column of a (parent or child) loan instance keyed by attname,
+    e.g. {'id': 1, 'user_id': 3, 'loan_amount': Decimal('1000000.00'), ...}.
+    Datetimes are stored as full ISO strings: DjangoJSONEncoder would drop the microseconds.
+    """
+    snapshot = {}
+    for field in instance._meta.concrete_fields:
+        value = field.value_from_object(instance)
+        snapshot[field.attname] = value.isoformat() if isinstance(value, datetime.datetime) else value
+    return snapshot
+
+
+def archivable_applications(older_than_days=None):
+    """
+    Decided applications (approved or declined) submitted before the archive cutoff.
+    """
+    if older_than_days is None:
+        older_than_days = getattr(settings, 'LOAN_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    cutoff = timezone.now() - datetime.timedelta(days=older_than_days)
+    return LoanApplication.objects.filter(approved__isnull=False, submission_date__lt=cutoff)
+
+
+def _archive_batch(loan_ids):
+    """
+    Copies one batch of applications (parent row, child row and criterion results)
+    into ArchivedLoanApplication and removes them from the hot tables.
+    Must run inside a transaction.
+    """
+    # Load each application through its specific child model so the snapshot holds every field
+    instances = {}
+    type_by_id = dict(LoanApplication.objects.filter(pk__in=loan_ids).values_list('pk', 'loan_type'))
+    ids_by_type = {}
+    for loan_id, loan_type in type_by_id.items():
+        ids_by_type.setdefault(loan_type, []).append(loan_id)
+    for loan_type, type_ids in ids_by_type.items():
+        model = LOAN_TYPE_MODELS.get(loan_type, LoanApplication)
+        for instance in model.objects.filter(pk__in=type_ids):
+            instances[instance.pk] = instance
+    # Parents without a matching child row are archived as plain LoanApplications
+    missing_ids = set(type_by_id) - set(instances)
+    for instance in LoanApplication.objects.filter(pk__in=missing_ids):
+        instances[instance.pk] = instance
+
+    criterion_results = {}
+    for row in AppraisalCriterionResult.objects.filter(application_id__in=loan_ids).values(
+        'application_id', 'criterion', 'passed', 'weight_awarded'
+    ):
+        application_id = row.pop('application_id')
+        criterion_results.setdefault(application_id, []).append(row)
+
+    ArchivedLoanApplication.objects.bulk_create([
+        ArchivedLoanApplication(
+            original_id=instance.pk,
+            source_model=instance._meta.label_lower,
+            loan_type=instance.loan_type,
+            user_id=instance.user_id,
+            credit_union_id=instance.credit_union_id,
+            applicant_name=instance.applicant_name,
+            account_number=instance.account_number,
+            identity_card_number=instance.identity_card_number,
+            identity_key=normalize_identifier(instance.identity_card_number),
+            account_key=normalize_identifier(instance.account_number),
+            loan_amount=instance.loan_amount,
+            appraisal_score=instance.appraisal_score,
+            approved=instance.approved,
+            submission_date=instance.submission_date,
+            data=_snapshot(instance),
+            criterion_results=criterion_results.get(instance.pk, []),
+        )
+        for instance in instances.values()
+    ])
+
+    # Deleting the parent rows cascades to the child tables and the criterion results
+    LoanApplication.objects.filter(pk__in=instances.keys()).delete()
+    return len(instances)
+
+
+def archive_decided_applications(older_than_days=None, batch_size=None):
+    """
+    Moves decided applications older than `older_than_days` (default: settings.LOAN_ARCHIVE_AFTER_DAYS)
+    into ArchivedLoanApplication, one transaction per batch so locks stay short.
+    Returns the total number of applications archived.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'LOAN_ARCHIVE_BATCH_SIZE', DEFAULT_ARCHIVE_BATCH_SIZE)
+
+    total_archived = 0
+    while True:
+        with transaction.atomic():
+            loan_ids = list(
+                archivable_applications(older_than_days)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not loan_ids:
+                break
+            total_archived += _archive_batch(loan_ids)
+    return total_archived
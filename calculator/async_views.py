@@ -0,0 +1,219 @@
+# calculator/async_views.py
+"""
+Native async versions of the submission, quote and listing endpoints, mounted under
+api/calculator/async/ and meant to be served by an ASGI server:
+
+    uvicorn loan_appraiser_project.asgi:application --workers 4
+
+A request waiting on the database no longer holds a worker thread: reads use the
+async ORM, the few sync-only steps (authentication, transactions) run through
+sync_to_async, and the CPU-bound appraisal runs on a bounded thread pool
+(APPRAISAL_EXECUTOR_WORKERS) so it never blocks the event loop. Under WSGI
+(gunicorn) these views still work, Django just runs each one in its own event loop,
+so the sync endpoints remain the right choice there.
+
+`python manage.py benchmark_concurrency` compares both deployments.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.utils.functional import classproperty
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from Authentication.authentication import CachedJWTAuthentication
+
+from .history import prefill_history_criteria
+from .idempotency import idempotent
+from .live import EventStreamRenderer, JWTQueryParamAuthentication, event_stream, parse_cursor
+from .models import LoanApplication
+from .registry import get_loan_product
+from .serializers import LoanApplicationSerializer
+from .views import LoanApplicationSubmitView, LoanQuoteView
+from credit_unions.tenancy import TenantScopedMixin
+
+# Defaults, overridable in settings.py
+DEFAULT_APPRAISAL_EXECUTOR_WORKERS = 4
+
+_appraisal_executor = None
+
+
+def appraisal_executor():
+    """
+    The process-wide pool running appraisals for the async views, created on first use.
+    """
+    global _appraisal_executor
+    if _appraisal_executor is None:
+        _appraisal_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'APPRAISAL_EXECUTOR_WORKERS', DEFAULT_APPRAISAL_EXECUTOR_WORKERS),
+            thread_name_prefix='appraisal',
+        )
+    return _appraisal_executor
+
+
+async def run_appraisal(product, validated_data):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(appraisal_executor(), product.appraise, validated_data)
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines. Authentication, permissions and throttling
+    (APIView.initial, which may query the database, as may the mixins' initial())
+    run through sync_to_async; exceptions are handled as in APIView.dispatch.
+    """
+
+    @classproperty
+    def view_is_async(cls):
+        return True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
+
+
+class AsyncLoanApplicationSubmitView(TenantScopedMixin, AsyncAPIView):
+    """
+    Async counterpart of LoanApplicationSubmitView: async/submit/<loan_type>/.
+    Same validation, appraisal, Idempotency-Key handling, throttling and response.
+    """
+    permission_classes = [IsAuthenticated,]
+    throttle_scope = 'submit'
+
+    save_application = LoanApplicationSubmitView.save_application
+
+    @idempotent
+    async def post(self, request, loan_type, *args, **kwargs):
+        product = get_loan_product(loan_type)
+        if product is None:
+            return Response({'detail': f"Unknown loan type '{loan_type}'."}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = product.serializer_class(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        validated_data = serializer.validated_data
+        if any(criterion not in validated_data for criterion in product.history_criteria):
+            await sync_to_async(prefill_history_criteria)(validated_data, product.history_criteria, request)
+
+        appraisal_results = await run_appraisal(product, validated_data)
+
+        # The parent + child INSERTs and the criterion rows share one transaction,
+        # which has to run in a single (sync) thread
+        loan_instance = await sync_to_async(self.save_application)(serializer, appraisal_results)
+
+        response_data = {
+            'message': 'Loan application successfully submitted and appraised.',
+            'application_id': loan_instance.pk,
+            'appraisal': appraisal_results,
+        }
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+class AsyncLoanQuoteView(AsyncAPIView, LoanQuoteView):
+    """
+    Async counterpart of LoanQuoteView: async/quote/<loan_type>/.
+    """
+
+    async def get(self, request, loan_type, format=None):
+        return await self.quote(request, loan_type, request.query_params)
+
+    async def post(self, request, loan_type, format=None):
+        return await self.quote(request, loan_type, request.data)
+
+    async def quote(self, request, loan_type, data):
+        product, validated_data, error_response = self.validate_quote(request, loan_type, data)
+        if error_response is not None:
+            return error_response
+        quote_key = self.quote_key(product, validated_data)
+        if self.client_has_quote(request, quote_key):
+            return self.quote_response(quote_key)
+
+        cache_key = f'loan-quote:{quote_key}'
+        appraisal_results = await cache.aget(cache_key)
+        if appraisal_results is None:
+            appraisal_results = await run_appraisal(product, validated_data)
+            await cache.aset(cache_key, appraisal_results, timeout=self.max_age())
+        return self.quote_response(quote_key, product, appraisal_results)
+
+
+class AsyncAllLoan(TenantScopedMixin, AsyncAPIView):
+    """
+    Async counterpart of AllLoan: async/all-loan/, read with the async ORM.
+    """
+    permission_classes = [IsAuthenticated,]
+
+    async def get(self, request, format=None):
+        loans_under_review = LoanApplication.objects.for_user(request.user).filter(
+            appraisal_score__isnull=False
+        ).order_by('-submission_date')
+        loans = [loan async for loan in loans_under_review]
+        serializer = LoanApplicationSerializer(loans, many=True)
+        return Response(serializer.data)
+
+
+class ReviewQueueEventsView(TenantScopedMixin, AsyncAPIView):
+    """
+    async/events/: a text/event-stream of the credit union's new, changed and deleted
+    applications (calculator/live.py), so the review queue can patch its table
+    instead of re-fetching all-loan/. ASGI only: under WSGI the stream would hold a
+    worker thread for as long as the page is open.
+
+        const events = new EventSource('/api/calculator/async/events/?access_token=' + token);
+        events.addEventListener('application', (e) => patchRow(JSON.parse(e.data)));
+        events.addEventListener('resync', () => reloadTable());
+
+    Superusers choose the credit union with ?credit_union=<id>. A reconnecting
+    EventSource sends Last-Event-ID and first receives the events it missed.
+    """
+    authentication_classes = [CachedJWTAuthentication, JWTQueryParamAuthentication]
+    permission_classes = [IsAuthenticated,]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    async def get(self, request, format=None):
+        tenant_id = self.tenant_id
+        requested = request.query_params.get('credit_union')
+        if request.user.is_superuser and requested:
+            if not requested.isdigit():
+                return Response({'detail': 'credit_union must be an id.'}, status=status.HTTP_400_BAD_REQUEST)
+            tenant_id = int(requested)
+        if tenant_id is None:
+            return Response({'detail': 'No credit union to follow.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        cursor = parse_cursor(request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id'))
+        response = StreamingHttpResponse(event_stream(tenant_id, cursor), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stops nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,57 @@
+# calculator/criteria.py
+
+from django.db import router, transaction
+from django.db.models import Count, Q, Sum
+
+from .models import AppraisalCriterionResult
+
+
+def save_criterion_results(loan_instance, breakdown):
+    """
+    Bulk-inserts the per-criterion outcomes produced by the appraisal logic
+    (the 'breakdown' list in the appraisal results) for a saved loan application.
+    Any previous rows for the application are replaced, so re-appraising a loan
+    never leaves stale outcomes behind.
+    """
+    rows = [
+        AppraisalCriterionResult(
+            application_id=loan_instance.pk,
+            criterion=item['criterion'],
+            passed=item['passed'],
+            weight_awarded=item['weight_awarded'],
+        )
+        for item in breakdown
+    ]
+    with transaction.atomic(using=router.db_for_write(AppraisalCriterionResult)):
+        AppraisalCriterionResult.objects.filter(application_id=loan_instance.pk).delete()
+        AppraisalCriterionResult.objects.bulk_create(rows)
+    return rows
+
+
+def criterion_outcome_summary(loan_type=None, criterion=None, submitted_from=None, submitted_to=None, applications=None):
+    """
+    Returns pass/fail counts and the total weight awarded per criterion,
+    computed by the database with a single GROUP BY over AppraisalCriterionResult.
+    `applications` optionally restricts it to a LoanApplication queryset (e.g. one tenant).
+    """
+    results = AppraisalCriterionResult.objects.all()
+    if applications is not None:
+        results = results.filter(application__in=applications)
+    if loan_type:
+        results = results.filter(application__loan_type=loan_type)
+    if criterion:
+        results = results.filter(criterion=criterion)
+    if submitted_from:
+        results = results.filter(application__submission_date__date__gte=submitted_from)
+    if submitted_to:
+        results = results.filter(application__submission_date__date__lte=submitted_to)
+
+    return list(
+        results.values('criterion')
+        .annotate(
+            passed_count=Count('id', filter=Q(passed=True)),
+            failed_count=Count('id', filter=Q(passed=False)),
+            total_weight_awarded=Sum('weight_awarded'),
+        )
+        .order_by('criterion')
+    )
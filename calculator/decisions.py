@@ -0,0 +1,117 @@
+# calculator/decisions.py
+
+import json
+from decimal import Decimal
+
+from django.db import NotSupportedError, models, router, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .live import notify_change
+from .models import LoanApplication
+from .signals import loan_cache_scopes
+from loan_appraiser_project.response_cache import invalidate
+
+# decision -> (approved, appraisal_score, default comment), as in views3.approve_loan / decline_loan
+DECISIONS = {
+    'approve': (True, Decimal('100.00'), "Manually approved by reviewer."),
+    'decline': (False, Decimal('0.00'), "Manually declined by reviewer."),
+}
+
+
+class JSONArrayAppend(models.Func):
+    """
+    `array` with `item` appended, computed by the database so an UPDATE can extend
+    every row's JSON list in place (SQLite json_insert, PostgreSQL ||, MySQL JSON_ARRAY_APPEND).
+    """
+    output_field = models.JSONField()
+
+    def __init__(self, array, item, **extra):
+        super().__init__(array, models.Value(json.dumps(item), output_field=models.TextField()), **extra)
+
+    def _compile_args(self, compiler):
+        array_sql, array_params = compiler.compile(self.source_expressions[0])
+        item_sql, item_params = compiler.compile(self.source_expressions[1])
+        return array_sql, item_sql, (*array_params, *item_params)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        array_sql, item_sql, params = self._compile_args(compiler)
+        return f"json_insert(COALESCE({array_sql}, '[]'), '$[#]', json({item_sql}))", params
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        array_sql, item_sql, params = self._compile_args(compiler)
+        return f"(COALESCE({array_sql}, '[]'::jsonb) || jsonb_build_array(({item_sql})::jsonb))", params
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        array_sql, item_sql, params = self._compile_args(compiler)
+        return f"JSON_ARRAY_APPEND(COALESCE({array_sql}, JSON_ARRAY()), '$', CAST({item_sql} AS JSON))", params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"JSONArrayAppend is not implemented for {connection.vendor}.")
+
+
+def decide_applications(applications, ids, decision, reason=None, comment=None):
+    """
+    Applies a manual decision ('approve' or 'decline') to the applications of
+    `applications` (e.g. the reviewer's tenant) whose id is in `ids`, with a single
+    UPDATE. Applications that already carry the decision are left untouched.
+
+    Approving clears the reasons, like views3.approve_loan; declining appends
+    {'reason': reason} (default: the decline comment) inside the UPDATE itself.
+    Returns {'updated': [ids], 'unchanged': [ids], 'not_found': [ids]}.
+    """
+    approved, score, default_comment = DECISIONS[decision]
+    ids = list(dict.fromkeys(ids))
+    using = router.db_for_write(LoanApplication)
+
+    with transaction.atomic(using=using):
+        rows = list(
+            applications.using(using).select_for_update()
+            .filter(pk__in=ids)
+            .values_list('pk', 'approved', 'credit_union_id', 'user_id')
+        )
+        to_update = [pk for pk, current, _, _ in rows if current is not approved]
+        found = {pk for pk, _, _, _ in rows}
+
+        if to_update:
+            values = {
+                'approved': approved,
+                'appraisal_score': score,
+                'approver_comments': comment or default_comment,
+                # update() bypasses auto_now; conditional GETs rely on updated_at
+                'updated_at': timezone.now(),
+            }
+            if approved:
+                values['reasons'] = []
+            else:
+                values['reasons'] = JSONArrayAppend('reasons', {'reason': reason or default_comment})
+            LoanApplication.objects.using(using).filter(pk__in=to_update).update(**values)
+            # update() sends no signals: invalidate the cached read responses here
+            changed = set(to_update)
+            invalidate(
+                *{scope for pk, _, credit_union_id, user_id in rows if pk in changed
+                  for scope in loan_cache_scopes(credit_union_id, user_id)},
+                using=using,
+            )
+            for credit_union_id in {credit_union_id for pk, _, credit_union_id, _ in rows if pk in changed}:
+                if credit_union_id is not None:
+                    transaction.on_commit(lambda credit_union_id=credit_union_id: notify_change(credit_union_id), using=using)
+
+    updated = set(to_update)
+    return {
+        'updated': to_update,
+        'unchanged': [pk for pk in ids if pk in found and pk not in updated],
+        'not_found': [pk for pk in ids if pk not in found],
+    }
+
+
+def decision_totals(applications):
+    """
+    Approved / declined / pending counts of `applications`, in one aggregate query.
+    """
+    totals = applications.aggregate(
+        approved_count=Count('pk', filter=Q(approved=True)),
+        declined_count=Count('pk', filter=Q(approved=False)),
+        pending_count=Count('pk', filter=Q(approved__isnull=True)),
+    )
+    return {'approved': totals['approved_count'], 'declined': totals['declined_count'], 'pending': totals['pending_count']}
@@ -0,0 +1,96 @@
+# calculator/filters.py
+"""
+Filters of the portfolio listing (api/calculator/loans/).
+
+Every filter is answered by an index led by credit_union, since listings are
+always scoped to the caller's tenant (LoanApplication.objects.for_user). The
+equality filters' indexes end with the listing's ordering (-submission_date, -id),
+so the first page is read in order without sorting the tenant's matches:
+
+    loan_type, approved      calc_loan_cu_type_idx / calc_loan_cu_approved_idx
+    score_min, score_max     calc_loan_cu_score_idx
+    amount_min, amount_max   calc_loan_cu_amount_idx
+    date_of_loan_after/before calc_loan_cu_loan_date_idx
+    profession, location     calc_loan_cu_profession_idx / calc_loan_cu_location_idx
+                             (case-insensitive, on LOWER(...))
+    credit_union             calc_loan_cu_submitted_idx (superusers; others are scoped anyway)
+
+`python manage.py explain_loan_filters` prints the query plan of each filter and
+fails when one of them is not served by its index (calculator/tests.py checks the
+same plans on seeded data).
+"""
+
+import django_filters
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+from django_filters.constants import EMPTY_VALUES
+
+from .models import LoanApplication
+
+APPROVAL_STATES = [
+    ('true', 'Approved'),
+    ('false', 'Declined'),
+    ('pending', 'Pending'),
+]
+
+
+class LowerExactFilter(django_filters.CharFilter):
+    """
+    Case-insensitive equality written as LOWER(field) = 'value', the expression
+    indexed on the model (iexact compiles to LIKE on SQLite, which no index serves).
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return qs.filter(Exact(Lower(self.field_name), value.strip().lower()))
+
+
+class LoanApplicationFilter(django_filters.FilterSet):
+    loan_type = django_filters.ChoiceFilter(choices=LoanApplication.LOAN_TYPES)
+    approved = django_filters.ChoiceFilter(choices=APPROVAL_STATES, method='filter_approved')
+    score_min = django_filters.NumberFilter(field_name='appraisal_score', lookup_expr='gte')
+    score_max = django_filters.NumberFilter(field_name='appraisal_score', lookup_expr='lte')
+    amount_min = django_filters.NumberFilter(field_name='loan_amount', lookup_expr='gte')
+    amount_max = django_filters.NumberFilter(field_name='loan_amount', lookup_expr='lte')
+    date_of_loan = django_filters.DateFromToRangeFilter()
+    credit_union = django_filters.NumberFilter(field_name='credit_union_id')
+    profession = LowerExactFilter(field_name='profession')
+    location = LowerExactFilter(field_name='current_location')
+
+    class Meta:
+        model = LoanApplication
+        fields = []
+
+    def filter_approved(self, queryset, name, value):
+        if value == 'pending':
+            return queryset.filter(approved__isnull=True)
+        return queryset.filter(approved=(value == 'true'))
+
+
+# Sample filters of the listing -> indexes that may serve them
+FILTER_INDEXES = [
+    ({'loan_type': 'mortgage'}, ('calc_loan_cu_type_idx',)),
+    ({'loan_type': 'mortgage', 'approved': 'true'}, ('calc_loan_cu_type_idx', 'calc_loan_cu_approved_idx')),
+    ({'approved': 'pending'}, ('calc_loan_cu_approved_idx',)),
+    ({'score_min': '50', 'score_max': '80'}, ('calc_loan_cu_score_idx',)),
+    ({'amount_min': '500000', 'amount_max': '2000000'}, ('calc_loan_cu_amount_idx',)),
+    ({'date_of_loan_after': '2024-01-01', 'date_of_loan_before': '2024-03-31'}, ('calc_loan_cu_loan_date_idx',)),
+    ({'profession': 'Teacher'}, ('calc_loan_cu_profession_idx',)),
+    ({'location': 'Douala'}, ('calc_loan_cu_location_idx',)),
+    ({}, ('calc_loan_cu_submitted_idx',)),
+]
+
+
+def explain_filters(queryset, ordering, page_size):
+    """
+    Yields (label, query plan, expected index names, served by one of them) for every
+    FILTER_INDEXES sample, planning the first page as the listing runs it.
+    """
+    for params, index_names in FILTER_INDEXES:
+        filterset = LoanApplicationFilter(params, queryset=queryset)
+        if not filterset.is_valid():
+            raise ValueError(f"Invalid sample filter {params}: {filterset.errors}")
+        plan = filterset.qs.order_by(*ordering)[:page_size + 1].explain()
+        label = '&'.join(f'{key}={value}' for key, value in params.items()) or '(no filter)'
+        yield label, plan, index_names, any(index_name in plan for index_name in index_names)
@@ -0,0 +1,231 @@
+# calculator/history.py
+
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Q
+
+from .appraisal_logic import calculate_outstanding_balance
+from .models import ArchivedLoanApplication, LoanApplication, normalize_identifier
+
+# Criteria that can be derived from an applicant's previous applications
+HISTORY_CRITERIA = ('positive_loan_repayment_history', 'no_existing_npl', 'no_existing_delinquent_loan')
+
+HISTORY_FIELDS = (
+    'pk', 'loan_type', 'loan_amount', 'annual_interest_rate_percent', 'loan_term_years',
+    'date_of_loan', 'submission_date', 'approved', 'appraisal_score', 'credit_union_id',
+)
+# Columns of ArchivedLoanApplication; the other HISTORY_FIELDS come from its snapshot
+ARCHIVED_HISTORY_FIELDS = (
+    'original_id', 'loan_type', 'loan_amount', 'submission_date', 'approved', 'appraisal_score', 'credit_union_id', 'data',
+)
+
+
+def _months_between(start, end):
+    return (end.year - start.year) * 12 + (end.month - start.month) - (end.day < start.day)
+
+
+def _maturity_date(date_of_loan, loan_term_years):
+    try:
+        return date_of_loan.replace(year=date_of_loan.year + loan_term_years)
+    except ValueError:  # 29 February
+        return date_of_loan.replace(year=date_of_loan.year + loan_term_years, day=28)
+
+
+def _archived_rows(archived_applications, match, extra_fields=()):
+    """
+    History rows of archived applications, shaped like the LoanApplication ones.
+    """
+    rows = []
+    for archived in archived_applications.filter(match).values(*ARCHIVED_HISTORY_FIELDS, *extra_fields):
+        data = archived.pop('data')
+        row = {'pk': archived.pop('original_id'), **archived}
+        for name in ('annual_interest_rate_percent', 'loan_term_years', 'date_of_loan'):
+            row[name] = LoanApplication._meta.get_field(name).to_python(data.get(name))
+        rows.append(row)
+    return rows
+
+
+def _history_rows(applications, archived_applications, match, extra_fields=()):
+    """
+    Live and archived applications matching `match`: one query on each table.
+    """
+    rows = list(applications.filter(match).values(*HISTORY_FIELDS, *extra_fields))
+    for row in rows:
+        row['archived'] = False
+    for row in _archived_rows(archived_applications, match, extra_fields):
+        row['archived'] = True
+        rows.append(row)
+    return rows
+
+
+def _history_cache(request):
+    cache = getattr(request, '_applicant_history_cache', None)
+    if cache is None:
+        cache = request._applicant_history_cache = {}
+    return cache
+
+
+def _summarize_history(identity_key, account_key, rows, today):
+    rows.sort(key=lambda row: row['submission_date'], reverse=True)
+    active_loans = completed_loans = 0
+    outstanding_amount = Decimal('0')
+    for row in rows:
+        row['outstanding_amount'] = Decimal('0')
+        row['maturity_date'] = None
+        if row['approved'] is not True:
+            continue
+        row['maturity_date'] = _maturity_date(row['date_of_loan'], row['loan_term_years'])
+        if row['maturity_date'] <= today:
+            completed_loans += 1
+            continue
+        active_loans += 1
+        balance = calculate_outstanding_balance(
+            row['loan_amount'],
+            row['annual_interest_rate_percent'],
+            row['loan_term_years'],
+            _months_between(row['date_of_loan'], today),
+        )
+        row['outstanding_amount'] = balance.quantize(Decimal('0.01'))
+        outstanding_amount += row['outstanding_amount']
+
+    return {
+        'identity_key': identity_key,
+        'account_key': account_key,
+        'applications': rows,
+        'total_applications': len(rows),
+        'approved_count': sum(1 for row in rows if row['approved'] is True),
+        'declined_count': sum(1 for row in rows if row['approved'] is False),
+        'pending_count': sum(1 for row in rows if row['approved'] is None),
+        'active_loans': active_loans,
+        'completed_loans': completed_loans,
+        'outstanding_amount': outstanding_amount,
+        # The MFI records loans, not individual repayments: a loan that ran to maturity
+        # counts as repaid, and only borrowers with no loan still running are credited
+        # with "no NPL / no delinquent loan". First-time applicants (no approved loan on
+        # record) are not credited either way. Officers can still tick these by hand.
+        'criteria': {
+            'positive_loan_repayment_history': completed_loans > 0,
+            'no_existing_npl': completed_loans > 0 and active_loans == 0,
+            'no_existing_delinquent_loan': completed_loans > 0 and active_loans == 0,
+        },
+    }
+
+
+def applicant_history(identity_card_number=None, account_number=None, request=None, today=None,
+                      applications=None, archived_applications=None):
+    """
+    Returns the previous applications of an applicant matched on the normalized
+    identity card number OR account number, with their outcomes and the outstanding
+    principal of approved loans: one indexed query on LoanApplication and one on
+    ArchivedLoanApplication, where decided loans end up (calculator/archival.py).
+
+    When `request` is given the result is cached on it, so several criteria (or
+    several loan types in one request) share the same lookup. `applications` and
+    `archived_applications` restrict the lookup to querysets of those models
+    (e.g. the user's tenant).
+    """
+    identity_key = normalize_identifier(identity_card_number)
+    account_key = normalize_identifier(account_number)
+    today = today or datetime.date.today()
+
+    cache = None
+    if request is not None:
+        cache = _history_cache(request)
+        if (identity_key, account_key) in cache:
+            return cache[(identity_key, account_key)]
+
+    match = Q()
+    if identity_key:
+        match |= Q(identity_key=identity_key)
+    if account_key:
+        match |= Q(account_key=account_key)
+    if applications is None:
+        applications = LoanApplication.objects.all()
+    if archived_applications is None:
+        archived_applications = ArchivedLoanApplication.objects.all()
+    rows = _history_rows(applications, archived_applications, match) if match else []
+
+    history = _summarize_history(identity_key, account_key, rows, today)
+    if cache is not None:
+        cache[(identity_key, account_key)] = history
+    return history
+
+
+def prefetch_applicant_history(applicants, request, today=None, applications=None, archived_applications=None):
+    """
+    Loads the histories of many applicants into the request cache of
+    applicant_history, e.g. for a batch submission: one query on LoanApplication
+    and one on ArchivedLoanApplication for the whole batch (identity_key IN ...
+    OR account_key IN ...) instead of two per applicant. `applicants` are
+    (identity_card_number, account_number) pairs.
+    """
+    today = today or datetime.date.today()
+    cache = _history_cache(request)
+    keys = {(normalize_identifier(identity), normalize_identifier(account)) for identity, account in applicants}
+    keys -= cache.keys()
+    identity_keys = {identity_key for identity_key, _ in keys if identity_key}
+    account_keys = {account_key for _, account_key in keys if account_key}
+
+    match = Q()
+    if identity_keys:
+        match |= Q(identity_key__in=identity_keys)
+    if account_keys:
+        match |= Q(account_key__in=account_keys)
+    if applications is None:
+        applications = LoanApplication.objects.all()
+    if archived_applications is None:
+        archived_applications = ArchivedLoanApplication.objects.all()
+    rows = _history_rows(applications, archived_applications, match, ('identity_key', 'account_key')) if match else []
+
+    by_identity, by_account = defaultdict(list), defaultdict(list)
+    for row in rows:
+        by_identity[row.pop('identity_key')].append(row)
+        by_account[row.pop('account_key')].append(row)
+    for identity_key, account_key in keys:
+        matched = {id(row): row for row in by_identity[identity_key]} if identity_key else {}
+        if account_key:
+            matched.update((id(row), row) for row in by_account[account_key])
+        # Copies: an application can belong to several applicants' histories
+        rows = [dict(row) for row in matched.values()]
+        cache[(identity_key, account_key)] = _summarize_history(identity_key, account_key, rows, today)
+
+
+def prefill_history_criteria(validated_data, criteria, request=None):
+    """
+    Sets history-based criteria the officer did not submit (e.g. 'no_existing_npl')
+    from the applicant's previous applications. Values sent explicitly are kept.
+    """
+    missing = [criterion for criterion in criteria if criterion not in validated_data]
+    if not missing:
+        return validated_data
+    history = applicant_history(
+        identity_card_number=validated_data.get('identity_card_number'),
+        account_number=validated_data.get('account_number'),
+        request=request,
+        applications=LoanApplication.objects.for_user(request.user) if request is not None else None,
+        archived_applications=ArchivedLoanApplication.objects.for_user(request.user) if request is not None else None,
+    )
+    for criterion in missing:
+        validated_data[criterion] = history['criteria'][criterion]
+    return validated_data
+
+
+def prefetch_history_criteria(entries, request):
+    """
+    Batch counterpart of prefill_history_criteria: `entries` are (validated_data,
+    criteria) pairs, and the histories of the applicants with criteria left to
+    prefill are loaded together, so the per-item prefill reads the request cache.
+    """
+    applicants = [
+        (validated_data.get('identity_card_number'), validated_data.get('account_number'))
+        for validated_data, criteria in entries
+        if any(criterion not in validated_data for criterion in criteria)
+    ]
+    prefetch_applicant_history(
+        applicants,
+        request,
+        applications=LoanApplication.objects.for_user(request.user),
+        archived_applications=ArchivedLoanApplication.objects.for_user(request.user),
+    )
@@ -0,0 +1,187 @@
+# calculator/idempotency.py
+"""
+Idempotency-Key support for the submission endpoints.
+
+A client that sends `Idempotency-Key: <any unique string>` with a POST to submit/*
+can retry it safely: the first request claims the key (a unique row in
+IdempotencyKey), and every retry with the same key gets the stored response back
+without validating, appraising or inserting anything again.
+
+- A retry arriving while the first request is still running gets 409 + Retry-After.
+- Reusing a key with a different body gets 422.
+- Server errors (5xx) release the key, so the client can retry for real.
+- Keys expire after IDEMPOTENCY_KEY_TTL_SECONDS; expired rows are replaced on
+  reuse and removed by `python manage.py purge_idempotency_keys`.
+"""
+
+import datetime
+import functools
+import hashlib
+import inspect
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# Defaults, overridable in settings.py
+DEFAULT_IDEMPOTENCY_KEY_TTL_SECONDS = 24 * 60 * 60
+
+
+def _digest(value):
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def request_fingerprint(request):
+    """
+    Digest of the endpoint and the parsed body, used to reject a key reused for a different request.
+    """
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return _digest(f'{request.path}\n{body}')
+
+
+def claim_key(user, key_hash, request_hash):
+    """
+    Inserts the key row, relying on the (user, key_hash) unique constraint so only one
+    of several concurrent requests wins. Returns (record, claimed); when claimed is
+    False, record is the row stored by the request that came first.
+    """
+    using = router.db_for_write(IdempotencyKey)
+    ttl = getattr(settings, 'IDEMPOTENCY_KEY_TTL_SECONDS', DEFAULT_IDEMPOTENCY_KEY_TTL_SECONDS)
+    while True:
+        now = timezone.now()
+        try:
+            with transaction.atomic(using=using):
+                record = IdempotencyKey.objects.using(using).create(
+                    user=user,
+                    key_hash=key_hash,
+                    request_hash=request_hash,
+                    expires_at=now + datetime.timedelta(seconds=ttl),
+                )
+            return record, True
+        except IntegrityError:
+            pass
+
+        record = IdempotencyKey.objects.using(using).filter(user=user, key_hash=key_hash).first()
+        if record is None:
+            # Released (5xx) between our insert and this read: try again
+            continue
+        if record.expires_at > now:
+            return record, False
+        # Expired: remove it (only if nobody else did in the meantime) and claim it afresh
+        IdempotencyKey.objects.using(using).filter(pk=record.pk, expires_at__lte=now).delete()
+
+
+def _begin(request):
+    """
+    Returns (record, response). `response` is set when the handler must not run
+    (invalid key, replay, duplicate in progress, key reused); `record` is the
+    freshly claimed key, or None for requests without the header.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return None, None
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return None, Response(
+            {'detail': f'{IDEMPOTENCY_HEADER} must be between 1 and {MAX_KEY_LENGTH} characters.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    request_hash = request_fingerprint(request)
+    record, claimed = claim_key(request.user, _digest(key), request_hash)
+    if claimed:
+        return record, None
+    if record.request_hash != request_hash:
+        return None, Response(
+            {'detail': f'This {IDEMPOTENCY_HEADER} was already used for a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if record.status_code is None:
+        response = Response(
+            {'detail': 'A request with this Idempotency-Key is still being processed.'},
+            status=status.HTTP_409_CONFLICT
+        )
+        response['Retry-After'] = '1'
+        return None, response
+    response = Response(record.response_body, status=record.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return None, response
+
+
+def _finish(record, response):
+    # Server errors release the key so the client can retry for real
+    if response.status_code >= 500:
+        record.delete()
+        return
+    IdempotencyKey.objects.using(record._state.db).filter(pk=record.pk).update(
+        status_code=response.status_code,
+        response_body=response.data,
+    )
+
+
+def idempotent(handler):
+    """
+    Decorator for APIView POST handlers, sync or async (calculator/async_views.py).
+    Requests without the header are untouched.
+    """
+    if inspect.iscoroutinefunction(handler):
+        @functools.wraps(handler)
+        async def async_wrapper(self, request, *args, **kwargs):
+            record, response = await sync_to_async(_begin)(request)
+            if response is not None:
+                return response
+            if record is None:
+                return await handler(self, request, *args, **kwargs)
+            # The async handler's writes run in their own transaction, so the response
+            # is stored right after it instead of inside the same transaction
+            try:
+                response = await handler(self, request, *args, **kwargs)
+            except Exception:
+                await sync_to_async(record.delete)()
+                raise
+            await sync_to_async(_finish)(record, response)
+            return response
+        return async_wrapper
+
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        record, response = _begin(request)
+        if response is not None:
+            return response
+        if record is None:
+            return handler(self, request, *args, **kwargs)
+
+        # The application rows and the stored response commit together, so a crash
+        # can never leave a saved application behind a key that would run it again
+        using = record._state.db
+        try:
+            with transaction.atomic(using=using):
+                response = handler(self, request, *args, **kwargs)
+                if response.status_code >= 500:
+                    transaction.set_rollback(True, using=using)
+                else:
+                    _finish(record, response)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            _finish(record, response)
+        return response
+    return wrapper
+
+
+def purge_expired_keys(using=None):
+    """
+    Deletes expired keys; returns how many were removed.
+    """
+    using = using or router.db_for_write(IdempotencyKey)
+    deleted, _ = IdempotencyKey.objects.using(using).filter(expires_at__lte=timezone.now()).delete()
+    return deleted
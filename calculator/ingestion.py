@@ -0,0 +1,224 @@
+# calculator/ingestion.py
+
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+
+from .appraisal_logic import APPRAISAL_FUNCTIONS
+from .models import LoanApplication, AppraisalCriterionResult, LOAN_TYPE_MODELS
+from .search import index_applications
+from .signals import loan_cache_scopes
+from loan_appraiser_project.response_cache import invalidate
+from credit_unions.tenancy import tenant_id_for_user
+
+DEFAULT_INGEST_BATCH_SIZE = 1000
+
+# Fields computed by the appraisal (or by the database) that incoming rows may not set
+SYSTEM_FIELDS = {
+    'id', 'loanapplication_ptr_id', 'loan_type', 'appraisal_score', 'approved', 'reasons', 'approver_comments',
+    'identity_key', 'account_key', 'deleted_at',
+}
+
+
+def appraisal_input_from_instance(loan_instance):
+    """
+    Builds the dictionary expected by the appraisal_logic functions from an
+    (unsaved or saved) loan-type specific instance, without touching the database.
+    """
+    data = {field.name: getattr(loan_instance, field.attname) for field in loan_instance._meta.concrete_fields}
+    data['loan_purpose_document'] = loan_instance.loan_purpose
+    return data
+
+
+def apply_appraisal_results(loan_instance, appraisal_results):
+    """
+    Copies the appraisal outcome onto the instance, the same way perform_automated_appraisal does.
+    """
+    loan_instance.appraisal_score = Decimal(str(appraisal_results['score']))
+    loan_instance.approved = appraisal_results['approved']
+    loan_instance.reasons = [{'reason': r} for r in appraisal_results['reasons']]
+    if loan_instance.approved is True:
+        loan_instance.approver_comments = "Automated approval based on appraisal logic."
+    elif loan_instance.approved is False:
+        loan_instance.approver_comments = "Automated rejection based on appraisal logic."
+    else:
+        loan_instance.approver_comments = "Requires manual board review based on appraisal logic."
+
+
+def prepare_application(loan_instance, user=None, credit_union=None):
+    """
+    Fills in what LoanApplication.save() would on an unsaved instance headed for a bulk
+    insert: the submitting user, their credit union and the history lookup keys.
+    """
+    if user is not None and loan_instance.user_id is None:
+        loan_instance.user = user
+    if credit_union is not None and loan_instance.credit_union_id is None:
+        loan_instance.credit_union = credit_union
+    if loan_instance.credit_union_id is None and user is not None:
+        # Same rule as LoanApplication.save(): the submitting user's credit union
+        loan_instance.credit_union_id = tenant_id_for_user(user)
+    loan_instance.refresh_identity_keys()
+    return loan_instance
+
+
+def build_application(row, user=None, credit_union=None, validate=True):
+    """
+    Turns one incoming row (a dict with a 'loan_type' key plus model field values)
+    into an unsaved, appraised loan-type specific instance.
+    Unknown keys are ignored; raises ValidationError for bad input.
+    """
+    loan_type = row.get('loan_type')
+    model = LOAN_TYPE_MODELS.get(loan_type)
+    if model is None:
+        raise ValidationError({'loan_type': [f"Unknown loan type: {loan_type!r}"]})
+
+    allowed = {}
+    for field in model._meta.concrete_fields:
+        if field.attname in SYSTEM_FIELDS:
+            continue
+        if field.name in row:
+            allowed[field.attname if field.is_relation else field.name] = row[field.name]
+        elif field.attname in row:
+            allowed[field.attname] = row[field.attname]
+
+    loan_instance = prepare_application(model(loan_type=loan_type, **allowed), user=user, credit_union=credit_union)
+    if validate:
+        # clean_fields() also converts raw strings (CSV, JSON) to Decimal/date/bool values
+        loan_instance.clean_fields(exclude=['user', 'credit_union'])
+
+    appraisal_results = APPRAISAL_FUNCTIONS[loan_type](appraisal_input_from_instance(loan_instance))
+    apply_appraisal_results(loan_instance, appraisal_results)
+    return loan_instance, appraisal_results
+
+
+def _bulk_insert_children(model, instances, using):
+    """
+    Inserts the child-table rows of multi-table inheritance instances whose parent
+    rows already exist. Django's bulk_create refuses MTI children, so this issues
+    a single executemany INSERT over the child model's local columns.
+    """
+    connection = connections[using]
+    fields = model._meta.local_concrete_fields
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    rows = [
+        [field.get_db_prep_save(field.pre_save(instance, True), connection) for field in fields]
+        for instance in instances
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', rows)
+
+
+def _bulk_insert_applications(instances, using):
+    """
+    Parent rows with one bulk_create, then the child rows per loan type.
+    Needs a backend that returns the primary keys of a bulk insert.
+    """
+    parent_fields = LoanApplication._meta.concrete_fields
+    parents = [
+        LoanApplication(**{field.attname: getattr(instance, field.attname) for field in parent_fields})
+        for instance in instances
+    ]
+    LoanApplication.objects.using(using).bulk_create(parents)
+
+    for instance, parent in zip(instances, parents):
+        instance.id = parent.pk
+        instance.loanapplication_ptr_id = parent.pk
+        instance.submission_date = parent.submission_date
+        instance.updated_at = parent.updated_at
+        instance._state.adding = False
+        instance._state.db = using
+
+    by_model = {}
+    for instance in instances:
+        by_model.setdefault(type(instance), []).append(instance)
+    for model, model_instances in by_model.items():
+        _bulk_insert_children(model, model_instances, using)
+    # bulk inserts send no post_save, so the applicant search index is filled here
+    index_applications(instances, using=using)
+
+
+def _insert_batch(instances, breakdowns, using):
+    """
+    Writes one batch of appraised instances: the applications, then the criterion
+    results. Backends without INSERT ... RETURNING (MySQL) would leave bulk_create's
+    primary keys unset, so there the applications are saved one by one.
+    """
+    # Keep an original submission_date (e.g. from a legacy system) instead of auto_now_add's "now"
+    original_dates = [instance.submission_date for instance in instances]
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        _bulk_insert_applications(instances, using)
+    else:
+        for instance in instances:
+            # post_save indexes the applicant for search
+            instance.save(using=using, force_insert=True)
+
+    backdated = []
+    for instance, submission_date in zip(instances, original_dates):
+        if submission_date is not None:
+            instance.submission_date = submission_date
+            backdated.append(instance)
+    if backdated:
+        LoanApplication.objects.using(using).bulk_update(
+            [LoanApplication(pk=instance.pk, submission_date=instance.submission_date) for instance in backdated],
+            ['submission_date'],
+        )
+
+    AppraisalCriterionResult.objects.using(using).bulk_create([
+        AppraisalCriterionResult(application_id=instance.pk, **item)
+        for instance, breakdown in zip(instances, breakdowns)
+        for item in breakdown
+    ])
+    # ... and the cached read responses showing these tenants are invalidated here
+    invalidate(
+        *{scope for instance in instances for scope in loan_cache_scopes(instance.credit_union_id, instance.user_id)},
+        using=using,
+    )
+
+
+def save_appraised_applications(appraised, batch_size=None):
+    """
+    Bulk-inserts already validated and appraised instances, given as
+    [(loan_instance, appraisal_results), ...], in one transaction. Parent and child rows
+    are written with one multi-row INSERT per table and batch instead of two INSERTs per
+    application (on backends returning bulk-inserted primary keys); primary keys are set
+    on the instances.
+    """
+    batch_size = batch_size or DEFAULT_INGEST_BATCH_SIZE
+    using = router.db_for_write(LoanApplication)
+
+    with transaction.atomic(using=using):
+        for start in range(0, len(appraised), batch_size):
+            batch = appraised[start:start + batch_size]
+            _insert_batch(
+                [loan_instance for loan_instance, _ in batch],
+                [appraisal_results['breakdown'] for _, appraisal_results in batch],
+                using,
+            )
+
+
+def ingest_applications(rows, user=None, credit_union=None, batch_size=None, validate=True):
+    """
+    Validates, appraises and inserts many loan applications of any type in one transaction.
+
+    Each row is a dict with a 'loan_type' key plus field values. Returns
+    {'created': [(row_index, instance, appraisal_results), ...],
+    'errors': {row_index: {field: [messages]}}}; rows with errors are skipped.
+    """
+    created = []
+    errors = {}
+    for index, row in enumerate(rows):
+        try:
+            loan_instance, appraisal_results = build_application(row, user=user, credit_union=credit_union, validate=validate)
+        except ValidationError as exc:
+            errors[index] = exc.message_dict
+            continue
+        created.append((index, loan_instance, appraisal_results))
+
+    save_appraised_applications(
+        [(loan_instance, appraisal_results) for _, loan_instance, appraisal_results in created],
+        batch_size=batch_size,
+    )
+    return {'created': created, 'errors': errors}
@@ -0,0 +1,267 @@
+# calculator/live.py
+"""
+Live review-queue events for the server-sent events stream (async/events/, ASGI only).
+
+Each process keeps one TenantChangeFeed per credit union with open streams. The
+feed polls the database for rows whose updated_at moved past its cursor, one
+indexed query (credit_union, updated_at) per tenant per LIVE_EVENTS_POLL_SECONDS
+however many officers are connected, and fans the compact events out to every
+stream of that tenant. A save or delete in the same process wakes the feed at
+once (after commit); changes made by other processes or with update() arrive
+with the next poll.
+
+Events carry the row's cursor as the SSE id, so a reconnecting EventSource
+(Last-Event-ID) receives what it missed.
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.renderers import BaseRenderer
+from Authentication.authentication import CachedJWTAuthentication
+
+from .models import LoanApplication
+from loan_appraiser_project.db_routing import tenant_context
+
+# Defaults, overridable in settings.py
+DEFAULT_LIVE_EVENTS_POLL_SECONDS = 2
+DEFAULT_LIVE_EVENTS_KEEPALIVE_SECONDS = 15
+
+EVENT_FIELDS = (
+    'pk', 'loan_type', 'applicant_name', 'loan_amount', 'appraisal_score', 'approved',
+    'submission_date', 'updated_at', 'deleted_at',
+)
+# Most events read by one query; polls and catch-ups page through larger backlogs
+MAX_EVENTS_PER_POLL = 500
+# Events buffered per stream before a slow client is told to reload instead
+MAX_QUEUED_EVENTS = 1000
+# How far back each poll looks again for rows committed after newer ones
+LATE_COMMIT_WINDOW = datetime.timedelta(seconds=5)
+# A row saved within this long of its submission is reported as new
+CREATED_WINDOW = datetime.timedelta(seconds=1)
+# Longest wait between retries while polls keep failing (database down, lock timeouts)
+MAX_POLL_BACKOFF_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+_feeds = {}
+
+
+def format_cursor(updated_at, pk):
+    return f'{updated_at.isoformat()}|{pk}'
+
+
+def parse_cursor(value):
+    """
+    (updated_at, pk) from an event id, or None when missing or malformed.
+    """
+    if not value or '|' not in value:
+        return None
+    timestamp, _, pk = value.rpartition('|')
+    updated_at = parse_datetime(timestamp)
+    if updated_at is None or not pk.isdigit():
+        return None
+    return updated_at, int(pk)
+
+
+def compact_event(row):
+    if row['deleted_at'] is not None:
+        change = 'deleted'
+    elif row['updated_at'] - row['submission_date'] < CREATED_WINDOW:
+        change = 'created'
+    else:
+        change = 'updated'
+    return {
+        'cursor': format_cursor(row['updated_at'], row['pk']),
+        'id': row['pk'],
+        'change': change,
+        'loan_type': row['loan_type'],
+        'applicant_name': row['applicant_name'],
+        'loan_amount': row['loan_amount'],
+        'appraisal_score': row['appraisal_score'],
+        'approved': row['approved'],
+        'submission_date': row['submission_date'],
+    }
+
+
+async def fetch_changes(tenant_id, cursor):
+    """
+    Compact events for the tenant's applications changed after `cursor`, oldest first.
+    Streams outlive the request's tenant context, so the tenant is set here for routing.
+    """
+    updated_at, pk = cursor
+    with tenant_context(tenant_id):
+        rows = (
+            LoanApplication.all_objects.filter(credit_union_id=tenant_id)
+            .filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk))
+            .order_by('updated_at', 'pk')
+            .values(*EVENT_FIELDS)[:MAX_EVENTS_PER_POLL]
+        )
+        return [compact_event(row) async for row in rows]
+
+
+def format_event(event):
+    if event['change'] == 'resync':
+        return 'event: resync\ndata: {}\n\n'
+    return f"id: {event['cursor']}\nevent: application\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+
+
+class TenantChangeFeed:
+    """
+    Polls one credit union's changes while at least one stream is subscribed.
+    Lives on the event loop that created it.
+    """
+
+    def __init__(self, tenant_id):
+        self.tenant_id = tenant_id
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.subscribers = set()
+        self.task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=MAX_QUEUED_EVENTS)
+        self.subscribers.add(queue)
+        if self.task is None:
+            self.task = self.loop.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            _feeds.pop((id(self.loop), self.tenant_id), None)
+            if self.task is not None:
+                self.task.cancel()
+
+    def publish(self, event):
+        for queue in self.subscribers:
+            if queue.full():
+                # The client fell behind: drop its backlog and let it reload the list
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({'change': 'resync'})
+            else:
+                queue.put_nowait(event)
+
+    async def run(self):
+        poll_seconds = getattr(settings, 'LIVE_EVENTS_POLL_SECONDS', DEFAULT_LIVE_EVENTS_POLL_SECONDS)
+        high_water = timezone.now()
+        # Cursors already published within LATE_COMMIT_WINDOW of the high-water mark
+        seen = {}
+        failures = 0
+        while True:
+            # After a failed poll, wait longer each time (and ignore wakeups) before retrying
+            wait = min(poll_seconds * 2 ** failures, MAX_POLL_BACKOFF_SECONDS) if failures else poll_seconds
+            try:
+                if failures:
+                    await asyncio.sleep(wait)
+                else:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+            # Re-read the last few seconds: a transaction may commit a row whose
+            # updated_at is older than rows already published
+            cursor = (high_water - LATE_COMMIT_WINDOW, 0)
+            try:
+                while True:
+                    events = await fetch_changes(self.tenant_id, cursor)
+                    for event in events:
+                        cursor = parse_cursor(event['cursor'])
+                        if event['cursor'] in seen:
+                            continue
+                        seen[event['cursor']] = cursor[0]
+                        high_water = max(high_water, cursor[0])
+                        self.publish(event)
+                    if len(events) < MAX_EVENTS_PER_POLL:
+                        break
+            except Exception:
+                # Keep the feed alive: its streams would otherwise only get keepalives
+                failures += 1
+                logger.exception('Live events poll for credit union %s failed (attempt %d)', self.tenant_id, failures)
+                continue
+            failures = 0
+            horizon = high_water - LATE_COMMIT_WINDOW
+            seen = {key: updated_at for key, updated_at in seen.items() if updated_at >= horizon}
+
+
+def change_feed(tenant_id):
+    """
+    The feed of `tenant_id` on the running event loop, created on first use.
+    """
+    key = (id(asyncio.get_running_loop()), tenant_id)
+    if key not in _feeds:
+        _feeds[key] = TenantChangeFeed(tenant_id)
+    return _feeds[key]
+
+
+def notify_change(tenant_id):
+    """
+    Wakes this process's feeds of `tenant_id` (callable from any thread).
+    """
+    for feed in list(_feeds.values()):
+        if feed.tenant_id == tenant_id:
+            feed.loop.call_soon_threadsafe(feed.wakeup.set)
+
+
+async def event_stream(tenant_id, cursor=None):
+    """
+    The text/event-stream body: missed events after `cursor` (if any), then live
+    events, with a comment line every LIVE_EVENTS_KEEPALIVE_SECONDS so proxies keep
+    the connection open.
+    """
+    keepalive = getattr(settings, 'LIVE_EVENTS_KEEPALIVE_SECONDS', DEFAULT_LIVE_EVENTS_KEEPALIVE_SECONDS)
+    feed = change_feed(tenant_id)
+    # Subscribe before catching up, so nothing falls between the two (duplicates are harmless)
+    queue = feed.subscribe()
+    try:
+        yield 'retry: 5000\n\n'
+        # Catch up page by page until the backlog since `cursor` is drained
+        while cursor is not None:
+            events = await fetch_changes(tenant_id, cursor)
+            for event in events:
+                yield format_event(event)
+            cursor = parse_cursor(events[-1]['cursor']) if len(events) == MAX_EVENTS_PER_POLL else None
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        feed.unsubscribe(queue)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets DRF content negotiation accept `Accept: text/event-stream`; only error
+    responses are rendered through it (the stream itself is a StreamingHttpResponse).
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f'event: error\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'.encode()
+
+
+class JWTQueryParamAuthentication(CachedJWTAuthentication):
+    """
+    Browsers' EventSource cannot send an Authorization header, so the stream also
+    accepts the access token as ?access_token=.
+    """
+
+    def authenticate(self, request):
+        raw_token = request.query_params.get('access_token')
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from calculator.archival import archive_decided_applications
+
+
+class Command(BaseCommand):
+    help = "Moves decided loan applications older than the configured age into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=None,
+            help="Archive decided applications submitted more than this many days ago (default: settings.LOAN_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help="Number of applications moved per transaction (default: settings.LOAN_ARCHIVE_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_decided_applications(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} decided loan application(s)."))
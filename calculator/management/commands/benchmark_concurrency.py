@@ -0,0 +1,87 @@
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from Authentication.serializers import CustomTokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires concurrent requests at a running server and reports throughput and latency, "
+        "e.g. to compare `gunicorn loan_appraiser_project.wsgi -w 4` (sync endpoints) with "
+        "`uvicorn loan_appraiser_project.asgi:application --workers 4` (async/ endpoints)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help="Full URL, e.g. http://127.0.0.1:8000/api/calculator/async/all-loan/.")
+        parser.add_argument('--username', required=True, help="User the JWT access token is issued for.")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64], help="Concurrent clients; one run per value.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per run.")
+        parser.add_argument('--body', default=None, help="JSON file to POST (default: GET).")
+
+    def _request(self, url, token, body):
+        request = urllib.request.Request(url, data=body, headers={
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json',
+        })
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                ok = response.status < 400
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    def _run(self, url, token, body, concurrency, total):
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+
+        def worker(_):
+            nonlocal errors
+            elapsed, ok = self._request(url, token, body)
+            with lock:
+                latencies.append(elapsed)
+                errors += not ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(total)))
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'throughput': total / wall,
+            'p50': statistics.median(latencies) * 1000,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            'errors': errors,
+        }
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+        # Same claims as a token from login/, so the tenant comes from the token as in production
+        token = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+
+        body = None
+        if options['body']:
+            with open(options['body'], encoding='utf-8') as handle:
+                body = json.dumps(json.load(handle)).encode()
+
+        self.stdout.write(f"{'clients':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        for concurrency in options['concurrency']:
+            result = self._run(options['url'], token, body, concurrency, options['requests'])
+            self.stdout.write(
+                f"{concurrency:>8} {result['throughput']:>9.1f} {result['p50']:>9.1f} "
+                f"{result['p95']:>9.1f} {result['errors']:>7}"
+            )
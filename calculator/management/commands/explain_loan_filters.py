@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from calculator.filters import FILTER_INDEXES, explain_filters
+from calculator.models import LoanApplication
+from calculator.views import LoanPortfolioPagination
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints the query plan of every portfolio-listing filter (api/calculator/loans/) and "
+        "fails when a filter is not served by its index. Run it against a database holding "
+        "realistic data (and, on SQLite, after ANALYZE): planners prefer full scans of tiny tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--credit-union', type=int, default=1, help="Tenant the listings are scoped to.")
+        parser.add_argument('--database', default=None, help="Database alias (default: the router's choice for reads).")
+
+    def handle(self, *args, **options):
+        using = options['database'] or router.db_for_read(LoanApplication)
+        if connections[using].vendor not in ('sqlite', 'postgresql', 'mysql'):
+            raise CommandError(f"No query plan support for {connections[using].vendor}.")
+
+        queryset = LoanApplication.objects.using(using).for_tenant(options['credit_union'])
+        missing = []
+        try:
+            plans = list(explain_filters(queryset, LoanPortfolioPagination.ordering, LoanPortfolioPagination.page_size))
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        for label, plan, index_names, served in plans:
+            self.stdout.write(f"{label}\n{plan}\n")
+            if not served:
+                missing.append(f"{label} (expected {' or '.join(index_names)})")
+
+        if missing:
+            raise CommandError("Not served by their index: " + '; '.join(missing))
+        self.stdout.write(self.style.SUCCESS(f"All {len(FILTER_INDEXES)} filters use their index."))
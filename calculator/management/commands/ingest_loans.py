@@ -0,0 +1,58 @@
+import csv
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.ingestion import ingest_applications
+from credit_unions.models import CreditUnion
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-imports loan applications (e.g. from the legacy system) from a .csv, .json or .jsonl file. "
+        "Every row needs a 'loan_type' column; applications are appraised and inserted in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to a .csv, .json (list of objects) or .jsonl file.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Rows per multi-row INSERT (default: 1000).")
+        parser.add_argument('--username', default=None, help="User recorded as the submitter when a row has none.")
+        parser.add_argument('--credit-union-id', type=int, default=None, help="Credit union assigned when a row has none.")
+
+    def _read_rows(self, path):
+        if path.endswith('.csv'):
+            with open(path, newline='', encoding='utf-8') as handle:
+                # Empty CSV cells mean "not provided", so let the model defaults apply
+                return [{key: value for key, value in row.items() if value != ''} for row in csv.DictReader(handle)]
+        with open(path, encoding='utf-8') as handle:
+            if path.endswith('.jsonl'):
+                return [json.loads(line) for line in handle if line.strip()]
+            return json.load(handle)
+
+    def handle(self, *args, **options):
+        user = None
+        if options['username']:
+            try:
+                user = User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['username']}' does not exist.")
+        credit_union = None
+        if options['credit_union_id']:
+            try:
+                credit_union = CreditUnion.objects.get(pk=options['credit_union_id'])
+            except CreditUnion.DoesNotExist:
+                raise CommandError(f"Credit union {options['credit_union_id']} does not exist.")
+
+        result = ingest_applications(
+            self._read_rows(options['path']),
+            user=user,
+            credit_union=credit_union,
+            batch_size=options['batch_size'],
+        )
+
+        for index, errors in sorted(result['errors'].items()):
+            self.stderr.write(f"Row {index + 1}: {errors}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {len(result['created'])} loan application(s); {len(result['errors'])} row(s) rejected."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from calculator.purge import purge_deleted_applications
+
+
+class Command(BaseCommand):
+    help = "Hard-deletes soft-deleted loan applications (and their child rows) in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Applications per transaction (default: settings.LOAN_PURGE_BATCH_SIZE).")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Database alias to purge (default: 'default').")
+
+    def handle(self, *args, **options):
+        purged = purge_deleted_applications(batch_size=options['batch_size'], using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} soft-deleted loan application(s)."))
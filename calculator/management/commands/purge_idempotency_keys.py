@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from calculator.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Deletes expired Idempotency-Key records of the submission endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Database alias to clean (default: 'default').")
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency key(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from calculator.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the applicant search index (ApplicantSearchToken) from all loan applications."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Applications per transaction (default: 1000).")
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} loan application(s)."))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0005_alter_salarybackedloanapplication_salary_passing_union_ge_3_months'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppraisalCriterionResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criterion', models.CharField(help_text="Stable code of the appraisal criterion, e.g. 'full_kyc'.", max_length=64)),
+                ('passed', models.BooleanField()),
+                ('weight_awarded', models.PositiveSmallIntegerField(default=0)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='criterion_results', to='calculator.loanapplication')),
+            ],
+            options={
+                'verbose_name': 'Appraisal Criterion Result',
+                'verbose_name_plural': 'Appraisal Criterion Results',
+                'indexes': [models.Index(fields=['criterion', 'passed'], name='calc_criterion_passed_idx')],
+            },
+        ),
+    ]
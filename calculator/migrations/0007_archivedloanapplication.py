@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:01
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0006_appraisalcriterionresult'),
+        ('credit_unions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedLoanApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(help_text='Primary key the application had in LoanApplication.', unique=True)),
+                ('source_model', models.CharField(help_text="Model label the snapshot was taken from, e.g. 'calculator.mortgageloanapplication'.", max_length=100)),
+                ('loan_type', models.CharField(choices=[('mortgage', 'Mortgage Loan'), ('salary_backed', 'Salary-Backed Loan'), ('within_savings', 'Loan Within Savings'), ('daily_savings', 'Daily Savings Loan'), ('standing_order', 'Standing Order Loan'), ('real_estate', 'Real Estate Loan'), ('container', 'Container Loan'), ('agricultural', 'Agricultural Loan'), ('express', 'Express Loan'), ('business', 'Business Loan')], max_length=50)),
+                ('applicant_name', models.CharField(max_length=200)),
+                ('account_number', models.CharField(db_index=True, max_length=50)),
+                ('identity_card_number', models.CharField(blank=True, db_index=True, max_length=50, null=True)),
+                ('loan_amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('appraisal_score', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('approved', models.BooleanField(blank=True, null=True)),
+                ('submission_date', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('criterion_results', models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('credit_union', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_loans', to='credit_unions.creditunion')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_loan_applications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Loan Application',
+                'verbose_name_plural': 'Archived Loan Applications',
+            },
+        ),
+    ]
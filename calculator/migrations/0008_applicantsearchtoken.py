@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from calculator.search import SEARCH_FIELDS, applicant_tokens
+
+
+def index_existing_applications(apps, schema_editor):
+    LoanApplication = apps.get_model('calculator', 'LoanApplication')
+    ApplicantSearchToken = apps.get_model('calculator', 'ApplicantSearchToken')
+    rows = []
+    for values in LoanApplication.objects.values('pk', *SEARCH_FIELDS).iterator():
+        application_id = values.pop('pk')
+        rows.extend(ApplicantSearchToken(application_id=application_id, token=token) for token in applicant_tokens(**values))
+    ApplicantSearchToken.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0007_archivedloanapplication'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicantSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=3)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='calculator.loanapplication')),
+            ],
+            options={
+                'verbose_name': 'Applicant Search Token',
+                'verbose_name_plural': 'Applicant Search Tokens',
+                'constraints': [models.UniqueConstraint(fields=('token', 'application'), name='calc_search_token_uniq')],
+            },
+        ),
+        migrations.RunPython(index_existing_applications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:14
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def assign_credit_unions(apps, schema_editor):
+    # Existing applications inherit the credit union of the user who submitted them
+    LoanApplication = apps.get_model('calculator', 'LoanApplication')
+    UserProfile = apps.get_model('credit_unions', 'UserProfile')
+    LoanApplication.objects.filter(credit_union__isnull=True, user__isnull=False).update(
+        credit_union=Subquery(UserProfile.objects.filter(user=OuterRef('user')).values('credit_union')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0009_loanapplication_identity_keys'),
+        ('credit_unions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedloanapplication',
+            index=models.Index(fields=['credit_union', '-submission_date'], name='calc_archived_cu_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', '-submission_date'], name='calc_loan_cu_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', 'loan_type', 'approved'], name='calc_loan_cu_type_idx'),
+        ),
+        migrations.RunPython(assign_credit_unions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0010_tenant_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanapplication',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
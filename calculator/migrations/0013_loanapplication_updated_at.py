@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing applications were last changed when they were submitted, as far as we know
+    LoanApplication = apps.get_model('calculator', 'LoanApplication')
+    LoanApplication.objects.using(schema_editor.connection.alias).update(updated_at=F('submission_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0012_idempotencykey'),
+        ('credit_unions', '0002_creditunion_userprofile_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanapplication',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', 'updated_at'], name='calc_loan_cu_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:37
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0013_loanapplication_updated_at'),
+        ('credit_unions', '0002_creditunion_userprofile_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', 'approved', '-submission_date'], name='calc_loan_cu_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', 'appraisal_score'], name='calc_loan_cu_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', 'loan_amount'], name='calc_loan_cu_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', 'date_of_loan'], name='calc_loan_cu_loan_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(models.F('credit_union'), django.db.models.functions.text.Lower('profession'), name='calc_loan_cu_profession_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(models.F('credit_union'), django.db.models.functions.text.Lower('current_location'), name='calc_loan_cu_location_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:56
+
+from django.db import migrations, models
+
+from calculator.models import normalize_identifier
+
+
+def fill_identity_keys(apps, schema_editor):
+    ArchivedLoanApplication = apps.get_model('calculator', 'ArchivedLoanApplication')
+    archived = list(ArchivedLoanApplication.objects.only('pk', 'identity_card_number', 'account_number'))
+    for loan in archived:
+        loan.identity_key = normalize_identifier(loan.identity_card_number)
+        loan.account_key = normalize_identifier(loan.account_number)
+    ArchivedLoanApplication.objects.bulk_update(archived, ['identity_key', 'account_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0014_loanapplication_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedloanapplication',
+            name='account_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='archivedloanapplication',
+            name='identity_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(fill_identity_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:59
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0015_archivedloanapplication_identity_keys'),
+        ('credit_unions', '0003_creditunion_policy_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='loanapplication',
+            name='calc_loan_cu_submitted_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loanapplication',
+            name='calc_loan_cu_type_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loanapplication',
+            name='calc_loan_cu_approved_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loanapplication',
+            name='calc_loan_cu_profession_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loanapplication',
+            name='calc_loan_cu_location_idx',
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', '-submission_date', '-id'], name='calc_loan_cu_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', 'loan_type', '-submission_date', '-id'], name='calc_loan_cu_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['credit_union', 'approved', '-submission_date', '-id'], name='calc_loan_cu_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(models.F('credit_union'), django.db.models.functions.text.Lower('profession'), models.OrderBy(models.F('submission_date'), descending=True), models.OrderBy(models.F('id'), descending=True), name='calc_loan_cu_profession_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(models.F('credit_union'), django.db.models.functions.text.Lower('current_location'), models.OrderBy(models.F('submission_date'), descending=True), models.OrderBy(models.F('id'), descending=True), name='calc_loan_cu_location_idx'),
+        ),
+    ]
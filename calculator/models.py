@@ -1,11 +1,36 @@
 # calculator/models.py
 
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
 import datetime
 from django.contrib.auth.models import User # NEW: Import the User model
+from django.core.serializers.json import DjangoJSONEncoder
 from credit_unions.models import CreditUnion
+from credit_unions.tenancy import TenantManager, tenant_id_for_user
+class LiveLoanManager(TenantManager):
+    """
+    Default manager: hides soft-deleted applications (see calculator/purge.py).
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+# Placeholder values that must never link unrelated applicants together
+UNKNOWN_IDENTIFIERS = {'', 'UNKNOWN', 'NA', 'NONE'}
+
+
+def normalize_identifier(value):
+    """
+    Upper-cases an ID card or account number and drops separators and spaces,
+    e.g. "cm-0012 345" -> "CM0012345". Placeholders such as 'UNKNOWN' become ''.
+    """
+    normalized = ''.join(char for char in str(value or '') if char.isalnum()).upper()
+    return '' if normalized in UNKNOWN_IDENTIFIERS else normalized
+
+
 class LoanApplication(models.Model):
     """
     Base class for all loan applications to hold common fields.
@@ -110,6 +135,61 @@ class LoanApplication(models.Model):
     # Changed from FileField to TextField and renamed
     loan_purpose = models.TextField(blank=True, null=True, help_text="Describe the purpose of the loan.") 
 
+    # NEW: Normalized identity keys for applicant history lookups (see calculator/history.py)
+    identity_key = models.CharField(max_length=50, blank=True, default='', db_index=True, editable=False)
+    account_key = models.CharField(max_length=50, blank=True, default='', db_index=True, editable=False)
+
+    # NEW: Soft-delete tombstone; the purge worker hard-deletes these rows later
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True, editable=False)
+
+    # NEW: Last change, used as the validator for conditional GETs (see loan_appraiser_project/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # NEW: Tenant-aware manager: LoanApplication.objects.for_user(request.user)
+    # (soft-deleted applications excluded; all_objects includes them)
+    objects = LiveLoanManager()
+    all_objects = TenantManager()
+
+    class Meta:
+        # Led by credit_union so tenant-scoped listings only read that tenant's rows
+        indexes = [
+            models.Index(fields=['credit_union', '-submission_date', '-id'], name='calc_loan_cu_submitted_idx'),
+            # Answers COUNT(*) + MAX(updated_at) per tenant from the index alone
+            models.Index(fields=['credit_union', 'updated_at'], name='calc_loan_cu_updated_idx'),
+            # One per filter of the portfolio listing (see calculator/filters.py). Equality filters
+            # end with the listing's ordering (-submission_date, -id), so a page is read in order
+            models.Index(fields=['credit_union', 'loan_type', '-submission_date', '-id'], name='calc_loan_cu_type_idx'),
+            models.Index(fields=['credit_union', 'approved', '-submission_date', '-id'], name='calc_loan_cu_approved_idx'),
+            models.Index(fields=['credit_union', 'appraisal_score'], name='calc_loan_cu_score_idx'),
+            models.Index(fields=['credit_union', 'loan_amount'], name='calc_loan_cu_amount_idx'),
+            models.Index(fields=['credit_union', 'date_of_loan'], name='calc_loan_cu_loan_date_idx'),
+            models.Index(
+                F('credit_union'), Lower('profession'), F('submission_date').desc(), F('id').desc(),
+                name='calc_loan_cu_profession_idx',
+            ),
+            models.Index(
+                F('credit_union'), Lower('current_location'), F('submission_date').desc(), F('id').desc(),
+                name='calc_loan_cu_location_idx',
+            ),
+        ]
+
+    def refresh_identity_keys(self):
+        self.identity_key = normalize_identifier(self.identity_card_number)
+        self.account_key = normalize_identifier(self.account_number)
+
+    def save(self, *args, **kwargs):
+        self.refresh_identity_keys()
+        # New applications belong to the submitting user's credit union
+        if self._state.adding and self.credit_union_id is None and self.user_id is not None:
+            self.credit_union_id = tenant_id_for_user(self.user)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'updated_at'}
+            if {'identity_card_number', 'account_number'} & update_fields:
+                update_fields |= {'identity_key', 'account_key'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.applicant_name} - {self.get_loan_type_display()} - {self.loan_amount} XAF"
 
@@ -360,3 +440,162 @@ class BusinessLoanApplication(LoanApplication):
 
     def __str__(self):
         return f"Business: {self.applicant_name} - {self.loan_amount} XAF"
+
+
+# NEW: Normalized appraisal breakdown (one compact row per criterion outcome)
+class AppraisalCriterionResult(models.Model):
+    """
+    Stores the outcome of a single appraisal criterion for a loan application.
+    The free-text `reasons` on LoanApplication stay for display; these rows let
+    criterion-level questions ("how many mortgages failed the legal agreement
+    criterion last month?") run as an indexed GROUP BY instead of a full scan.
+    """
+    application = models.ForeignKey(
+        LoanApplication,
+        on_delete=models.CASCADE,
+        related_name='criterion_results'
+    )
+    criterion = models.CharField(max_length=64, help_text="Stable code of the appraisal criterion, e.g. 'full_kyc'.")
+    passed = models.BooleanField()
+    weight_awarded = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Appraisal Criterion Result"
+        verbose_name_plural = "Appraisal Criterion Results"
+        indexes = [
+            models.Index(fields=['criterion', 'passed'], name='calc_criterion_passed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id} - {self.criterion}: {'passed' if self.passed else 'failed'} (+{self.weight_awarded}%)"
+
+
+# NEW: Search index for applicant lookups (see calculator/search.py)
+class ApplicantSearchToken(models.Model):
+    """
+    One trigram of the normalized (lower-case, accent-folded) applicant name, email,
+    account number or ID card number of a loan application. Searching joins the
+    trigrams of the query against the (token, application) index instead of running
+    LIKE '%...%' scans over the four columns.
+    """
+    application = models.ForeignKey(
+        LoanApplication,
+        on_delete=models.CASCADE,
+        related_name='search_tokens'
+    )
+    token = models.CharField(max_length=3)
+
+    class Meta:
+        verbose_name = "Applicant Search Token"
+        verbose_name_plural = "Applicant Search Tokens"
+        constraints = [
+            models.UniqueConstraint(fields=['token', 'application'], name='calc_search_token_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id}: {self.token!r}"
+
+
+# Maps each LoanApplication.loan_type code to its multi-table inheritance child model.
+LOAN_TYPE_MODELS = {
+    'mortgage': MortgageLoanApplication,
+    'salary_backed': SalaryBackedLoanApplication,
+    'within_savings': LoanWithinSavingsApplication,
+    'daily_savings': DailySavingsLoanApplication,
+    'standing_order': StandingOrderLoanApplication,
+    'real_estate': RealEstateLoanApplication,
+    'container': ContainerLoanApplication,
+    'agricultural': AgriculturalLoanApplication,
+    'express': ExpressLoanApplication,
+    'business': BusinessLoanApplication,
+}
+
+
+# NEW: Cold storage for decided applications (see calculator/archival.py)
+class ArchivedLoanApplication(models.Model):
+    """
+    Read-only snapshot of a decided loan application moved out of the hot
+    LoanApplication tables. The full parent + child field values live in `data`;
+    the columns below are kept only for indexed lookups.
+    """
+    original_id = models.BigIntegerField(unique=True, help_text="Primary key the application had in LoanApplication.")
+    source_model = models.CharField(max_length=100, help_text="Model label the snapshot was taken from, e.g. 'calculator.mortgageloanapplication'.")
+    loan_type = models.CharField(max_length=50, choices=LoanApplication.LOAN_TYPES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_loan_applications', null=True, blank=True)
+    credit_union = models.ForeignKey(CreditUnion, on_delete=models.CASCADE, related_name='archived_loans', null=True, blank=True)
+    applicant_name = models.CharField(max_length=200)
+    account_number = models.CharField(max_length=50, db_index=True)
+    identity_card_number = models.CharField(max_length=50, blank=True, null=True, db_index=True)
+    # NEW: Same normalized keys as LoanApplication, so applicant history also finds archived loans
+    identity_key = models.CharField(max_length=50, blank=True, default='', db_index=True, editable=False)
+    account_key = models.CharField(max_length=50, blank=True, default='', db_index=True, editable=False)
+    loan_amount = models.DecimalField(max_digits=15, decimal_places=2)
+    appraisal_score = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    approved = models.BooleanField(null=True, blank=True)
+    submission_date = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    criterion_results = models.JSONField(encoder=DjangoJSONEncoder, default=list, blank=True)
+
+    objects = TenantManager()
+
+    class Meta:
+        verbose_name = "Archived Loan Application"
+        verbose_name_plural = "Archived Loan Applications"
+        indexes = [
+            models.Index(fields=['credit_union', '-submission_date'], name='calc_archived_cu_submitted_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived: {self.applicant_name} - {self.get_loan_type_display()} - {self.loan_amount} XAF"
+
+    def to_instances(self):
+        """
+        Rebuilds unsaved (LoanApplication, specific loan) instances from the snapshot,
+        so existing templates such as the appraisal PDF can render archived loans unchanged.
+        """
+        from django.apps import apps
+        model = apps.get_model(self.source_model)
+        values = {
+            field.attname: field.to_python(self.data[field.attname])
+            for field in model._meta.concrete_fields
+            if field.attname in self.data
+        }
+        specific_loan = model(**values)
+        if model is LoanApplication:
+            return specific_loan, None
+
+        loan = LoanApplication(**{
+            field.attname: values[field.attname]
+            for field in LoanApplication._meta.concrete_fields
+            if field.attname in values
+        })
+        # Prime the reverse one-to-one cache (e.g. loan.mortgageloanapplication) to avoid a DB hit
+        model._meta.parents[LoanApplication].remote_field.set_cached_value(loan, specific_loan)
+        return loan, specific_loan
+
+
+# NEW: Idempotency-Key store for submit/* retries (see calculator/idempotency.py)
+class IdempotencyKey(models.Model):
+    """
+    One row per (user, Idempotency-Key) seen on a submission. The key and the request
+    body are stored as SHA-256 digests; status_code stays NULL while the first request
+    is still running, then the response is kept until expires_at so retries replay it.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key_hash = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key_hash'], name='calc_idempotency_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.key_hash[:12]}"
@@ -0,0 +1,18 @@
+# calculator/permissions.py
+
+from rest_framework.permissions import BasePermission
+
+
+class IsLoanReviewer(BasePermission):
+    """
+    Staff, or users granted calculator.change_loanapplication (e.g. through a
+    "Reviewers" group). Plain credit union members may submit applications but
+    not decide them.
+    """
+    message = "Only loan reviewers can decide applications."
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return user.is_staff or user.has_perm('calculator.change_loanapplication')
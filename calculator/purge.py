@@ -0,0 +1,145 @@
+# calculator/purge.py
+
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, models, router, transaction
+from django.utils import timezone
+
+from .models import LoanApplication
+from .signals import loan_cache_scopes
+from loan_appraiser_project.response_cache import invalidate
+
+# Defaults, overridable in settings.py
+DEFAULT_PURGE_BATCH_SIZE = 500
+
+PROGRESS_CACHE_KEY = 'loan-purge-progress:{using}'
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def soft_delete_applications(queryset):
+    """
+    Hides the applications of `queryset` at once with a single UPDATE of deleted_at,
+    then lets the purge worker remove the rows after the transaction commits.
+    Returns the number of applications hidden.
+    """
+    using = queryset._db or router.db_for_write(queryset.model)
+    # update() sends no signals: collect the cached read responses to invalidate first
+    owners = set(queryset.order_by().values_list('credit_union_id', 'user_id').distinct())
+    now = timezone.now()
+    hidden = queryset.update(deleted_at=now, updated_at=now)
+    if hidden:
+        invalidate(*{scope for owner in owners for scope in loan_cache_scopes(*owner)}, using=using)
+        transaction.on_commit(lambda: start_purge_worker(using), using=using)
+    return hidden
+
+
+def _cascade_tables():
+    """
+    (table, column) pairs that reference LoanApplication with on_delete=CASCADE:
+    the ten loan-type child tables (via their parent link) plus the criterion results
+    and search tokens. Listed children first so the parent row is deleted last.
+    """
+    tables = []
+    for relation in LoanApplication._meta.related_objects:
+        if relation.on_delete is not models.CASCADE:
+            continue
+        tables.append((relation.related_model._meta.db_table, relation.field.column))
+    return tables
+
+
+def _delete_batch(loan_ids, using):
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(loan_ids))
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for table, column in _cascade_tables():
+            cursor.execute(f'DELETE FROM {quote(table)} WHERE {quote(column)} IN ({placeholders})', loan_ids)
+        cursor.execute(
+            f'DELETE FROM {quote(LoanApplication._meta.db_table)} WHERE {quote(LoanApplication._meta.pk.column)} IN ({placeholders})',
+            loan_ids,
+        )
+
+
+def _report(using, **progress):
+    progress['updated_at'] = timezone.now().isoformat()
+    cache.set(PROGRESS_CACHE_KEY.format(using=using), progress, timeout=None)
+
+
+def purge_progress(using=DEFAULT_DB_ALIAS):
+    """
+    Latest progress reported by the purge worker, plus the live number of
+    soft-deleted applications still waiting to be removed.
+    """
+    progress = cache.get(PROGRESS_CACHE_KEY.format(using=using)) or {'status': 'idle', 'purged': 0}
+    progress['pending'] = LoanApplication.all_objects.using(using).filter(deleted_at__isnull=False).count()
+    return progress
+
+
+def purge_deleted_applications(batch_size=None, using=DEFAULT_DB_ALIAS):
+    """
+    Hard-deletes soft-deleted applications in batches with raw per-table DELETEs, so no
+    row is ever loaded into memory (unlike Django's cascade collector). Each batch is its
+    own short transaction; progress is reported to the cache after every batch.
+    Returns the number of applications purged.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'LOAN_PURGE_BATCH_SIZE', DEFAULT_PURGE_BATCH_SIZE)
+
+    purged = 0
+    _report(using, status='running', purged=purged)
+    while True:
+        loan_ids = list(
+            LoanApplication.all_objects.using(using)
+            .filter(deleted_at__isnull=False)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not loan_ids:
+            break
+        _delete_batch(loan_ids, using)
+        purged += len(loan_ids)
+        _report(using, status='running', purged=purged)
+    _report(using, status='idle', purged=purged)
+    return purged
+
+
+def _run_worker(using):
+    try:
+        while True:
+            purge_deleted_applications(using=using)
+            # Re-check under the lock: rows hidden while the last batch ran would
+            # otherwise wait for the next soft delete to start a worker
+            with _workers_lock:
+                if not LoanApplication.all_objects.using(using).filter(deleted_at__isnull=False).exists():
+                    _workers.pop(using, None)
+                    return
+    except Exception as exc:
+        with _workers_lock:
+            _workers.pop(using, None)
+        _report(using, status='failed', purged=0, error=str(exc))
+        raise
+    finally:
+        connections.close_all()
+
+
+def start_purge_worker(using=None):
+    """
+    Starts the background purge thread for `using` unless one is already running.
+    Deployments that prefer a separate process can set LOAN_PURGE_IN_BACKGROUND = False
+    and run `python manage.py purge_deleted_loans` from a scheduler instead.
+    """
+    if not getattr(settings, 'LOAN_PURGE_IN_BACKGROUND', True):
+        return None
+    using = using or router.db_for_write(LoanApplication)
+    with _workers_lock:
+        worker = _workers.get(using)
+        if worker is not None and worker.is_alive():
+            return worker
+        worker = threading.Thread(target=_run_worker, args=(using,), name=f'loan-purge-{using}', daemon=True)
+        _workers[using] = worker
+        worker.start()
+    return worker
@@ -0,0 +1,113 @@
+# calculator/registry.py
+"""
+One entry per loan product: its model, serializer, appraisal function and the
+precomputed list of inputs the appraisal reads. The generic submit view
+(submit/<loan_type>/), bulk and quote endpoints all go through LOAN_PRODUCTS, so
+every product follows the same code path.
+"""
+
+from .appraisal_logic import APPRAISAL_FUNCTIONS
+from .models import LOAN_TYPE_MODELS
+from .serializers import (
+    MortgageLoanApplicationSerializer,
+    SalaryBackedLoanApplicationSerializer,
+    LoanWithinSavingsApplicationSerializer,
+    DailySavingsLoanApplicationSerializer,
+    StandingOrderLoanApplicationSerializer,
+    RealEstateLoanApplicationSerializer,
+    ContainerLoanApplicationSerializer,
+    AgriculturalLoanApplicationSerializer,
+    ExpressLoanApplicationSerializer,
+    BusinessLoanApplicationSerializer,
+)
+
+# Model fields that are outputs of the appraisal or bookkeeping, never appraisal inputs
+NON_INPUT_FIELDS = {
+    'id', 'loanapplication_ptr', 'user', 'credit_union', 'submission_date',
+    'appraisal_score', 'approved', 'reasons', 'approver_comments',
+    'identity_key', 'account_key', 'deleted_at', 'updated_at',
+}
+
+
+class LoanProduct:
+    """
+    Everything the submission path needs for one loan_type.
+    `input_fields` is computed once: (field name, default, default is callable).
+    """
+
+    def __init__(self, loan_type, serializer_class, history_criteria=()):
+        self.loan_type = loan_type
+        self.model = LOAN_TYPE_MODELS[loan_type]
+        self.serializer_class = serializer_class
+        self.appraiser = APPRAISAL_FUNCTIONS[loan_type]
+        # Criteria prefilled from the applicant's history when not submitted (calculator/history.py)
+        self.history_criteria = tuple(history_criteria)
+        self.input_fields = tuple(
+            self._input_field(field)
+            for field in self.model._meta.concrete_fields
+            if field.name not in NON_INPUT_FIELDS
+        )
+
+    @staticmethod
+    def _input_field(field):
+        # A field without a default has default=NOT_PROVIDED, a class (so callable): it reads as None
+        if not field.has_default():
+            return field.name, None, False
+        if callable(field.default):
+            return field.name, field.default, True
+        return field.name, field.get_default(), False
+
+    def extract_input(self, values):
+        """
+        Builds the appraisal input from validated data (or any mapping of field values);
+        fields left out get the model default, i.e. the value that will be saved.
+        """
+        data = {
+            name: values[name] if name in values else (default() if is_callable else default)
+            for name, default, is_callable in self.input_fields
+        }
+        # The appraisal logic reads the purpose text as 'loan_purpose_document'
+        data['loan_purpose_document'] = data.get('loan_purpose')
+        return data
+
+    def appraise(self, values):
+        return self.appraiser(self.extract_input(values))
+
+
+LOAN_PRODUCTS = {
+    product.loan_type: product
+    for product in (
+        LoanProduct('mortgage', MortgageLoanApplicationSerializer, history_criteria=['no_existing_npl']),
+        LoanProduct('salary_backed', SalaryBackedLoanApplicationSerializer),
+        LoanProduct('within_savings', LoanWithinSavingsApplicationSerializer),
+        LoanProduct('daily_savings', DailySavingsLoanApplicationSerializer, history_criteria=['positive_loan_repayment_history']),
+        LoanProduct('standing_order', StandingOrderLoanApplicationSerializer),
+        LoanProduct('real_estate', RealEstateLoanApplicationSerializer),
+        LoanProduct('container', ContainerLoanApplicationSerializer),
+        LoanProduct('agricultural', AgriculturalLoanApplicationSerializer),
+        LoanProduct('express', ExpressLoanApplicationSerializer, history_criteria=['no_existing_delinquent_loan']),
+        LoanProduct('business', BusinessLoanApplicationSerializer),
+    )
+}
+
+# URL slugs used by the frontend before submit/<loan_type>/ existed
+LOAN_TYPE_ALIASES = {
+    'salary-backed': 'salary_backed',
+    'within-savings': 'within_savings',
+    'daily-savings': 'daily_savings',
+    'standing-order-savings': 'standing_order',
+    'real-estate-savings': 'real_estate',
+    'container-savings': 'container',
+    'agriculural-loan': 'agricultural',
+    'express-savings': 'express',
+    'business-savings': 'business',
+}
+
+
+def get_loan_product(loan_type):
+    """
+    Returns the LoanProduct for a loan_type code ('salary_backed'), its hyphenated
+    form ('salary-backed') or a legacy URL slug, or None.
+    """
+    loan_type = LOAN_TYPE_ALIASES.get(loan_type, loan_type).replace('-', '_')
+    return LOAN_PRODUCTS.get(loan_type)
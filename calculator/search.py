@@ -0,0 +1,175 @@
+# calculator/search.py
+
+import math
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count
+
+from .models import LoanApplication, ApplicantSearchToken
+
+# Defaults, overridable in settings.py
+DEFAULT_SEARCH_MIN_SIMILARITY = 0.3
+DEFAULT_SEARCH_LIMIT = 25
+
+# Applicant fields covered by the search index
+SEARCH_FIELDS = ('applicant_name', 'applicant_email', 'account_number', 'identity_card_number')
+# Identifiers are also indexed with separators removed, so "CM-0012 345" matches "cm0012345"
+IDENTIFIER_FIELDS = ('account_number', 'identity_card_number')
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_words(text):
+    """
+    Lower-cases and accent-folds text, then splits it into alphanumeric words:
+    "Ngô-Éloundou, Jean" -> ['ngo', 'eloundou', 'jean'].
+    """
+    if not text:
+        return []
+    folded = ''.join(
+        char for char in unicodedata.normalize('NFKD', str(text))
+        if not unicodedata.combining(char)
+    ).casefold()
+    return _NON_ALNUM.sub(' ', folded).split()
+
+
+def word_trigrams(word):
+    """
+    Trigrams of a word padded like pg_trgm: "jean" -> {'  j', ' je', 'jea', 'ean', 'an '}.
+    """
+    padded = '  ' + word + ' '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def applicant_tokens(applicant_name=None, applicant_email=None, account_number=None, identity_card_number=None):
+    """
+    Returns the set of trigrams indexed for one application's applicant fields.
+    """
+    values = {
+        'applicant_name': applicant_name,
+        'applicant_email': applicant_email,
+        'account_number': account_number,
+        'identity_card_number': identity_card_number,
+    }
+    tokens = set()
+    for field, value in values.items():
+        words = normalize_words(value)
+        if field in IDENTIFIER_FIELDS and len(words) > 1:
+            words.append(''.join(words))
+        for word in words:
+            tokens |= word_trigrams(word)
+    return tokens
+
+
+def query_tokens(query):
+    """
+    Trigrams of a search query. A word prefix ("elou") shares every trigram with the
+    full word except the trailing pad, and a typo only breaks the trigrams around it,
+    so both still reach the similarity threshold while exact matches rank first.
+    Queries containing digits (but not email addresses) also look for the
+    separator-free form of identifiers.
+    """
+    words = normalize_words(query)
+    tokens = set()
+    for word in words:
+        tokens |= word_trigrams(word)
+    if len(words) > 1 and '@' not in query and any(char.isdigit() for char in query):
+        tokens |= word_trigrams(''.join(words))
+    return tokens
+
+
+def _tokens_for(loan_instance):
+    return applicant_tokens(**{field: getattr(loan_instance, field) for field in SEARCH_FIELDS})
+
+
+def index_application(loan_instance):
+    """
+    (Re)builds the search tokens of one saved loan application.
+    """
+    rows = [ApplicantSearchToken(application_id=loan_instance.pk, token=token) for token in _tokens_for(loan_instance)]
+    with transaction.atomic(using=router.db_for_write(ApplicantSearchToken)):
+        ApplicantSearchToken.objects.filter(application_id=loan_instance.pk).delete()
+        ApplicantSearchToken.objects.bulk_create(rows)
+
+
+def index_applications(loan_instances, using=None):
+    """
+    Bulk-inserts the search tokens of newly created applications (used by bulk ingestion,
+    which bypasses the post_save signal).
+    """
+    manager = ApplicantSearchToken.objects.db_manager(using)
+    manager.bulk_create([
+        ApplicantSearchToken(application_id=loan_instance.pk, token=token)
+        for loan_instance in loan_instances
+        for token in _tokens_for(loan_instance)
+    ])
+
+
+def rebuild_search_index(batch_size=1000):
+    """
+    Rebuilds the whole index from LoanApplication, one batch per transaction.
+    Returns the number of applications indexed.
+    """
+    indexed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            LoanApplication.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('pk', *SEARCH_FIELDS)[:batch_size]
+        )
+        if not batch:
+            return indexed
+        with transaction.atomic():
+            ApplicantSearchToken.objects.filter(application_id__in=[loan.pk for loan in batch]).delete()
+            index_applications(batch)
+        indexed += len(batch)
+        last_pk = batch[-1].pk
+
+
+def matching_applications(query, min_similarity=None):
+    """
+    Returns a values queryset of {'application_id', 'hits'} for applications sharing at
+    least `min_similarity` of the query's trigrams, best matches first. Only the
+    (token, application) index is read; it can be used as a subquery (pk__in=...).
+    """
+    if min_similarity is None:
+        min_similarity = getattr(settings, 'APPLICANT_SEARCH_MIN_SIMILARITY', DEFAULT_SEARCH_MIN_SIMILARITY)
+    tokens = query_tokens(query)
+    if not tokens:
+        return ApplicantSearchToken.objects.none().values('application_id')
+    required_hits = max(1, math.ceil(len(tokens) * min_similarity))
+    return (
+        ApplicantSearchToken.objects.filter(token__in=tokens)
+        .values('application_id')
+        .annotate(hits=Count('id'))
+        .filter(hits__gte=required_hits)
+        .order_by('-hits', '-application_id')
+    )
+
+
+def search_applications(query, limit=None, min_similarity=None, queryset=None):
+    """
+    Prefix and typo-tolerant search over applicant name, email, account number and
+    ID card number. Returns up to `limit` LoanApplication instances, best match first,
+    each with a `search_similarity` attribute between 0 and 1.
+    """
+    if limit is None:
+        limit = DEFAULT_SEARCH_LIMIT
+    token_count = len(query_tokens(query))
+    matches = matching_applications(query, min_similarity)
+    if queryset is not None:
+        matches = matches.filter(application__in=queryset)
+    matches = list(matches[:limit])
+
+    applications = LoanApplication.objects.in_bulk([match['application_id'] for match in matches])
+    results = []
+    for match in matches:
+        loan = applications.get(match['application_id'])
+        if loan is not None:
+            loan.search_similarity = round(match['hits'] / token_count, 2)
+            results.append(loan)
+    return results
@@ -9,7 +9,8 @@ RealEstateLoanApplication,
 ContainerLoanApplication,
 AgriculturalLoanApplication,
 ExpressLoanApplication,
-BusinessLoanApplication,)
+BusinessLoanApplication,
+ArchivedLoanApplication,)
 from decimal import Decimal
 
 # Helper serializer for common fields if needed, but ModelSerializer is cleaner here
@@ -174,7 +175,7 @@ class DailySavingsLoanApplicationSerializer(serializers.ModelSerializer):
             
             # Salary-Backed Specific Fields
             'daily_savings_active_ge_6_months', 'signed_deduction_agreement_document', 
-            'valid_surety_bond_document','positive_loan_repayment_history','savings_balance_ge_1_5_loan'
+            'valid_surety_bond_document','positive_loan_repayment_history','savings_balance_ge_1_5_loan',
             
             # Read-only fields
             'id', 'submission_date', 'loan_type', 'user'
@@ -214,7 +215,7 @@ class StandingOrderLoanApplicationSerializer(serializers.ModelSerializer):
             
             # Salary-Backed Specific Fields
             'standing_order_active_ge_3_months', 'loan_duration_le_1_year', 
-            'savings_balance_ge_1_5_loan','no_existing_default_or_delinquency'
+            'savings_balance_ge_1_5_loan','no_existing_default_or_delinquency',
             
             # Read-only fields
             'id', 'submission_date', 'loan_type', 'user'
@@ -254,7 +255,7 @@ class RealEstateLoanApplicationSerializer(serializers.ModelSerializer):
             
             # Salary-Backed Specific Fields
             'loan_duration_ge_10_years', 'loan_amount_le_10_percent_paid_up_capital', 
-            'legal_mortgage_agreement_document_re','land_title_in_borrowers_name', 'valid_proof_of_source_of_income'
+            'legal_mortgage_agreement_document_re','land_title_in_borrowers_name', 'valid_proof_of_source_of_income',
             
             # Read-only fields
             'id', 'submission_date', 'loan_type', 'user'
@@ -294,7 +295,7 @@ class ContainerLoanApplicationSerializer(serializers.ModelSerializer):
             
             # Salary-Backed Specific Fields
             'bill_of_lading_document', 'custom_clearance_plan_document', 
-            'savings_balance_amount','savings_balance_ge_1_5_loan', 'valid_proof_of_source_of_income'
+            'savings_balance_amount','savings_balance_ge_1_5_loan', 'valid_proof_of_source_of_income',
             
             # Read-only fields
             'id', 'submission_date', 'loan_type', 'user'
@@ -334,7 +335,7 @@ class AgriculturalLoanApplicationSerializer(serializers.ModelSerializer):
             
             # Salary-Backed Specific Fields
             'is_land_personal_belonging', 'has_authorization_of_usage', 'total_cost_estimate_document',
-            'loan_purpose_category','savings_balance_amount', 'savings_balance_ge_1_5_loan','valid_proof_of_source_of_income'
+            'loan_purpose_category','savings_balance_amount', 'savings_balance_ge_1_5_loan','valid_proof_of_source_of_income',
             
             # Read-only fields
             'id', 'submission_date', 'loan_type', 'user'
@@ -374,7 +375,7 @@ class ExpressLoanApplicationSerializer(serializers.ModelSerializer):
             
             # Express Specific Fields
             'salary_deducted_at_source_or_standing_order', 'effective_service_available', 'clearly_valid_purpose_of_loan',
-            'savings_balance_amount','savings_balance_ge_1_10_loan', 'no_existing_delinquent_loan'
+            'savings_balance_amount','savings_balance_ge_1_10_loan', 'no_existing_delinquent_loan',
             
             # Read-only fields
             'id', 'submission_date', 'loan_type', 'user'
@@ -414,7 +415,7 @@ class BusinessLoanApplicationSerializer(serializers.ModelSerializer):
             
             # Business Specific Fields
             'valid_source_of_income_for_repayment', 'land_documents_attached', 'savings_balance_ge_20_percent_loan',
-            'cost_estimate_provided'
+            'cost_estimate_provided',
             
             # Read-only fields
             'id', 'submission_date', 'loan_type', 'user'
@@ -470,4 +471,42 @@ class LoanApplicationSerializer(serializers.ModelSerializer):
         # fields = '__all__'
         
         # Optional: Make fields read-only if they should only be set by the system
-        read_only_fields = ('submission_date','user') 
\ No newline at end of file
+        read_only_fields = ('submission_date','user') 
+
+class ArchivedLoanApplicationSerializer(serializers.ModelSerializer):
+    """
+    Read-only representation of an archived (cold) loan application.
+    'data' holds the full snapshot of the parent and loan-type specific fields.
+    """
+    loan_type_display = serializers.CharField(source='get_loan_type_display', read_only=True)
+
+    class Meta:
+        model = ArchivedLoanApplication
+        fields = [
+            'original_id',
+            'loan_type',
+            'loan_type_display',
+            'user',
+            'credit_union',
+            'applicant_name',
+            'account_number',
+            'identity_card_number',
+            'loan_amount',
+            'appraisal_score',
+            'approved',
+            'submission_date',
+            'archived_at',
+            'data',
+            'criterion_results',
+        ]
+        read_only_fields = fields
+
+class LoanDecisionSerializer(serializers.Serializer):
+    """
+    Input of the bulk decision endpoint (decisions/): the applications to decide,
+    the decision, and an optional reason (appended on decline) and approver comment.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    decision = serializers.ChoiceField(choices=['approve', 'decline'])
+    reason = serializers.CharField(required=False, allow_blank=True, max_length=500)
+    comment = serializers.CharField(required=False, allow_blank=True)
@@ -0,0 +1,62 @@
+# calculator/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .live import notify_change
+from .models import LOAN_TYPE_MODELS, LoanApplication
+from .search import SEARCH_FIELDS, index_application
+from credit_unions.tenancy import tenant_scope
+from loan_appraiser_project.response_cache import invalidate
+
+
+@receiver(post_save)
+def update_applicant_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Keeps ApplicantSearchToken in step with every saved loan application.
+    post_save is sent with the concrete (child) class, so the receiver is not bound
+    to a single sender and checks the instance type instead.
+    """
+    if raw or not isinstance(instance, LoanApplication):
+        return
+    # Saves that only touch e.g. the appraisal outcome leave the applicant fields unchanged
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    index_application(instance)
+
+
+def loan_cache_scopes(credit_union_id, user_id):
+    """
+    Response-cache scopes showing a loan: superusers' lists, its tenant (or owner) and its submitter.
+    """
+    return ('all', tenant_scope(credit_union_id, user_id), f'user:{user_id}' if user_id else None)
+
+
+@receiver(post_save)
+def invalidate_loan_responses_on_save(sender, instance, raw=False, **kwargs):
+    if raw or not isinstance(instance, LoanApplication):
+        return
+    invalidate(*loan_cache_scopes(instance.credit_union_id, instance.user_id), using=instance._state.db)
+
+
+@receiver(post_save)
+def wake_live_feeds_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Lets this process's review-queue streams of the tenant poll now instead of at
+    the next interval (other processes pick the change up with their next poll).
+    """
+    if raw or not isinstance(instance, LoanApplication) or instance.credit_union_id is None:
+        return
+    credit_union_id = instance.credit_union_id
+    transaction.on_commit(lambda: notify_change(credit_union_id), using=instance._state.db)
+
+
+def invalidate_loan_responses_on_delete(sender, instance, **kwargs):
+    invalidate(*loan_cache_scopes(instance.credit_union_id, instance.user_id), using=instance._state.db)
+
+
+# Bound to the loan models only: a sender-less delete receiver would stop Django from
+# fast-deleting rows of every other model
+for loan_model in (LoanApplication, *LOAN_TYPE_MODELS.values()):
+    post_delete.connect(invalidate_loan_responses_on_delete, sender=loan_model, dispatch_uid=f'invalidate-loan-responses-{loan_model.__name__}')
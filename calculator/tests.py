@@ -1,3 +1,897 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, models, transaction
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from . import async_views, live
+from .archival import archive_decided_applications
+from .filters import FILTER_INDEXES, explain_filters
+from .history import HISTORY_CRITERIA
+from .ingestion import build_application, save_appraised_applications
+from .purge import purge_deleted_applications, purge_progress, soft_delete_applications
+from .registry import LOAN_PRODUCTS, get_loan_product
+from .views import LoanPortfolioPagination
+from .models import (
+    ApplicantSearchToken,
+    AppraisalCriterionResult,
+    ArchivedLoanApplication,
+    LoanApplication,
+    MortgageLoanApplication,
+)
+from Authentication.serializers import CustomTokenObtainPairSerializer
+from credit_unions.models import CreditUnion, UserProfile
+from loan_appraiser_project import db_routing, throttling
+
+# A complete mortgage submission (api/calculator/submit/mortgage/)
+MORTGAGE = {
+    'applicant_name': 'Jane Doe',
+    'applicant_email': 'jane@example.com',
+    'loan_amount': '1000000',
+    'annual_interest_rate_percent': '12',
+    'loan_term_years': 5,
+    'borrower_gross_monthly_income': '500000',
+    'existing_monthly_debt_payments': '0',
+    'account_number': 'ACC-1',
+    'identity_card_number': 'ID123',
+    'place_of_birth': 'Douala',
+    'current_address': 'Rue 1',
+    'marital_status': 'single',
+    'duration_with_mfi_years': 2,
+    'num_loans_other_mfi': 0,
+    'profession': 'Teacher',
+    'current_location': 'Douala',
+    'loan_purpose': 'Buying land for a family house build',
+    'legal_mortgage_agreement_document': True,
+    'land_title_document': True,
+    'no_existing_npl': True,
+}
+
+
+def bulk_insert_returning(supported):
+    """
+    Pretends the database does (not) return primary keys from bulk inserts, like MySQL.
+    """
+    return mock.patch.object(
+        type(connection.features), 'can_return_rows_from_bulk_insert', new_callable=mock.PropertyMock, return_value=supported,
+    )
+
+
+class CalculatorTestMixin:
+    """
+    Two credit unions with one officer each; self.client is authenticated as the first.
+    """
+
+    def setUp(self):
+        cache.clear()
+        throttling._stores.clear()
+        self.credit_union = CreditUnion.objects.create(name='First Union')
+        self.other_credit_union = CreditUnion.objects.create(name='Second Union')
+        self.officer = self.create_user('officer', self.credit_union)
+        self.other_officer = self.create_user('other', self.other_credit_union)
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def create_user(self, username, credit_union, **extra):
+        user = User.objects.create_user(username, f'{username}@example.com', 'S3cure-pass', **extra)
+        UserProfile.objects.create(user=user, credit_union=credit_union)
+        return user
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def submit(self, data=None, loan_type='mortgage', client=None, **headers):
+        return (client or self.client).post(f'/api/calculator/submit/{loan_type}/', data or MORTGAGE, format='json', **headers)
+
+
+class CalculatorTestCase(CalculatorTestMixin, TestCase):
+    pass
+
+
+class CriterionAnalyticsTests(CalculatorTestCase):
+    url = '/api/calculator/analytics/criteria/'
+
+    def test_counts_criteria_of_own_tenant(self):
+        self.assertEqual(self.submit().status_code, 201)
+        self.submit(client=self.client_for(self.other_officer))
+        response = self.client.get(self.url, {'loan_type': 'mortgage', 'submitted_from': '2000-01-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data)
+        for row in response.data:
+            self.assertEqual(row['passed_count'] + row['failed_count'], 1)
+
+    def test_malformed_dates_are_rejected(self):
+        for value in ('yesterday', '2024-13-40'):
+            response = self.client.get(self.url, {'submitted_to': value})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('submitted_to', response.data)
+
+
+class BatchIngestionTests(CalculatorTestCase):
+    url = '/api/calculator/submit/batch/'
+
+    def post_batch(self):
+        second = dict(MORTGAGE, applicant_name='John Roe', identity_card_number='ID456')
+        return self.client.post(self.url, [dict(MORTGAGE, loan_type='mortgage'), dict(second, loan_type='mortgage')], format='json')
+
+    def assert_batch_saved(self, response):
+        self.assertEqual(response.status_code, 201, response.data)
+        ids = [result['application_id'] for result in response.data['results']]
+        self.assertTrue(all(ids))
+        loans = MortgageLoanApplication.objects.filter(pk__in=ids)
+        self.assertEqual(loans.count(), 2)
+        for loan in loans:
+            self.assertEqual(loan.credit_union_id, self.credit_union.pk)
+            self.assertIsNotNone(loan.submission_date)
+            self.assertTrue(AppraisalCriterionResult.objects.filter(application_id=loan.pk).exists())
+            self.assertTrue(ApplicantSearchToken.objects.filter(application_id=loan.pk).exists())
+
+    def test_bulk_insert(self):
+        self.assert_batch_saved(self.post_batch())
+
+    def test_backend_without_returning_saves_one_by_one(self):
+        with bulk_insert_returning(False):
+            self.assert_batch_saved(self.post_batch())
+
+    def test_history_is_read_once_for_the_whole_batch(self):
+        today = datetime.date.today()
+        repaid, results = build_application(
+            dict(MORTGAGE, loan_type='mortgage', date_of_loan=today.replace(year=today.year - 6), loan_term_years=5),
+            user=self.officer,
+        )
+        save_appraised_applications([(repaid, results)])
+        LoanApplication.objects.filter(pk=repaid.pk).update(approved=True)
+        archive_decided_applications()
+
+        first_time = {key: value for key, value in MORTGAGE.items() if key not in HISTORY_CRITERIA}
+        items = [
+            dict(first_time, loan_type=loan_type, identity_card_number=f'NEW-{index}', account_number=f'NEW-{index}')
+            for index, loan_type in enumerate(['mortgage', 'salary_backed'] * 3)
+        ]
+        # The repaid applicant, matched on the identity card or on the account number alone
+        items += [dict(first_time, loan_type='mortgage', account_number='OTHER'),
+                  dict(first_time, loan_type='mortgage', identity_card_number='OTHER')]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        history_queries = [query['sql'] for query in queries if query['sql'].startswith('SELECT') and '"identity_key"' in query['sql']]
+        self.assertEqual(len(history_queries), 2, history_queries)
+
+        prefilled = [result['application_id'] for result in response.data['results'][-2:]]
+        self.assertEqual(MortgageLoanApplication.objects.filter(pk__in=prefilled, no_existing_npl=True).count(), 2)
+        first_timers = [result['application_id'] for result in response.data['results'][:6]]
+        self.assertFalse(MortgageLoanApplication.objects.filter(pk__in=first_timers, no_existing_npl=True).exists())
+
+    def test_original_submission_date_is_kept(self):
+        submitted = timezone.now() - datetime.timedelta(days=400)
+        for returning in (True, False):
+            with self.subTest(returning=returning), bulk_insert_returning(returning):
+                loan, results = build_application(dict(MORTGAGE, loan_type='mortgage', submission_date=submitted), user=self.officer)
+                save_appraised_applications([(loan, results)])
+                self.assertEqual(LoanApplication.objects.get(pk=loan.pk).submission_date, submitted)
+
+
+class ApplicantHistoryTests(CalculatorTestCase):
+    url = '/api/calculator/applicants/history/'
+
+    def create_loan(self, years_ago, approved=True, **fields):
+        today = datetime.date.today()
+        loan, results = build_application(
+            dict(MORTGAGE, loan_type='mortgage', date_of_loan=today.replace(year=today.year - years_ago),
+                 submission_date=timezone.now() - datetime.timedelta(days=365 * years_ago), **fields),
+            user=self.officer,
+        )
+        save_appraised_applications([(loan, results)])
+        LoanApplication.objects.filter(pk=loan.pk).update(approved=approved)
+        return loan
+
+    def test_first_time_applicant_gets_no_history_criteria(self):
+        data = {key: value for key, value in MORTGAGE.items() if key != 'no_existing_npl'}
+        response = self.submit(data)
+        self.assertEqual(response.status_code, 201, response.data)
+        loan = MortgageLoanApplication.objects.get()
+        self.assertFalse(loan.no_existing_npl)
+
+    def test_archived_loans_are_part_of_the_history(self):
+        repaid = self.create_loan(years_ago=6, loan_term_years=5, identity_card_number='id-123')
+        self.assertEqual(archive_decided_applications(), 1)
+        self.assertFalse(LoanApplication.objects.filter(pk=repaid.pk).exists())
+
+        response = self.client.get(self.url, {'identity_card_number': 'ID 123'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['pk'] for row in response.data['applications']], [repaid.pk])
+        self.assertTrue(response.data['applications'][0]['archived'])
+        self.assertEqual(response.data['completed_loans'], 1)
+        self.assertEqual(response.data['criteria'], {
+            'positive_loan_repayment_history': True,
+            'no_existing_npl': True,
+            'no_existing_delinquent_loan': True,
+        })
+
+    def test_archived_loan_still_running_is_outstanding(self):
+        self.create_loan(years_ago=2, loan_term_years=5)
+        archive_decided_applications()
+        response = self.client.get(self.url, {'account_number': 'ACC-1'})
+        self.assertEqual(response.data['active_loans'], 1)
+        self.assertGreater(response.data['outstanding_amount'], 0)
+        self.assertFalse(response.data['criteria']['no_existing_npl'])
+
+    def test_other_tenants_archives_are_not_read(self):
+        self.create_loan(years_ago=6, loan_term_years=5)
+        archive_decided_applications()
+        response = self.client_for(self.other_officer).get(self.url, {'account_number': 'ACC-1'})
+        self.assertEqual(response.data['total_applications'], 0)
+
+
+class OmittedFieldsTests(CalculatorTestCase):
+    """
+    Fields left out of a submission are appraised as the model would save them.
+    """
+    KYC_FIELDS = ('identity_card_number', 'place_of_birth', 'current_address', 'marital_status', 'profession')
+
+    def criterion(self, appraisal, name):
+        return next(item for item in appraisal['breakdown'] if item['criterion'] == name)
+
+    def test_missing_purpose_is_not_credited(self):
+        data = {key: value for key, value in MORTGAGE.items() if key != 'loan_purpose'}
+        for loan_type in ('mortgage', 'salary_backed'):
+            with self.subTest(loan_type=loan_type):
+                response = self.submit(data, loan_type=loan_type)
+                self.assertEqual(response.status_code, 201, response.data)
+                purpose = [item for item in response.data['appraisal']['breakdown'] if 'purpose' in item['criterion']]
+                self.assertTrue(purpose)
+                self.assertFalse(any(item['passed'] for item in purpose))
+
+    def test_missing_kyc_fields_do_not_pass_full_kyc(self):
+        complete = self.submit().data['appraisal']
+        self.assertTrue(self.criterion(complete, 'full_kyc')['passed'])
+
+        data = {key: value for key, value in MORTGAGE.items() if key not in self.KYC_FIELDS}
+        for path in ('submit/mortgage/', 'quote/mortgage/'):
+            with self.subTest(path=path):
+                response = self.client.post(f'/api/calculator/{path}', data, format='json')
+                self.assertIn(response.status_code, (200, 201), response.data)
+                appraisal = response.data['appraisal']
+                self.assertFalse(self.criterion(appraisal, 'full_kyc')['passed'])
+                self.assertEqual(Decimal(str(appraisal['score'])), Decimal(str(complete['score'])) - 10)
+
+    def test_defaults_of_omitted_fields(self):
+        product = get_loan_product('mortgage')
+        data = product.extract_input({})
+        self.assertIsNone(data['loan_purpose'])
+        self.assertIsNone(data['loan_purpose_document'])
+        self.assertEqual(data['date_of_loan'], datetime.date.today())
+
+    def test_bookkeeping_fields_are_not_inputs(self):
+        for loan_type, product in LOAN_PRODUCTS.items():
+            with self.subTest(loan_type=loan_type):
+                names = {name for name, _, _ in product.input_fields}
+                self.assertFalse(names & {'updated_at', 'deleted_at', 'submission_date', 'identity_key'})
+
+
+class LoanDecisionTests(CalculatorTestCase):
+    url = '/api/calculator/decisions/'
+
+    def setUp(self):
+        super().setUp()
+        self.loan_id = self.submit().data['application_id']
+        self.reviewer = self.create_user('reviewer', self.credit_union)
+        self.reviewer.user_permissions.add(Permission.objects.get(codename='change_loanapplication'))
+
+    def test_plain_member_cannot_decide(self):
+        response = self.client.post(self.url, {'ids': [self.loan_id], 'decision': 'decline'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertNotEqual(LoanApplication.objects.get(pk=self.loan_id).approved, False)
+
+    def test_reviewer_decides_own_tenant_only(self):
+        other_loan_id = self.submit(client=self.client_for(self.other_officer)).data['application_id']
+        response = self.client_for(User.objects.get(pk=self.reviewer.pk)).post(
+            self.url, {'ids': [self.loan_id, other_loan_id], 'decision': 'decline', 'reason': 'Board'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['updated'], [self.loan_id])
+        self.assertEqual(response.data['not_found'], [other_loan_id])
+        loan = LoanApplication.objects.get(pk=self.loan_id)
+        self.assertIs(loan.approved, False)
+        self.assertIn({'reason': 'Board'}, loan.reasons)
+        self.assertIsNot(LoanApplication.objects.get(pk=other_loan_id).approved, False)
+
+    def test_staff_can_decide(self):
+        staff = self.create_user('staff', self.credit_union, is_staff=True)
+        response = self.client_for(staff).post(self.url, {'ids': [self.loan_id], 'decision': 'approve'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(LoanApplication.objects.get(pk=self.loan_id).approved, True)
+
+
+# Keeps the feed's own polls out of the catch-up under test
+@override_settings(LIVE_EVENTS_POLL_SECONDS=60)
+class LiveEventsTests(CalculatorTestCase):
+
+    async def read_events(self, stream, count):
+        events = []
+        while len(events) < count:
+            chunk = await asyncio.wait_for(stream.__anext__(), timeout=5)
+            if chunk.startswith('id:'):
+                events.append(json.loads(chunk.split('data: ', 1)[1]))
+        return events
+
+    async def test_catch_up_drains_a_backlog_larger_than_one_page(self):
+        loan_ids = []
+        for _ in range(5):
+            response = await sync_to_async(self.submit)()
+            loan_ids.append(response.data['application_id'])
+        cursor = (timezone.now() - datetime.timedelta(hours=1), 0)
+
+        with mock.patch.object(live, 'MAX_EVENTS_PER_POLL', 2):
+            stream = live.event_stream(self.credit_union.pk, cursor)
+            try:
+                self.assertEqual(await stream.__anext__(), 'retry: 5000\n\n')
+                events = await self.read_events(stream, 5)
+            finally:
+                await stream.aclose()
+        self.assertEqual([event['id'] for event in events], loan_ids)
+        self.assertEqual({event['change'] for event in events}, {'created'})
+
+
+    async def test_feed_survives_a_failed_poll(self):
+        fetch_changes = live.fetch_changes
+        calls = []
+
+        async def flaky_fetch_changes(tenant_id, cursor):
+            calls.append(cursor)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return await fetch_changes(tenant_id, cursor)
+
+        feed = live.change_feed(self.credit_union.pk)
+        with override_settings(LIVE_EVENTS_POLL_SECONDS=0.01), \
+                mock.patch.object(live, 'fetch_changes', flaky_fetch_changes), \
+                self.assertLogs('calculator.live', 'ERROR') as logs:
+            queue = feed.subscribe()
+            try:
+                loan_id = (await sync_to_async(self.submit)()).data['application_id']
+                event = await asyncio.wait_for(queue.get(), timeout=5)
+            finally:
+                feed.unsubscribe(queue)
+        self.assertEqual(event['id'], loan_id)
+        self.assertGreater(len(calls), 1)
+        self.assertIn('database is locked', logs.output[0])
+
+
+class LoanFilterPlanTests(CalculatorTestCase):
+    """
+    Every filter of loans/ is served by its index (calculator/filters.py).
+    """
+    # Filters on equality whose index also yields the listing's order
+    ORDERED_FILTERS = {'loan_type=mortgage', 'loan_type=mortgage&approved=true', 'approved=pending',
+                       'profession=Teacher', 'location=Douala', '(no filter)'}
+
+    def setUp(self):
+        super().setUp()
+        professions = ['Teacher', 'Trader', 'Farmer', 'Nurse', 'Driver']
+        towns = ['Douala', 'Yaounde', 'Bamenda', 'Buea']
+        appraised = []
+        for n in range(200):
+            appraised.append(build_application(
+                dict(MORTGAGE, loan_type='mortgage' if n % 3 else 'business', profession=professions[n % 5],
+                     current_location=towns[n % 4], loan_amount=str(100000 * (n + 1))),
+                user=self.officer if n % 2 else self.other_officer,
+            ))
+        save_appraised_applications(appraised)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_filters_use_their_index(self):
+        queryset = LoanApplication.objects.for_tenant(self.credit_union)
+        plans = list(explain_filters(queryset, LoanPortfolioPagination.ordering, LoanPortfolioPagination.page_size))
+        self.assertEqual(len(plans), len(FILTER_INDEXES))
+        for label, plan, index_names, served in plans:
+            with self.subTest(label):
+                self.assertTrue(served, f"{label} not served by {index_names}:\n{plan}")
+                if connection.vendor == 'sqlite' and label in self.ORDERED_FILTERS:
+                    self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_case_insensitive_filters(self):
+        response = self.client.get('/api/calculator/loans/', {'profession': 'trader', 'location': 'YAOUNDE'})
+        self.assertEqual(response.status_code, 200)
+        expected = LoanApplication.objects.filter(
+            credit_union=self.credit_union, profession='Trader', current_location='Yaounde',
+        ).count()
+        self.assertGreater(expected, 0)
+        self.assertEqual(len(response.data['results']), expected)
+
+
+class ArchivalTests(CalculatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loan_id = self.submit().data['application_id']
+        LoanApplication.objects.filter(pk=self.loan_id).update(
+            approved=True, submission_date=timezone.now() - datetime.timedelta(days=400),
+        )
+        self.original = MortgageLoanApplication.objects.get(pk=self.loan_id)
+        self.criteria = list(
+            AppraisalCriterionResult.objects.filter(application_id=self.loan_id)
+            .order_by('criterion').values('criterion', 'passed', 'weight_awarded')
+        )
+
+    def test_round_trip(self):
+        self.assertEqual(archive_decided_applications(), 1)
+        self.assertFalse(LoanApplication.objects.filter(pk=self.loan_id).exists())
+        self.assertFalse(AppraisalCriterionResult.objects.filter(application_id=self.loan_id).exists())
+
+        archived = ArchivedLoanApplication.objects.get(original_id=self.loan_id)
+        self.assertEqual(archived.credit_union, self.credit_union)
+        archived_criteria = sorted(archived.criterion_results, key=lambda row: row['criterion'])
+        self.assertEqual(
+            [(row['criterion'], row['passed'], Decimal(str(row['weight_awarded']))) for row in archived_criteria],
+            [(row['criterion'], row['passed'], row['weight_awarded']) for row in self.criteria],
+        )
+        loan, mortgage = archived.to_instances()
+        for field in MortgageLoanApplication._meta.concrete_fields:
+            with self.subTest(field.name):
+                self.assertEqual(getattr(mortgage, field.attname), getattr(self.original, field.attname))
+        self.assertEqual(loan.loan_amount, self.original.loan_amount)
+
+    def test_recent_and_pending_loans_stay(self):
+        pending_id = self.submit().data['application_id']
+        LoanApplication.objects.filter(pk=pending_id).update(
+            approved=None, submission_date=timezone.now() - datetime.timedelta(days=400),
+        )
+        recent_id = self.submit().data['application_id']
+        archive_decided_applications()
+        self.assertEqual(set(LoanApplication.objects.values_list('pk', flat=True)), {pending_id, recent_id})
+
+    def test_archive_lookups_are_tenant_scoped(self):
+        archive_decided_applications()
+        detail = f'/api/calculator/archive/{self.loan_id}/'
+        self.assertEqual(self.client.get(detail).status_code, 200)
+        self.assertEqual(self.client_for(self.other_officer).get(detail).status_code, 404)
+        response = self.client.get('/api/calculator/archive/', {'account_number': 'ACC-1'})
+        self.assertEqual([row['original_id'] for row in response.data], [self.loan_id])
+
+
+class ApplicantSearchTests(CalculatorTestCase):
+
+    def test_applicant_search_tolerates_typos(self):
+        loan_id = self.submit(dict(MORTGAGE, applicant_name='Emmanuel Nkongho')).data['application_id']
+        self.submit(client=self.client_for(self.other_officer))
+        response = self.client.get('/api/calculator/search/', {'q': 'Emanuel Nkongo'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data], [loan_id])
+
+
+class TenancyTests(CalculatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.own_id = self.submit().data['application_id']
+        self.other_id = self.submit(client=self.client_for(self.other_officer)).data['application_id']
+
+    def listed_ids(self, client, path='/api/calculator/loans/'):
+        response = client.get(path)
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['results'] if isinstance(response.data, dict) else response.data
+        return {row['id'] for row in rows}
+
+    def test_loans_are_stamped_with_the_submitters_credit_union(self):
+        self.assertEqual(LoanApplication.objects.get(pk=self.own_id).credit_union, self.credit_union)
+
+    def test_listings_only_show_own_tenant(self):
+        for path in ('/api/calculator/loans/', '/api/calculator/all-loan/'):
+            with self.subTest(path):
+                self.assertEqual(self.listed_ids(self.client, path), {self.own_id})
+                self.assertEqual(self.listed_ids(self.client_for(self.other_officer), path), {self.other_id})
+
+    def test_superuser_sees_every_tenant(self):
+        root = User.objects.create_superuser('root', 'root@example.com', 'S3cure-pass')
+        self.assertEqual(self.listed_ids(self.client_for(root)), {self.own_id, self.other_id})
+
+    def test_user_without_credit_union_sees_own_loans(self):
+        loner = User.objects.create_user('loner', 'loner@example.com', 'S3cure-pass')
+        client = self.client_for(loner)
+        loner_id = self.submit(client=client).data['application_id']
+        self.assertIsNone(LoanApplication.objects.get(pk=loner_id).credit_union_id)
+        self.assertEqual(self.listed_ids(client), {loner_id})
+
+
+@override_settings(LOAN_PURGE_IN_BACKGROUND=False)
+class PurgeTests(CalculatorTestCase):
+
+    def test_soft_delete_hides_then_purge_removes_every_row(self):
+        loan_id = self.submit().data['application_id']
+        kept_id = self.submit().data['application_id']
+        self.assertTrue(ApplicantSearchToken.objects.filter(application_id=loan_id).exists())
+
+        self.assertEqual(soft_delete_applications(LoanApplication.objects.filter(pk=loan_id)), 1)
+        self.assertFalse(LoanApplication.objects.filter(pk=loan_id).exists())
+        self.assertTrue(LoanApplication.all_objects.filter(pk=loan_id).exists())
+        self.assertEqual(purge_progress()['pending'], 1)
+
+        self.assertEqual(purge_deleted_applications(batch_size=1), 1)
+        self.assertFalse(LoanApplication.all_objects.filter(pk=loan_id).exists())
+        self.assertFalse(MortgageLoanApplication.objects.filter(pk=loan_id).exists())
+        self.assertFalse(AppraisalCriterionResult.objects.filter(application_id=loan_id).exists())
+        self.assertFalse(ApplicantSearchToken.objects.filter(application_id=loan_id).exists())
+        self.assertTrue(MortgageLoanApplication.objects.filter(pk=kept_id).exists())
+        self.assertEqual(purge_progress(), dict(purge_progress(), status='idle', purged=1, pending=0))
+
+    def test_progress_is_staff_only(self):
+        url = '/api/calculator/purge/status/'
+        self.assertEqual(self.client.get(url).status_code, 403)
+        staff = self.create_user('staff', self.credit_union, is_staff=True)
+        response = self.client_for(staff).get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], purge_progress()['status'])
+
+
+class QuoteTests(CalculatorTestCase):
+
+    def test_quote_appraises_without_saving(self):
+        response = self.client.post('/api/calculator/quote/mortgage/', MORTGAGE, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('score', response.data['appraisal'])
+        self.assertEqual(LoanApplication.objects.count(), 0)
+
+
+class IdempotencyTests(CalculatorTestCase):
+
+    def test_retry_replays_the_first_response(self):
+        first = self.submit(HTTP_IDEMPOTENCY_KEY='retry-1')
+        self.assertEqual(first.status_code, 201)
+        retry = self.submit(HTTP_IDEMPOTENCY_KEY='retry-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data['application_id'], first.data['application_id'])
+        self.assertEqual(LoanApplication.objects.count(), 1)
+
+    def test_key_reused_for_another_body_is_refused(self):
+        self.submit(HTTP_IDEMPOTENCY_KEY='retry-2')
+        response = self.submit(dict(MORTGAGE, loan_amount='2000000'), HTTP_IDEMPOTENCY_KEY='retry-2')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(LoanApplication.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        self.submit(HTTP_IDEMPOTENCY_KEY='shared')
+        response = self.submit(client=self.client_for(self.other_officer), HTTP_IDEMPOTENCY_KEY='shared')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(LoanApplication.objects.count(), 2)
+
+
+class ResponseCacheTests(CalculatorTestCase):
+
+    def listed_ids(self):
+        response = self.client.get('/api/calculator/all-loan/')
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data}
+
+    def test_listing_cache_follows_new_submissions(self):
+        own_id = self.submit().data['application_id']
+        self.assertEqual(self.listed_ids(), {own_id})
+        # The cached listing is invalidated once the submission commits
+        with self.captureOnCommitCallbacks(execute=True):
+            newer_id = self.submit().data['application_id']
+        self.assertEqual(self.listed_ids(), {own_id, newer_id})
+
+
+@override_settings(THROTTLE_BUDGETS={'submit': {'user': '2/min', 'tenant': '3/min'}, 'quote': {}})
+class ThrottleTests(CalculatorTestCase):
+
+    def test_user_budget(self):
+        self.assertEqual(self.submit().status_code, 201)
+        self.assertEqual(self.submit().status_code, 201)
+        response = self.submit()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(LoanApplication.objects.count(), 2)
+
+    def test_tenant_budget_is_shared(self):
+        colleague = self.client_for(self.create_user('colleague', self.credit_union))
+        self.submit()
+        self.submit()
+        self.assertEqual(self.submit(client=colleague).status_code, 201)
+        self.assertEqual(self.submit(client=colleague).status_code, 429)
+        # Another credit union has its own budget
+        self.assertEqual(self.submit(client=self.client_for(self.other_officer)).status_code, 201)
+
+    def test_batch_costs_one_token_per_application(self):
+        self.submit()
+        batch = [dict(MORTGAGE, loan_type='mortgage')] * 2
+        response = self.client.post('/api/calculator/submit/batch/', batch, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(LoanApplication.objects.count(), 1)
+
+
+class PortfolioAnalyticsTests(CalculatorTestCase):
+
+    def test_portfolio_summary(self):
+        self.submit()
+        self.submit(dict(MORTGAGE, loan_amount='3000000'))
+        self.submit(client=self.client_for(self.other_officer))
+        response = self.client.get('/api/calculator/analytics/portfolio/', {'group_by': 'loan_type'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totals']['applications'], 2)
+        self.assertEqual(Decimal(str(response.data['totals']['total_amount'])), Decimal('4000000'))
+        [group] = response.data['groups']
+        self.assertEqual(group['group'], 'mortgage')
+        self.assertAlmostEqual(group['amount_share'], 1.0)
+
+        response = self.client.get('/api/calculator/analytics/portfolio/', {'group_by': 'month'})
+        self.assertEqual(response.data['groups'][-1]['cumulative_applications'], 2)
+
+    def test_portfolio_rejects_unknown_grouping(self):
+        response = self.client.get('/api/calculator/analytics/portfolio/', {'group_by': 'colour'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncViewTests(CalculatorTestCase):
+    """
+    The async/ endpoints, called through the ASGI handler with a signed JWT.
+    """
+
+    def auth_headers(self, user):
+        access = CustomTokenObtainPairSerializer.get_token(user).access_token
+        return {'Authorization': f'Bearer {access}'}
+
+    async def async_submit(self, headers, data=None, **extra):
+        response = await AsyncClient().post(
+            '/api/calculator/async/submit/mortgage/', data or MORTGAGE, content_type='application/json',
+            headers=dict(headers, **extra),
+        )
+        return response, json.loads(response.content)
+
+    async def test_submit_saves_and_appraises(self):
+        headers = await sync_to_async(self.auth_headers)(self.officer)
+        response, body = await self.async_submit(headers)
+        self.assertEqual(response.status_code, 201)
+        loan = await LoanApplication.objects.aget(pk=body['application_id'])
+        self.assertEqual(loan.credit_union_id, self.credit_union.pk)
+        self.assertEqual(loan.appraisal_score, Decimal(str(body['appraisal']['score'])))
+        self.assertTrue(await AppraisalCriterionResult.objects.filter(application_id=loan.pk).aexists())
+
+    async def test_submit_replays_an_idempotency_key(self):
+        headers = await sync_to_async(self.auth_headers)(self.officer)
+        first, first_body = await self.async_submit(headers, **{'Idempotency-Key': 'async-1'})
+        retry, retry_body = await self.async_submit(headers, **{'Idempotency-Key': 'async-1'})
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry_body['application_id'], first_body['application_id'])
+        self.assertEqual(await LoanApplication.objects.acount(), 1)
+
+        refused, _ = await self.async_submit(headers, dict(MORTGAGE, loan_amount='2000000'), **{'Idempotency-Key': 'async-1'})
+        self.assertEqual(refused.status_code, 422)
+
+    async def test_submit_errors(self):
+        headers = await sync_to_async(self.auth_headers)(self.officer)
+        response = await AsyncClient().post('/api/calculator/async/submit/boat/', MORTGAGE, content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 404)
+        response, body = await self.async_submit(headers, dict(MORTGAGE, loan_amount='not a number'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('loan_amount', body)
+        response = await AsyncClient().post('/api/calculator/async/submit/mortgage/', MORTGAGE, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_quote_does_not_save(self):
+        headers = await sync_to_async(self.auth_headers)(self.officer)
+        response = await AsyncClient().post('/api/calculator/async/quote/mortgage/', MORTGAGE, content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('score', json.loads(response.content)['appraisal'])
+        self.assertEqual(await LoanApplication.objects.acount(), 0)
+
+    async def test_listing_is_tenant_scoped(self):
+        own_id = (await sync_to_async(self.submit)()).data['application_id']
+        other_id = (await sync_to_async(self.submit)(client=self.client_for(self.other_officer))).data['application_id']
+        for user, expected in ((self.officer, own_id), (self.other_officer, other_id)):
+            headers = await sync_to_async(self.auth_headers)(user)
+            response = await AsyncClient().get('/api/calculator/async/all-loan/', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([row['id'] for row in json.loads(response.content)], [expected])
+
+    async def test_tenant_context_is_reset_after_the_view(self):
+        request = APIRequestFactory().get('/api/calculator/async/all-loan/')
+        force_authenticate(request, self.officer)
+        seen = []
+        serializer_class = async_views.LoanApplicationSerializer
+
+        def serializer(*args, **kwargs):
+            seen.append(db_routing._current_tenant.get())
+            return serializer_class(*args, **kwargs)
+
+        token = db_routing.set_current_tenant('outer')
+        try:
+            with mock.patch.object(async_views, 'LoanApplicationSerializer', side_effect=serializer):
+                response = await async_views.AsyncAllLoan.as_view()(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(seen, [self.credit_union.pk])
+            self.assertEqual(db_routing._current_tenant.get(), 'outer')
+        finally:
+            db_routing.reset_current_tenant(token)
+
+
+
+class ConditionalGetTests(CalculatorTestCase):
+    url = '/api/calculator/all-loan/'
+
+    def setUp(self):
+        super().setUp()
+        self.loan_id = self.submit().data['application_id']
+
+    def test_validators_are_sent(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_unchanged_list_is_304_until_a_row_changes(self):
+        first = self.client.get(self.url)
+        etag = first['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        # Saved within the same second: Last-Modified does not move, the ETag does
+        with self.captureOnCommitCallbacks(execute=True):
+            loan = LoanApplication.objects.get(pk=self.loan_id)
+            loan.approver_comments = 'Checked by the board'
+            loan.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data[0]['approver_comments'], 'Checked by the board')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_bulk_decisions_and_new_rows_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        staff = self.create_user('staff', self.credit_union, is_staff=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_for(staff).post('/api/calculator/decisions/', {'ids': [self.loan_id], 'decision': 'decline'}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(response.data[0]['approved'], False)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submit()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_other_tenants_changes_keep_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submit(client=self.client_for(self.other_officer))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # ... and another tenant's ETag is never a match
+        self.assertEqual(self.client_for(self.other_officer).get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ReplicaRoutingTests(CalculatorTestMixin, TransactionTestCase):
+    """
+    The test database has no replica connection: replica_alias() is patched to declare
+    one and ReplicaRouter's choices are recorded, while the queries themselves still run
+    on 'default'. Not a TestCase, whose wrapping transaction keeps every read on 'default'.
+    """
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(db_routing, 'replica_alias', return_value='replica')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = db_routing.ReplicaRouter()
+
+    def routed_reads(self):
+        self.reads = []
+        route = db_routing.ReplicaRouter.db_for_read
+
+        def db_for_read(router, model, **hints):
+            self.reads.append(route(router, model, **hints) or DEFAULT_DB_ALIAS)
+            return None
+        return mock.patch.object(db_routing.ReplicaRouter, 'db_for_read', db_for_read)
+
+    def test_router(self):
+        self.assertIsNone(self.router.db_for_read(LoanApplication))
+        with db_routing.read_from_replica():
+            self.assertEqual(self.router.db_for_read(LoanApplication), 'replica')
+            self.assertEqual(self.router.db_for_write(LoanApplication), DEFAULT_DB_ALIAS)
+            # Reads inside a transaction on the primary see its uncommitted writes
+            with transaction.atomic():
+                self.assertIsNone(self.router.db_for_read(LoanApplication))
+        self.assertIsNone(self.router.db_for_read(LoanApplication))
+
+    def test_without_a_replica_nothing_is_routed(self):
+        db_routing.replica_alias.return_value = None
+        with db_routing.read_from_replica():
+            self.assertIsNone(self.router.db_for_read(LoanApplication))
+
+    def test_list_reads_go_to_the_replica_until_the_user_writes(self):
+        with self.routed_reads():
+            self.assertEqual(self.client.get('/api/calculator/loans/').status_code, 200)
+        self.assertTrue(self.reads)
+        self.assertEqual(set(self.reads), {'replica'})
+
+        # The write itself reads and writes on the primary, and pins the user there
+        with self.routed_reads():
+            self.assertEqual(self.submit().status_code, 201)
+        self.assertEqual(set(self.reads), {DEFAULT_DB_ALIAS})
+        with self.routed_reads():
+            self.client.get('/api/calculator/loans/')
+        self.assertEqual(set(self.reads), {DEFAULT_DB_ALIAS})
+
+        # Other users keep reading from the replica
+        with self.routed_reads():
+            self.client_for(self.other_officer).get('/api/calculator/loans/')
+        self.assertEqual(set(self.reads), {'replica'})
+
+        # ... and so does the writer once REPLICA_STICKY_SECONDS have passed
+        cache.delete(f'replica-sticky:{self.officer.pk}')
+        with self.routed_reads():
+            self.client.get('/api/calculator/loans/')
+        self.assertEqual(set(self.reads), {'replica'})
+
+    def test_failed_writes_do_not_pin_the_user(self):
+        self.assertEqual(self.submit({'loan_amount': 'x'}).status_code, 400)
+        self.assertFalse(db_routing.recently_wrote(self.officer))
+
+    def test_replica_reads_decorator(self):
+        @db_routing.replica_reads
+        def report(request):
+            return db_routing._replica_reads.get()
+
+        request = RequestFactory().get('/report/')
+        request.user = self.officer
+        self.assertIs(report(request), True)
+        self.assertIs(db_routing._replica_reads.get(), False)
+        db_routing.mark_recent_write(self.officer)
+        self.assertIs(report(request), False)
+        request = RequestFactory().post('/report/')
+        request.user = self.other_officer
+        self.assertIs(report(request), False)
+
+
+class AppraisalBreakdownTests(TestCase):
+
+    def appraisal_input(self, product, met):
+        values = {}
+        for field in product.model._meta.concrete_fields:
+            if isinstance(field, models.BooleanField):
+                values[field.name] = met
+            elif field.choices:
+                values[field.name] = field.choices[0][0] if met else None
+            elif isinstance(field, (models.CharField, models.TextField)):
+                values[field.name] = 'A clearly stated purpose for this loan' if met else ''
+        values.update(
+            loan_amount=Decimal('1000000'), annual_interest_rate_percent=Decimal('12'), loan_term_years=1,
+            borrower_gross_monthly_income=Decimal('500000') if met else Decimal('0'),
+            existing_monthly_debt_payments=Decimal('0'),
+        )
+        return values
+
+    def test_breakdown_matches_the_score(self):
+        for loan_type, product in LOAN_PRODUCTS.items():
+            for met in (True, False):
+                with self.subTest(loan_type=loan_type, met=met):
+                    results = product.appraise(self.appraisal_input(product, met))
+                    breakdown = results['breakdown']
+                    self.assertEqual(len({row['criterion'] for row in breakdown}), len(breakdown))
+                    awarded = sum(row['weight_awarded'] for row in breakdown)
+                    self.assertEqual(Decimal(str(results['score'])), min(Decimal(awarded), Decimal('100')))
+                    for row in breakdown:
+                        self.assertTrue(row['passed'] or row['weight_awarded'] == 0, row)
+                    if not met:
+                        self.assertFalse(any(row['passed'] for row in breakdown if row['criterion'] == 'dti'))
 
-# Create your tests here.
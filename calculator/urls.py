@@ -1,75 +1,178 @@
 from django.urls import path
 from .views import (
-    MortgageLoanAppraisalView, 
-    SalaryBackedLoanApplicationView, 
-    LoanWithinSavingsApplicationView,
-    DailySavingsLoanApplicationView,
-    StandingOrderLoanApplicationView,
-    RealEstateLoanApplicationView,
-    ContainerLoanApplicationView,
-    AgriculturalLoanApplicationView,
-    ExpressLoanApplicationView,
-    BusinessLoanApplicationView,
-    AllLoan)
+    LoanApplicationSubmitView,
+    BatchLoanApplicationSubmitView,
+    LoanQuoteView,
+    LoanDecisionView,
+    AllLoan,
+    LoanListView,
+    PortfolioAnalyticsView,
+    CriterionAnalyticsView,
+    ArchivedLoanListView,
+    ArchivedLoanDetailView,
+    ApplicantSearchView,
+    ApplicantHistoryView,
+    PurgeProgressView)
+from .async_views import (
+    AsyncLoanApplicationSubmitView,
+    AsyncLoanQuoteView,
+    AsyncAllLoan,
+    ReviewQueueEventsView)
 
 # The app_name is used for namespacing URLs (e.g., reverse('calculator:submit_mortgage'))
 app_name = 'calculator'
 
 urlpatterns = [
-    # Maps to the desired API endpoint: /api/loan-appraisal/submit/mortgage/
+    # Legacy per-product paths (kept for the frontend and their URL names)
     path(
-        'submit/mortgage/', 
-        MortgageLoanAppraisalView.as_view(), 
+        'submit/mortgage/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'mortgage'},
         name='submit_mortgage_loan'
     ),
     path(
-        'submit/salary-backed/', 
-        SalaryBackedLoanApplicationView.as_view(), 
+        'submit/salary-backed/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'salary_backed'},
         name='submit_salary_backed_loan'
     ),
     path(
-        'submit/within-savings/', 
-        LoanWithinSavingsApplicationView.as_view(), 
+        'submit/within-savings/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'within_savings'},
         name='submit_within_savings_loan'
     ),
     path(
-        'submit/daily-savings/', 
-        DailySavingsLoanApplicationView.as_view(), 
+        'submit/daily-savings/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'daily_savings'},
         name='submit_daily_savings_loan'
     ),
-     path(
-        'submit/standing-order-savings/', 
-        StandingOrderLoanApplicationView.as_view(), 
+    path(
+        'submit/standing-order-savings/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'standing_order'},
         name='submit_standing_order_savings_loan'
     ),
-     path(
-        'submit/real-estate-savings/', 
-        RealEstateLoanApplicationView.as_view(), 
+    path(
+        'submit/real-estate-savings/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'real_estate'},
         name='submit_real_estate_loan'
     ),
-     path(
-        'submit/container-savings/', 
-        ContainerLoanApplicationView.as_view(), 
+    path(
+        'submit/container-savings/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'container'},
         name='submit_container_loan'
     ),
-     path(
-        'submit/agriculural-loan/', 
-        AgriculturalLoanApplicationView.as_view(), 
+    path(
+        'submit/agriculural-loan/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'agricultural'},
         name='submit_agricultural_loan'
     ),
-     path(
-        'submit/express-savings/', 
-        ExpressLoanApplicationView.as_view(), 
+    path(
+        'submit/express-savings/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'express'},
         name='submit_express_savings_loan'
     ),
-     path(
-        'submit/business-savings/', 
-        BusinessLoanApplicationView.as_view(), 
+    path(
+        'submit/business-savings/',
+        LoanApplicationSubmitView.as_view(),
+        {'loan_type': 'business'},
         name='submit_business_savings_loan'
     ),
+    # Many applications of mixed types in one request
+    path(
+        'submit/batch/',
+        BatchLoanApplicationSubmitView.as_view(),
+        name='submit-batch'
+    ),
+    # One view serves every loan type: submit/<loan_type>/ (e.g. submit/salary_backed/)
+    path(
+        'submit/<str:loan_type>/',
+        LoanApplicationSubmitView.as_view(),
+        name='submit-loan'
+    ),
+    # Dry-run appraisal, nothing is saved
+    path(
+        'quote/<str:loan_type>/',
+        LoanQuoteView.as_view(),
+        name='quote-loan'
+    ),
+    # Bulk approve / decline
+    path(
+        'decisions/',
+        LoanDecisionView.as_view(),
+        name='loan-decisions'
+    ),
     path(
         'all-loan/',
         AllLoan.as_view(),
         name='all-loans'
+    ),
+    path(
+        'loans/',
+        LoanListView.as_view(),
+        name='loan-list'
+    ),
+    path(
+        'analytics/criteria/',
+        CriterionAnalyticsView.as_view(),
+        name='criterion-analytics'
+    ),
+    path(
+        'analytics/portfolio/',
+        PortfolioAnalyticsView.as_view(),
+        name='portfolio-analytics'
+    ),
+    path(
+        'archive/',
+        ArchivedLoanListView.as_view(),
+        name='archived-loans'
+    ),
+    path(
+        'archive/<int:original_id>/',
+        ArchivedLoanDetailView.as_view(),
+        name='archived-loan-detail'
+    ),
+    path(
+        'search/',
+        ApplicantSearchView.as_view(),
+        name='applicant-search'
+    ),
+    path(
+        'applicants/history/',
+        ApplicantHistoryView.as_view(),
+        name='applicant-history'
+    ),
+    path(
+        'purge/status/',
+        PurgeProgressView.as_view(),
+        name='purge-status'
+    ),
+    # Async (ASGI) versions of the submission, quote and listing endpoints
+    path(
+        'async/submit/<str:loan_type>/',
+        AsyncLoanApplicationSubmitView.as_view(),
+        name='async-submit-loan'
+    ),
+    path(
+        'async/quote/<str:loan_type>/',
+        AsyncLoanQuoteView.as_view(),
+        name='async-quote-loan'
+    ),
+    path(
+        'async/all-loan/',
+        AsyncAllLoan.as_view(),
+        name='async-all-loan'
+    ),
+    # Server-sent events: new and changed applications of the officer's credit union
+    path(
+        'async/events/',
+        ReviewQueueEventsView.as_view(),
+        name='review-queue-events'
     )
 ]
@@ -1,814 +1,508 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.shortcuts import get_object_or_404
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
+from rest_framework.pagination import CursorPagination
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+import hashlib
+import json
 from decimal import Decimal
 
 # Import Serializer and Logic
 from .serializers import (
-    MortgageLoanApplicationSerializer, 
-    SalaryBackedLoanApplicationSerializer, 
-    LoanWithinSavingsApplicationSerializer,
-    DailySavingsLoanApplicationSerializer,
-    StandingOrderLoanApplicationSerializer,
-    RealEstateLoanApplicationSerializer,
-    ContainerLoanApplicationSerializer,
-    AgriculturalLoanApplicationSerializer,
-    ExpressLoanApplicationSerializer,
-    BusinessLoanApplicationSerializer,
-    LoanApplicationSerializer)
-
-from .appraisal_logic import (
-    appraise_mortgage_loan, 
-    appraise_salary_backed_loan, 
-    appraise_loan_within_savings,
-    appraise_daily_savings_loan,
-    appraise_standing_order_loan,
-    appraise_real_estate_loan,
-    appraise_container_loan,
-    appraise_agricultural_loan,
-    appraise_express_loan,
-    appraise_business_loan)
+    LoanApplicationSerializer,
+    ArchivedLoanApplicationSerializer,
+    LoanDecisionSerializer)
+
 from .models import (
     LoanApplication, # Base model
-    MortgageLoanApplication,
-    SalaryBackedLoanApplication,
-    LoanWithinSavingsApplication,
-    DailySavingsLoanApplication,
-    StandingOrderLoanApplication,
-    RealEstateLoanApplication,
-    ContainerLoanApplication,
-    AgriculturalLoanApplication,
-    ExpressLoanApplication,
-    BusinessLoanApplication,
+    ArchivedLoanApplication,
 )
-
-class MortgageLoanAppraisalView(APIView):
+from .registry import get_loan_product
+from .idempotency import idempotent
+from .ingestion import prepare_application, apply_appraisal_results, save_appraised_applications
+from .criteria import save_criterion_results, criterion_outcome_summary
+from .search import search_applications
+from .history import applicant_history, prefetch_history_criteria, prefill_history_criteria
+from .purge import purge_progress
+from .decisions import decide_applications, decision_totals
+from .filters import LoanApplicationFilter
+from .analytics import DIMENSIONS, portfolio_summary
+from .permissions import IsLoanReviewer
+from loan_appraiser_project.db_routing import ReplicaReadMixin
+from loan_appraiser_project.conditional import ConditionalGetMixin
+from loan_appraiser_project.response_cache import ResponseCacheMixin
+from credit_unions.tenancy import TenantScopedMixin, tenant_scope_for_user
+
+class LoanApplicationSubmitView(TenantScopedMixin, APIView):
     """
-    Handles POST requests for submitting a Mortgage Loan application.
-    
-    1. Validates input data (including files) using the serializer.
+    Handles POST requests for submitting a loan application of any type: submit/<loan_type>/.
+    The loan type's serializer, appraisal function and inputs come from calculator/registry.py.
+
+    1. Validates input data using the loan type's serializer.
     2. Runs the business logic (appraisal score calculation).
     3. Saves the loan application instance with the final appraisal results.
     4. Requires user authentication for security.
+
+    Clients may send an Idempotency-Key header so that retried POSTs are not stored twice.
     """
     # Security: Only authenticated users can submit applications
     # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
-
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = MortgageLoanApplicationSerializer(data=request.data, context={'request': request})
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # # File/Boolean fields: check presence of file or boolean value
-                # 'legal_mortgage_agreement_document': bool(validated_data.get('legal_mortgage_agreement_document')),
-                # File/Boolean fields: check presence of file or boolean value
-                'legal_mortgage_agreement_document': validated_data.get('legal_mortgage_agreement_document', False),
-                'land_title_document': validated_data.get('land_title_document', False),
-                'power_of_attorney_document': validated_data.get('power_of_attorney_document', False),
-                'supporting_documents': validated_data.get('supporting_documents', False),
-                'no_existing_npl': validated_data.get('no_existing_npl', False),
-                'loan_purpose': validated_data.get('loan_purpose', ''), # Text field
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_mortgage_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
-
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-class SalaryBackedLoanApplicationView(APIView):
+    permission_classes = [IsAuthenticated,]
+    # Submission budget per user and per credit union (settings.THROTTLE_BUDGETS)
+    throttle_scope = 'submit'
+
+    # Retries carrying the same Idempotency-Key get the first response back (calculator/idempotency.py)
+    @idempotent
+    def post(self, request, loan_type, *args, **kwargs):
+        product = get_loan_product(loan_type)
+        if product is None:
+            return Response({'detail': f"Unknown loan type '{loan_type}'."}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = product.serializer_class(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            # --- Handle Invalid Data ---
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # --- 1. Prepare Data for Appraisal Logic ---
+        validated_data = serializer.validated_data
+        # Criteria the officer did not submit are filled from the applicant's previous loans
+        prefill_history_criteria(validated_data, product.history_criteria, request)
+
+        # --- 2. Run Appraisal Logic ---
+        appraisal_results = product.appraise(validated_data)
+
+        # --- 3. Save the Application with the Appraisal Results ---
+        loan_instance = self.save_application(serializer, appraisal_results)
+
+        # --- 4. Return Success Response ---
+        response_data = {
+            'message': 'Loan application successfully submitted and appraised.',
+            'application_id': loan_instance.pk,
+            'appraisal': appraisal_results,
+        }
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+    def save_application(self, serializer, appraisal_results):
+        """
+        Saves the application and its per-criterion outcomes together.
+        """
+        with transaction.atomic(using=router.db_for_write(LoanApplication)):
+            # Reasons are stored as a list of dictionaries in the reasons JSONField
+            loan_instance = serializer.save(
+                appraisal_score=appraisal_results['score'],
+                approved=appraisal_results['approved'],
+                reasons=[{'reason': r} for r in appraisal_results['reasons']],
+            )
+            # Store the per-criterion outcomes as compact rows for analytics
+            save_criterion_results(loan_instance, appraisal_results['breakdown'])
+        return loan_instance
+
+# Default seconds a quote stays in the server-side cache and in the client's HTTP cache
+DEFAULT_QUOTE_CACHE_SECONDS = 300
+
+class LoanQuoteView(APIView):
     """
-    Handles POST requests for submitting a Salary Backed Loan application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
+    Dry-run appraisal: quote/<loan_type>/ validates the input with the loan type's
+    serializer, runs the appraisal and returns the score and breakdown without saving
+    anything. Accepts the fields as a JSON/form body (POST) or as query parameters (GET).
+
+    No database access at all: the JWT is verified without loading the user and
+    history-based criteria are taken as submitted, so any number of instances can
+    serve quotes. Identical inputs are answered from the cache, and the response
+    carries an ETag so clients can revalidate with If-None-Match.
     """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
-
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = SalaryBackedLoanApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'copy_of_effective_service_document': validated_data.get('copy_of_effective_service_document', False),
-                'irrevocable_salary_transfer_document': validated_data.get('irrevocable_salary_transfer_document', False),
-                'salary_passing_union_ge_3_months': validated_data.get('salary_passing_union_ge_3_months', False),
-                'savings_ge_1_10_loan': validated_data.get('savings_ge_1_10_loan', False),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_salary_backed_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
+    authentication_classes = [JWTStatelessUserAuthentication,]
+    permission_classes = [IsAuthenticated,]
+    throttle_scope = 'quote'
+
+    def get(self, request, loan_type, format=None):
+        return self.quote(request, loan_type, request.query_params)
+
+    def post(self, request, loan_type, format=None):
+        return self.quote(request, loan_type, request.data)
+
+    def quote(self, request, loan_type, data):
+        product, validated_data, error_response = self.validate_quote(request, loan_type, data)
+        if error_response is not None:
+            return error_response
+        quote_key = self.quote_key(product, validated_data)
+        if self.client_has_quote(request, quote_key):
+            return self.quote_response(quote_key)
+
+        cache_key = f'loan-quote:{quote_key}'
+        appraisal_results = cache.get(cache_key)
+        if appraisal_results is None:
+            appraisal_results = product.appraise(validated_data)
+            cache.set(cache_key, appraisal_results, timeout=self.max_age())
+        return self.quote_response(quote_key, product, appraisal_results)
+
+    # --- Helpers shared with the async quote view (calculator/async_views.py) ---
+
+    def validate_quote(self, request, loan_type, data):
+        """
+        Returns (product, validated_data, None), or (None, None, error response).
+        """
+        product = get_loan_product(loan_type)
+        if product is None:
+            return None, None, Response({'detail': f"Unknown loan type '{loan_type}'."}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = product.serializer_class(data=data, context={'request': request})
+        if not serializer.is_valid():
+            return None, None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return product, serializer.validated_data, None
+
+    def quote_key(self, product, validated_data):
+        # The appraisal is a pure function of the validated input, so the input identifies the quote
+        canonical_input = json.dumps(validated_data, sort_keys=True, default=str)
+        return hashlib.sha256(f'{product.loan_type}:{canonical_input}'.encode()).hexdigest()[:32]
+
+    def max_age(self):
+        return getattr(settings, 'QUOTE_CACHE_SECONDS', DEFAULT_QUOTE_CACHE_SECONDS)
+
+    def client_has_quote(self, request, quote_key):
+        return f'"{quote_key}"' in request.headers.get('If-None-Match', '')
+
+    def quote_response(self, quote_key, product=None, appraisal_results=None):
+        """
+        The quote, or 304 Not Modified when called without a product.
+        """
+        if product is None:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({
+                'loan_type': product.loan_type,
+                'quote_id': quote_key,
                 'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
+            })
+        response['ETag'] = f'"{quote_key}"'
+        patch_cache_control(response, private=True, max_age=self.max_age())
+        return response
 
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+# Default maximum number of applications accepted by one submit/batch/ request
+DEFAULT_BATCH_SUBMIT_MAX_ITEMS = 500
 
-class LoanWithinSavingsApplicationView(APIView):
+class BatchLoanApplicationSubmitView(TenantScopedMixin, APIView):
     """
-    Handles POST requests for submitting a Loan Within Savings application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
-    """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
-
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = LoanWithinSavingsApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'savings_covers_loan_plus_interest': validated_data.get('savings_covers_loan_plus_interest', False),
-                'loan_amount_blocked_in_savings': validated_data.get('loan_amount_blocked_in_savings', False),
-                'no_active_default': validated_data.get('no_active_default', False),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_loan_within_savings(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
+    Handles POST requests carrying many loan applications of mixed types at once
+    (e.g. a field agent syncing after working offline): submit/batch/.
 
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    The body is a JSON array (or {"applications": [...]}) of objects with a 'loan_type'
+    key plus the fields of that loan type. Every item is validated with its loan type's
+    serializer and appraised; the valid ones are inserted together in one transaction
+    with bulk INSERTs. History-based criteria are prefilled from one lookup per table
+    for the whole batch. Invalid items are reported without blocking the others.
 
-class DailySavingsLoanApplicationView(APIView):
+    Response: {'created': n, 'failed': n, 'results': [per item, in request order]}
+    with status 201 (all created), 207 (some failed) or 400 (none created).
     """
-    Handles POST requests for submitting a Daily Savings Loan application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
-    """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
-
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = DailySavingsLoanApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'signed_deduction_agreement_document': validated_data.get('signed_deduction_agreement_document', False),
-                'valid_surety_bond_document': validated_data.get('valid_surety_bond_document', False),
-                'daily_savings_active_ge_6_months': validated_data.get('daily_savings_active_ge_6_months', False),
-                'positive_loan_repayment_history': validated_data.get('positive_loan_repayment_history', False),
-                'savings_balance_ge_1_5_loan': validated_data.get('savings_balance_ge_1_5_loan', False),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_daily_savings_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
+    permission_classes = [IsAuthenticated,]
+    throttle_scope = 'submit'
 
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    def get_throttle_cost(self, request):
+        # A batch spends one submission token per application
+        items = request.data.get('applications') if isinstance(request.data, dict) else request.data
+        return len(items) if isinstance(items, list) and items else 1
 
-class StandingOrderLoanApplicationView(APIView):
+    @idempotent
+    def post(self, request, *args, **kwargs):
+        items = request.data.get('applications') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': 'Send a non-empty JSON array of loan applications.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        max_items = getattr(settings, 'BATCH_SUBMIT_MAX_ITEMS', DEFAULT_BATCH_SUBMIT_MAX_ITEMS)
+        if len(items) > max_items:
+            return Response(
+                {'detail': f'A batch may contain at most {max_items} applications.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # --- 1. Validate every item ---
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            product = get_loan_product(item.get('loan_type', '')) if isinstance(item, dict) else None
+            if product is None:
+                results[index] = {'index': index, 'status': 'invalid', 'errors': {'loan_type': ['Unknown or missing loan type.']}}
+                continue
+            serializer = product.serializer_class(data=item, context={'request': request})
+            if not serializer.is_valid():
+                results[index] = {'index': index, 'status': 'invalid', 'errors': serializer.errors}
+                continue
+            valid.append((index, product, serializer.validated_data))
+
+        # --- 2. Appraise them, with the applicants' histories read for the whole batch at once ---
+        prefetch_history_criteria([(validated_data, product.history_criteria) for _, product, validated_data in valid], request)
+        appraised = []
+        for index, product, validated_data in valid:
+            prefill_history_criteria(validated_data, product.history_criteria, request)
+            appraisal_results = product.appraise(validated_data)
+
+            loan_instance = product.model(loan_type=product.loan_type, **validated_data)
+            prepare_application(loan_instance, user=request.user)
+            apply_appraisal_results(loan_instance, appraisal_results)
+            appraised.append((loan_instance, appraisal_results))
+            results[index] = {'index': index, 'status': 'created', 'loan_type': product.loan_type, 'appraisal': appraisal_results}
+
+        # --- 3. Persist all valid applications in bulk, in one transaction ---
+        save_appraised_applications(appraised)
+        created_results = (result for result in results if result['status'] == 'created')
+        for result, (loan_instance, _) in zip(created_results, appraised):
+            result['application_id'] = loan_instance.pk
+
+        created = len(appraised)
+        failed = len(results) - created
+        if failed == 0:
+            response_status = status.HTTP_201_CREATED
+        elif created == 0:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({'created': created, 'failed': failed, 'results': results}, status=response_status)
+
+# Default maximum number of applications decided by one decisions/ request
+DEFAULT_BULK_DECISION_MAX_IDS = 1000
+
+class LoanDecisionView(TenantScopedMixin, APIView):
     """
-    Handles POST requests for submitting a Standing Order Loan application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
+    Approves or declines many applications at once, e.g. at the end of a board
+    session: POST decisions/ {"ids": [...], "decision": "approve" | "decline",
+    "reason": optional, "comment": optional}.
+
+    The decision is written with a single UPDATE (reasons are appended by the
+    database), limited to the reviewer's credit union. Returns the ids updated,
+    unchanged (already carrying the decision) and not found, plus the tenant's
+    approved / declined / pending totals. Only reviewers (staff or users with
+    calculator.change_loanapplication) may decide.
     """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
-
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = StandingOrderLoanApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'standing_order_active_ge_3_months': validated_data.get('standing_order_active_ge_3_months', False),
-                'loan_duration_le_1_year': validated_data.get('loan_duration_le_1_year', False),
-                'savings_balance_ge_1_5_loan': validated_data.get('savings_balance_ge_1_5_loan', False),
-                'no_existing_default_or_delinquency': validated_data.get('no_existing_default_or_delinquency', False),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_standing_order_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
-
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-class RealEstateLoanApplicationView(APIView):
+    permission_classes = [IsAuthenticated, IsLoanReviewer]
+
+    def post(self, request, format=None):
+        serializer = LoanDecisionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        max_ids = getattr(settings, 'BULK_DECISION_MAX_IDS', DEFAULT_BULK_DECISION_MAX_IDS)
+        if len(data['ids']) > max_ids:
+            return Response(
+                {'detail': f'At most {max_ids} applications can be decided per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        applications = LoanApplication.objects.for_user(request.user)
+        result = decide_applications(
+            applications,
+            data['ids'],
+            data['decision'],
+            reason=data.get('reason'),
+            comment=data.get('comment'),
+        )
+        result['decision'] = data['decision']
+        result['totals'] = decision_totals(applications)
+        return Response(result)
+
+class AllLoan(ConditionalGetMixin, ResponseCacheMixin, TenantScopedMixin, ReplicaReadMixin, APIView):
+    # Scoped to the requesting user's credit union, so the caller must be authenticated
+    permission_classes = [IsAuthenticated,]
+    def get(self, request, format=None):
+        # Polls answer 304 from COUNT + MAX(updated_at) over the tenant's rows (one index range)
+        # when nothing changed; soft-deleted rows are included so the query stays index-only
+        not_modified = self.not_modified(
+            request,
+            LoanApplication.all_objects.for_user(request.user),
+            scope=f'all-loan:{self.tenant_id}:{request.user.pk}',
+        )
+        if not_modified is not None:
+            return not_modified
+        loans_under_review = LoanApplication.objects.for_user(request.user).filter(
+            # user=request.user, # <--- Filter by current user
+            appraisal_score__isnull=False
+        ).order_by('-submission_date')
+        # Serialized once per tenant until a loan of the tenant is saved or deleted
+        return self.cached_response(
+            request,
+            tenant_scope_for_user(request.user),
+            lambda: LoanApplicationSerializer(loans_under_review, many=True).data,
+        )
+
+class LoanPortfolioPagination(CursorPagination):
     """
-    Handles POST requests for submitting a Real Estate Loan application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
+    Keyset pages (?cursor=...), so deep pages cost the same as the first one.
     """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
-
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = RealEstateLoanApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'legal_mortgage_agreement_document_re': validated_data.get('legal_mortgage_agreement_document_re', False),
-                'loan_duration_ge_10_years': validated_data.get('loan_duration_ge_10_years', False),
-                'loan_amount_le_10_percent_paid_up_capital': validated_data.get('loan_amount_le_10_percent_paid_up_capital', False),
-                'land_title_in_borrowers_name': validated_data.get('land_title_in_borrowers_name', False),
-                'valid_proof_of_source_of_income': validated_data.get('valid_proof_of_source_of_income', False),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_real_estate_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
+    ordering = ('-submission_date', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
 
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-class ContainerLoanApplicationView(APIView):
+class LoanListView(TenantScopedMixin, ReplicaReadMixin, APIView):
     """
-    Handles POST requests for submitting a Real Estate Loan application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
+    Filtered, paginated listing of the caller's portfolio: loans/?loan_type=mortgage&approved=pending&amount_min=500000
+    Filters (all index-backed, see calculator/filters.py): loan_type, approved (true/false/pending),
+    score_min/score_max, amount_min/amount_max, date_of_loan_after/date_of_loan_before (YYYY-MM-DD),
+    credit_union, profession, location.
     """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
-
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = ContainerLoanApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'custom_clearance_plan_document': validated_data.get('custom_clearance_plan_document', False),
-                'bill_of_lading_document': validated_data.get('bill_of_lading_document', False),
-                'savings_balance_amount': validated_data.get('savings_balance_amount', False),
-                'savings_balance_ge_1_5_loan': validated_data.get('savings_balance_ge_1_5_loan', False),
-                'valid_proof_of_source_of_income': validated_data.get('valid_proof_of_source_of_income', False),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_container_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
+    permission_classes = [IsAuthenticated,]
+    pagination_class = LoanPortfolioPagination
 
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-class AgriculturalLoanApplicationView(APIView):
+    def get(self, request, format=None):
+        filterset = LoanApplicationFilter(request.query_params, queryset=LoanApplication.objects.for_user(request.user), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        paginator = self.pagination_class()
+        loans = paginator.paginate_queryset(filterset.qs, request, view=self)
+        serializer = LoanApplicationSerializer(loans, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+class PortfolioAnalyticsView(ResponseCacheMixin, TenantScopedMixin, ReplicaReadMixin, APIView):
     """
-    Handles POST requests for submitting a Agricultural Loan application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
+    Count, total and average amount, average score and approval rate of the caller's
+    portfolio, overall and per group, aggregated by the database (calculator/analytics.py).
+    Query parameters: group_by (loan_type, month, credit_union or profession; default
+    loan_type) and any filter of loans/ (calculator/filters.py).
+    Cached per tenant until one of its loans is saved or deleted.
     """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
+    permission_classes = [IsAuthenticated,]
 
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = AgriculturalLoanApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'total_cost_estimate_document': validated_data.get('total_cost_estimate_document', False),
-                'is_land_personal_belonging': validated_data.get('is_land_personal_belonging', False),
-                'has_authorization_of_usage': validated_data.get('has_authorization_of_usage', False),
-                'loan_purpose_category': validated_data.get('loan_purpose_category'),
-                'savings_balance_amount': validated_data.get('savings_balance_amount'),
-                'savings_balance_ge_1_5_loan': validated_data.get('savings_balance_ge_1_5_loan', False),
-                'valid_proof_of_source_of_income': validated_data.get('valid_proof_of_source_of_income', False),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_agricultural_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
+    def get(self, request, format=None):
+        group_by = request.query_params.get('group_by', 'loan_type')
+        if group_by not in DIMENSIONS:
+            return Response({'group_by': [f"Choose one of: {', '.join(DIMENSIONS)}."]}, status=status.HTTP_400_BAD_REQUEST)
+        filterset = LoanApplicationFilter(request.query_params, queryset=LoanApplication.objects.for_user(request.user), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        return self.cached_response(
+            request,
+            tenant_scope_for_user(request.user),
+            lambda: portfolio_summary(filterset.qs, group_by),
+        )
+
+class CriterionAnalyticsView(TenantScopedMixin, ReplicaReadMixin, APIView):
+    """
+    Returns pass/fail counts per appraisal criterion.
+    Optional query parameters: loan_type, criterion, submitted_from and submitted_to (YYYY-MM-DD).
+    """
+    permission_classes = [IsAuthenticated,]
 
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    def get(self, request, format=None):
+        dates = {}
+        for param in ('submitted_from', 'submitted_to'):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                dates[param] = parse_date(value)
+            except ValueError:
+                dates[param] = None
+            if dates[param] is None:
+                return Response({param: ['Enter a valid date (YYYY-MM-DD).']}, status=status.HTTP_400_BAD_REQUEST)
+        summary = criterion_outcome_summary(
+            loan_type=request.query_params.get('loan_type'),
+            criterion=request.query_params.get('criterion'),
+            applications=LoanApplication.objects.for_user(request.user),
+            **dates,
+        )
+        return Response(summary)
+
+# Maximum number of archived applications returned by one lookup
+ARCHIVE_LOOKUP_LIMIT = 100
+
+class ArchivedLoanListView(TenantScopedMixin, ReplicaReadMixin, APIView):
+    """
+    Read-only lookup of archived (decided, older) loan applications.
+    Optional query parameters: account_number, identity_card_number, loan_type.
+    """
+    permission_classes = [IsAuthenticated,]
 
-class ExpressLoanApplicationView(APIView):
+    def get(self, request, format=None):
+        archived_loans = ArchivedLoanApplication.objects.for_user(request.user)
+        for param in ('account_number', 'identity_card_number', 'loan_type'):
+            value = request.query_params.get(param)
+            if value:
+                archived_loans = archived_loans.filter(**{param: value})
+        archived_loans = archived_loans.order_by('-submission_date')[:ARCHIVE_LOOKUP_LIMIT]
+        serializer = ArchivedLoanApplicationSerializer(archived_loans, many=True)
+        return Response(serializer.data)
+
+class ArchivedLoanDetailView(TenantScopedMixin, APIView):
     """
-    Handles POST requests for submitting a Express Loan application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
+    Returns one archived loan application by the id it had before archival.
     """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
+    permission_classes = [IsAuthenticated,]
 
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = ExpressLoanApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'salary_deducted_at_source_or_standing_order': validated_data.get('salary_deducted_at_source_or_standing_order', False),
-                'effective_service_available': validated_data.get('effective_service_available', False),
-                'clearly_valid_purpose_of_loan': validated_data.get('clearly_valid_purpose_of_loan', False),
-                'savings_balance_amount': validated_data.get('savings_balance_amount'),
-                'savings_balance_ge_1_10_loan': validated_data.get('savings_balance_ge_1_10_loan', False),
-                'no_existing_delinquent_loan': validated_data.get('no_existing_delinquent_loan', False),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_express_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
+    def get(self, request, original_id, format=None):
+        archived_loan = get_object_or_404(ArchivedLoanApplication.objects.for_user(request.user), original_id=original_id)
+        serializer = ArchivedLoanApplicationSerializer(archived_loan)
+        return Response(serializer.data)
 
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+# Maximum number of applications returned by one applicant search
+APPLICANT_SEARCH_MAX_LIMIT = 100
 
-class BusinessLoanApplicationView(APIView):
+class ApplicantSearchView(TenantScopedMixin, APIView):
     """
-    Handles POST requests for submitting a Business Loan application.
-    
-    1. Validates input data (including files) using the serializer.
-    2. Runs the business logic (appraisal score calculation).
-    3. Saves the loan application instance with the final appraisal results.
-    4. Requires user authentication for security.
+    Prefix and typo-tolerant lookup of loan applications by applicant name, email,
+    account number or ID card number, served by the applicant search index.
+    Query parameters: q (required), limit (optional, default 25, max 100).
     """
-    # Security: Only authenticated users can submit applications
-    # This is critical since the LoanApplication model uses a ForeignKey to User.
-    permission_classes = [AllowAny,] 
+    permission_classes = [IsAuthenticated,]
 
-    def post(self, request, *args, **kwargs):
-        # DRF handles file uploads (multipart/form-data) seamlessly with ModelSerializer
-        serializer = BusinessLoanApplicationSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            
-            # --- 1. Prepare Data for Appraisal Logic ---
-            validated_data = serializer.validated_data
-            
-            # Extract fields and convert file fields to booleans for the appraisal logic
-            # The actual FileField data is passed directly through the serializer to .save()
-            appraisal_input = {
-                'loan_amount': validated_data.get('loan_amount'),
-                'annual_interest_rate_percent': validated_data.get('annual_interest_rate_percent'),
-                'loan_term_years': validated_data.get('loan_term_years'),
-                'borrower_gross_monthly_income': validated_data.get('borrower_gross_monthly_income'),
-                'existing_monthly_debt_payments': validated_data.get('existing_monthly_debt_payments'),
-                
-                # File/Boolean fields: check presence of file or boolean value
-                'land_documents_attached': validated_data.get('land_documents_attached', False),
-                'valid_source_of_income_for_repayment': validated_data.get('valid_source_of_income_for_repayment', False),
-                'savings_balance_ge_20_percent_loan': validated_data.get('savings_balance_ge_20_percent_loan', False),
-                'cost_estimate_provided': validated_data.get('cost_estimate_provided'),
-                
-                
-                # KYC fields for the _check_full_kyc helper
-                'identity_card_number': validated_data.get('identity_card_number'),
-                'place_of_birth': validated_data.get('place_of_birth'),
-                'date_of_birth': validated_data.get('date_of_birth'),
-                'current_address': validated_data.get('current_address'),
-                'marital_status': validated_data.get('marital_status'),
-                'profession': validated_data.get('profession'),
-            }
-            
-            # --- 2. Run Appraisal Logic ---
-            appraisal_results = appraise_business_loan(appraisal_input)
-
-            # --- 3. Update validated_data with Appraisal Results ---
-            validated_data['appraisal_score'] = appraisal_results['score']
-            validated_data['approved'] = appraisal_results['approved']
-            
-            # Convert list of strings to list of dictionaries for the reasons JSONField
-            validated_data['reasons'] = [{'reason': r} for r in appraisal_results['reasons']] 
-
-            # Set the user who submitted the application
-            # validated_data['user'] = request.user 
-            
-            # --- 4. Save the Application ---
-            # The serializer automatically handles saving the instance and the uploaded files.
-            loan_instance = serializer.save(**validated_data)
-            
-            # --- 5. Return Success Response ---
-            response_data = {
-                'message': 'Loan application successfully submitted and appraised.',
-                'application_id': loan_instance.pk,
-                'appraisal': appraisal_results,
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED)
+    def get(self, request, format=None):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'q': ['This query parameter is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 25)), APPLICANT_SEARCH_MAX_LIMIT)
+        except ValueError:
+            return Response({'limit': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        loans = search_applications(query, limit=max(limit, 1), queryset=LoanApplication.objects.for_user(request.user))
+        serializer = LoanApplicationSerializer(loans, many=True)
+        results = serializer.data
+        for item, loan in zip(results, loans):
+            item['search_similarity'] = loan.search_similarity
+        return Response(results)
+
+
+class ApplicantHistoryView(TenantScopedMixin, APIView):
+    """
+    Previous applications, outcomes and outstanding amounts of an applicant,
+    matched on the normalized identity_card_number and/or account_number query parameters.
+    """
+    permission_classes = [IsAuthenticated,]
 
-        # --- Handle Invalid Data ---
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    def get(self, request, format=None):
+        identity_card_number = request.query_params.get('identity_card_number')
+        account_number = request.query_params.get('account_number')
+        if not identity_card_number and not account_number:
+            return Response(
+                {'detail': 'Provide identity_card_number and/or account_number.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        history = applicant_history(
+            identity_card_number,
+            account_number,
+            request=request,
+            applications=LoanApplication.objects.for_user(request.user),
+            archived_applications=ArchivedLoanApplication.objects.for_user(request.user),
+        )
+        return Response(history)
+
+
+class PurgeProgressView(APIView):
+    """
+    Progress of the background purge of soft-deleted loan applications:
+    {'status': 'running' | 'idle' | 'failed', 'purged': ..., 'pending': ..., 'updated_at': ...}
+    The counts span every credit union, so only staff may read them.
+    """
+    permission_classes = [IsAdminUser,]
 
-class AllLoan(APIView):
-    permission_classes = [AllowAny,]
     def get(self, request, format=None):
-        loans_under_review = LoanApplication.objects.filter(
-            # user=request.user, # <--- Filter by current user
-            appraisal_score__isnull=False
-        ).order_by('-submission_date')
-        serializer = LoanApplicationSerializer(loans_under_review, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(purge_progress())
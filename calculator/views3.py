@@ -58,7 +58,13 @@ from .models import (
     AgriculturalLoanApplication,
     ExpressLoanApplication,
     BusinessLoanApplication,
+    ArchivedLoanApplication,
 )
+from .criteria import save_criterion_results
+from .purge import soft_delete_applications
+from loan_appraiser_project.db_routing import replica_reads
+from loan_appraiser_project.response_cache import cached_value
+from loan_appraiser_project.throttling import throttle_scope
 
 # --- NEW AUTHENTICATION VIEWS ---
 def signup_view(request):
@@ -129,12 +135,15 @@ def get_dashboard_data(request):
     # If your field is named 'applicant', change 'user=request.user' to 'applicant=request.user'
     user_loans = LoanApplication.objects.filter(user=request.user)
 
-    total_approved_loans = user_loans.filter(approved=True).count()
+    def compute():
+        total_approved_loans = user_loans.filter(approved=True).count()
 
-    # Fetch recent applications for the current user
-    recent_applications = user_loans.order_by('-submission_date')[:5]
+        # Fetch recent applications for the current user
+        recent_applications = list(user_loans.order_by('-submission_date')[:5])
+        return total_approved_loans, recent_applications
 
-    return total_approved_loans, recent_applications
+    # Recomputed only after one of the user's applications is saved or deleted
+    return cached_value('dashboard', f'user:{request.user.pk}', compute)
 
 # --- Automated Appraisal Logic ---
 def perform_automated_appraisal(loan_instance):
@@ -314,6 +323,9 @@ def perform_automated_appraisal(loan_instance):
 
     loan_instance.save() # Save the updated appraisal fields
 
+    # Store the per-criterion outcomes as compact rows for analytics
+    save_criterion_results(loan_instance, appraisal_results.get('breakdown', []))
+
 # --- Main Loan Selection View ---
 @login_required # Protect this view
 def loan_selection_view(request):
@@ -469,6 +481,7 @@ def appraisal_results_display_view(request):
     return render(request, 'calculator/appraisal_results.html', context)
 
 @login_required # Protect this view
+@replica_reads # Reporting page: served by the read replica when configured
 def approved_loans_list(request):
     """
     Displays a list of all approved loan applications for the current user. Requires login.
@@ -511,16 +524,22 @@ def loan_review_dashboard(request):
 
 # --- New View: Download Appraisal PDF ---
 @login_required # Protect this view
+@throttle_scope('export') # Export budget per user and per credit union
+@replica_reads # PDF export: served by the read replica when configured
 def download_appraisal_pdf(request, pk):
     """
     Generates and allows downloading of a PDF appraisal report for a specific loan. Requires login.
     """
     # Ensure the loan belongs to the current user for security
-    loan = get_object_or_404(LoanApplication, pk=pk, user=request.user) # <--- Added user filter
+    loan = LoanApplication.objects.filter(pk=pk, user=request.user).first() # <--- Added user filter
 
     # Dynamically get the specific loan type instance
     specific_loan_instance = None
-    if loan.loan_type == 'mortgage':
+    if loan is None:
+        # Decided loans older than LOAN_ARCHIVE_AFTER_DAYS are served from the archive table
+        archived_loan = get_object_or_404(ArchivedLoanApplication, original_id=pk, user=request.user)
+        loan, specific_loan_instance = archived_loan.to_instances()
+    elif loan.loan_type == 'mortgage':
         specific_loan_instance = loan.mortgageloanapplication
     elif loan.loan_type == 'salary_backed':
         specific_loan_instance = loan.salarybackedloanapplication
@@ -571,11 +590,12 @@ def delete_approved_loans(request):
     if request.method == 'POST':
         selected_loan_ids = request.POST.getlist('selected_loans')
         if selected_loan_ids:
-            # Delete selected loans, ensuring they belong to the current user
-            deleted_count, _ = LoanApplication.objects.filter(
+            # Hide selected loans at once (soft delete), ensuring they belong to the current user.
+            # The rows are hard-deleted in batches by the background purge worker.
+            deleted_count = soft_delete_applications(LoanApplication.objects.filter(
                 pk__in=selected_loan_ids,
                 user=request.user # <--- Added user filter for security
-            ).delete()
+            ))
             messages.success(request, f"{deleted_count} approved loan(s) deleted successfully.")
         else:
             messages.warning(request, "No loans selected for deletion.")
@@ -1,7 +1,9 @@
 from django.contrib import admin
 from .models import CreditUnion
+from .tenancy import bump_tenant_policy_version
+from loan_appraiser_project.db_routing import ReplicaReadAdminMixin
 # Register your models here.
-class CreditUnionAdmin(admin.ModelAdmin):
+class CreditUnionAdmin(ReplicaReadAdminMixin, admin.ModelAdmin):
     # Fields to display in the main change list view
     list_display = ('name', 'contact_email', 'address')
     
@@ -11,5 +13,11 @@ class CreditUnionAdmin(admin.ModelAdmin):
     # Fields to use for filtering in the sidebar
     list_filter = ('address',)
 
+    actions = ['expire_tokens']
+
+    @admin.action(description="Make users refresh their tokens (re-read credit union claims)")
+    def expire_tokens(self, request, queryset):
+        bump_tenant_policy_version(*queryset.values_list('pk', flat=True))
+
 # If you don't need customization, you can use the simple registration:
 admin.site.register(CreditUnion, CreditUnionAdmin)
\ No newline at end of file
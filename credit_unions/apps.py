@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CreditUnionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'credit_unions'
+
+    def ready(self):
+        # Registers the signal receivers (response cache invalidation)
+        from . import signals  # noqa: F401
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_unions', '0002_creditunion_userprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creditunion',
+            name='policy_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
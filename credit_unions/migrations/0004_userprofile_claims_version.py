@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit_unions', '0003_creditunion_policy_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='claims_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from .tenancy import TenantManager
 
 User = get_user_model()
 class CreditUnion(models.Model):
@@ -11,6 +12,10 @@ class CreditUnion(models.Model):
     name = models.CharField(max_length=255, unique=True, help_text="The full legal name of the credit union.")
     address = models.TextField(blank=True, help_text="The physical address.")
     contact_email = models.EmailField(blank=True, help_text="Main contact email for the union.")
+    # NEW: Last change, used as the validator for conditional GETs (see loan_appraiser_project/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # NEW: Signed into access tokens; bumping it makes every token of the union stale (see tenancy.py)
+    policy_version = models.PositiveIntegerField(default=1, editable=False)
 
     def __str__(self):
         return self.name
@@ -37,5 +42,19 @@ class UserProfile(models.Model):
         help_text="The Credit Union the user belongs to."
     )
 
+    # NEW: Last change, used as the validator for conditional GETs
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # NEW: Signed into the user's tokens; bumped when the user changes credit union (see tenancy.py)
+    claims_version = models.PositiveIntegerField(default=1, editable=False)
+
+    # NEW: UserProfile.objects.for_user(request.user) lists the profiles of the user's credit union
+    objects = TenantManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['credit_union', 'updated_at'], name='cu_profile_cu_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Profile for {self.user.username}"
\ No newline at end of file
@@ -0,0 +1,58 @@
+# credit_unions/signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import CreditUnion, UserProfile
+from .tenancy import expire_user_tenant_claims, tenant_scope
+from loan_appraiser_project.response_cache import invalidate
+
+
+@receiver([post_save, post_delete], sender=CreditUnion)
+def invalidate_credit_union_responses(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    scopes = ['credit-unions']
+    if kwargs.get('signal') is post_delete:
+        # Deleting a credit union detaches its profiles (SET_NULL) without signals
+        scopes += ['all', tenant_scope(instance.pk)]
+    invalidate(*scopes, using=instance._state.db)
+
+
+@receiver(pre_save, sender=UserProfile)
+def remember_previous_credit_union(sender, instance, raw=False, **kwargs):
+    # A profile moved to another credit union leaves the old tenant's lists too
+    instance._previous_credit_union_id = None
+    if not raw and not instance._state.adding:
+        instance._previous_credit_union_id = (
+            UserProfile.objects.using(instance._state.db)
+            .filter(pk=instance.pk)
+            .values_list('credit_union_id', flat=True)
+            .first()
+        )
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_profile_responses(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate(
+        'all',
+        tenant_scope(instance.credit_union_id, instance.user_id),
+        tenant_scope(getattr(instance, '_previous_credit_union_id', None)),
+        using=instance._state.db,
+    )
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def expire_tenant_claims_on_move(sender, instance, raw=False, created=False, **kwargs):
+    """
+    A user moved to another credit union (or removed from one) still holds tokens
+    claiming the old one: make that user's tokens stale so they refresh.
+    """
+    if raw or created:
+        return
+    previous = getattr(instance, '_previous_credit_union_id', None)
+    if kwargs.get('signal') is post_delete or previous != instance.credit_union_id:
+        # Without the profile the user's claims become (None, 1), which no token of a union matches
+        expire_user_tenant_claims(instance.user_id, using=instance._state.db)
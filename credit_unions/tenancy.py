@@ -0,0 +1,208 @@
+# credit_unions/tenancy.py
+"""
+Tenant (credit union) scoping.
+
+Every loan-related model carries a credit_union foreign key; TenantManager adds
+for_user()/for_tenant() so views only read the requesting user's credit union.
+Superusers see every tenant; users without a credit union only see the records
+they created themselves.
+"""
+
+import inspect
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, router, transaction
+from django.db.models import F
+
+from loan_appraiser_project.db_routing import set_current_tenant, reset_current_tenant
+
+
+# Defaults, overridable in settings.py
+DEFAULT_TENANT_POLICY_VERSION_CACHE_SECONDS = 60
+
+# Signed claims of the access and refresh tokens (Authentication/serializers.py)
+TENANT_CLAIM = 'credit_union_id'
+TENANT_VERSION_CLAIM = 'tenant_version'
+PROFILE_VERSION_CLAIM = 'profile_version'
+TENANT_POLICY_VERSION_KEY = 'tenant-policy-version:{credit_union_id}'
+USER_TENANT_CLAIMS_KEY = 'user-tenant-claims:{user_id}'
+
+
+def tenant_id_for_user(user):
+    """
+    Returns the id of the user's credit union (or None), cached on the user object
+    so one request never looks the profile up twice. Users authenticated by a token
+    carrying the credit_union_id claim already have it set (no query at all).
+    """
+    if user is None or not user.is_authenticated:
+        return None
+    if not hasattr(user, '_tenant_id'):
+        from .models import UserProfile  # models.py imports TenantManager from here
+        user._tenant_id = (
+            UserProfile.objects.filter(user_id=user.pk)
+            .values_list('credit_union_id', flat=True)
+            .first()
+        )
+    return user._tenant_id
+
+
+def tenant_claims_for_user(user):
+    """
+    The tenant claims to sign into a token for `user`, read with one query:
+    {'credit_union_id': id or None, 'tenant_version': the union's policy_version or None,
+    'profile_version': the profile's claims_version (1 without a profile)}.
+    """
+    from .models import UserProfile
+    credit_union_id, version, profile_version = (
+        UserProfile.objects.filter(user_id=user.pk)
+        .values_list('credit_union_id', 'credit_union__policy_version', 'claims_version')
+        .first()
+    ) or (None, None, 1)
+    return {TENANT_CLAIM: credit_union_id, TENANT_VERSION_CLAIM: version, PROFILE_VERSION_CLAIM: profile_version}
+
+
+def user_tenant_claims(user_id, refresh=False):
+    """
+    (credit_union_id, claims_version) the user's tokens must carry, cached for
+    TENANT_POLICY_VERSION_CACHE_SECONDS; (None, 1) without a profile.
+    `refresh` reads the database even when cached.
+    """
+    key = USER_TENANT_CLAIMS_KEY.format(user_id=user_id)
+    claims = None if refresh else cache.get(key)
+    if claims is None:
+        from .models import UserProfile
+        claims = (
+            UserProfile.objects.filter(user_id=user_id)
+            .values_list('credit_union_id', 'claims_version')
+            .first()
+        ) or (None, 1)
+        cache.set(key, tuple(claims), timeout=getattr(settings, 'TENANT_POLICY_VERSION_CACHE_SECONDS', DEFAULT_TENANT_POLICY_VERSION_CACHE_SECONDS))
+    return tuple(claims)
+
+
+def expire_user_tenant_claims(*user_ids, using=None):
+    """
+    Makes the tokens of these users (e.g. moved to another credit union) stale,
+    leaving the other users of their unions alone.
+    """
+    from .models import UserProfile
+    user_ids = {pk for pk in user_ids if pk is not None}
+    if not user_ids:
+        return
+    using = using or router.db_for_write(UserProfile)
+    UserProfile.objects.using(using).filter(user_id__in=user_ids).update(claims_version=F('claims_version') + 1)
+    transaction.on_commit(
+        lambda: cache.delete_many([USER_TENANT_CLAIMS_KEY.format(user_id=pk) for pk in user_ids]),
+        using=using,
+    )
+
+
+def tenant_policy_version(credit_union_id):
+    """
+    Current policy_version of a credit union, cached for TENANT_POLICY_VERSION_CACHE_SECONDS
+    (None when the union no longer exists).
+    """
+    key = TENANT_POLICY_VERSION_KEY.format(credit_union_id=credit_union_id)
+    version = cache.get(key)
+    if version is None:
+        from .models import CreditUnion
+        version = CreditUnion.objects.filter(pk=credit_union_id).values_list('policy_version', flat=True).first()
+        if version is None:
+            return None
+        cache.set(key, version, timeout=getattr(settings, 'TENANT_POLICY_VERSION_CACHE_SECONDS', DEFAULT_TENANT_POLICY_VERSION_CACHE_SECONDS))
+    return version
+
+
+def bump_tenant_policy_version(*credit_union_ids):
+    """
+    Makes every token issued for these credit unions stale: requests carrying them
+    are refused until the client refreshes and gets claims read from the database.
+    """
+    from .models import CreditUnion
+    credit_union_ids = {pk for pk in credit_union_ids if pk is not None}
+    if not credit_union_ids:
+        return
+    using = router.db_for_write(CreditUnion)
+    CreditUnion.objects.using(using).filter(pk__in=credit_union_ids).update(policy_version=F('policy_version') + 1)
+    transaction.on_commit(
+        lambda: cache.delete_many([TENANT_POLICY_VERSION_KEY.format(credit_union_id=pk) for pk in credit_union_ids]),
+        using=using,
+    )
+
+
+def tenant_scope(credit_union_id, user_id=None):
+    """
+    Response-cache scope (loan_appraiser_project/response_cache.py) of rows belonging
+    to a credit union, or to a user without one.
+    """
+    if credit_union_id is not None:
+        return f'tenant:{credit_union_id}'
+    if user_id is not None:
+        return f'user:{user_id}'
+    return None
+
+
+def tenant_scope_for_user(user):
+    """
+    Response-cache scope of what TenantQuerySet.for_user(user) returns.
+    """
+    if user.is_superuser:
+        return 'all'
+    return tenant_scope(tenant_id_for_user(user), user.pk)
+
+
+class TenantQuerySet(models.QuerySet):
+    # Field names on the scoped model
+    tenant_field = 'credit_union'
+    owner_field = 'user'
+
+    def for_tenant(self, credit_union):
+        credit_union_id = getattr(credit_union, 'pk', credit_union)
+        return self.filter(**{f'{self.tenant_field}_id': credit_union_id})
+
+    def for_user(self, user):
+        if user is None or not user.is_authenticated:
+            return self.none()
+        if user.is_superuser:
+            return self
+        tenant_id = tenant_id_for_user(user)
+        if tenant_id is None:
+            return self.filter(**{self.owner_field: user})
+        return self.for_tenant(tenant_id)
+
+
+TenantManager = models.Manager.from_queryset(TenantQuerySet)
+
+
+class TenantScopedMixin:
+    """
+    For APIViews working on tenant data. After DRF authentication it stores the
+    user's credit union on the view (self.tenant_id) and on the request context,
+    so the optional per-tenant database routing (settings.TENANT_DATABASES) applies.
+    """
+    tenant_id = None
+
+    def dispatch(self, request, *args, **kwargs):
+        token = set_current_tenant(None)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except BaseException:
+            reset_current_tenant(token)
+            raise
+        if inspect.isawaitable(response):
+            # Async views (calculator/async_views.py): reset once the coroutine has run
+            return self._reset_tenant_after(response, token)
+        reset_current_tenant(token)
+        return response
+
+    async def _reset_tenant_after(self, response, token):
+        try:
+            return await response
+        finally:
+            reset_current_tenant(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.tenant_id = tenant_id_for_user(request.user)
+        set_current_tenant(self.tenant_id)
@@ -1,3 +1,99 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import CreditUnion, UserProfile
+from .tenancy import (
+    bump_tenant_policy_version,
+    tenant_claims_for_user,
+    tenant_id_for_user,
+    tenant_policy_version,
+    tenant_scope_for_user,
+)
+
+
+class TenancyTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.credit_union = CreditUnion.objects.create(name='First Union')
+        self.other_credit_union = CreditUnion.objects.create(name='Second Union')
+        self.member = self.create_user('member', self.credit_union)
+        self.colleague = self.create_user('colleague', self.credit_union)
+        self.outsider = self.create_user('outsider', self.other_credit_union)
+        self.loner = self.create_user('loner')
+
+    def create_user(self, username, credit_union=None, **extra):
+        user = User.objects.create_user(username, f'{username}@example.com', 'S3cure-pass', **extra)
+        if credit_union is not None:
+            UserProfile.objects.create(user=user, credit_union=credit_union)
+        return user
+
+
+class TenantManagerTests(TenancyTestCase):
+
+    def profile_users(self, queryset):
+        return set(queryset.values_list('user__username', flat=True))
+
+    def test_for_user(self):
+        self.assertEqual(self.profile_users(UserProfile.objects.for_user(self.member)), {'member', 'colleague'})
+        self.assertEqual(self.profile_users(UserProfile.objects.for_user(self.outsider)), {'outsider'})
+        self.assertFalse(UserProfile.objects.for_user(self.loner).exists())
+
+    def test_superuser_and_anonymous(self):
+        root = self.create_user('root', is_superuser=True)
+        self.assertEqual(UserProfile.objects.for_user(root).count(), 3)
+        self.assertFalse(UserProfile.objects.for_user(None).exists())
+
+    def test_for_tenant_takes_an_instance_or_id(self):
+        for credit_union in (self.other_credit_union, self.other_credit_union.pk):
+            self.assertEqual(self.profile_users(UserProfile.objects.for_tenant(credit_union)), {'outsider'})
+
+    def test_tenant_id_is_read_once_per_user_object(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(tenant_id_for_user(self.member), self.credit_union.pk)
+            self.assertEqual(tenant_id_for_user(self.member), self.credit_union.pk)
+        self.assertIsNone(tenant_id_for_user(self.loner))
+        self.assertEqual(tenant_scope_for_user(self.loner), f'user:{self.loner.pk}')
+
+
+class CreditUnionViewTests(TenancyTestCase):
+
+    def test_relations_are_scoped_to_the_tenant(self):
+        client = APIClient()
+        client.force_authenticate(self.outsider)
+        response = client.get('/api/credit-unions/view/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['user'] for row in response.data], [self.outsider.pk])
+        self.assertEqual(APIClient().get('/api/credit-unions/view/').status_code, 401)
+
+    def test_add_and_list(self):
+        client = APIClient()
+        response = client.post('/api/credit-unions/add/', {'name': 'Third Union', 'contact_email': 'info@third.example'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(client.post('/api/credit-unions/add/', {}, format='json').status_code, 400)
+        response = client.get('/api/credit-unions/add/')
+        self.assertEqual([row['name'] for row in response.data], ['First Union', 'Second Union', 'Third Union'])
+
+
+class TenantClaimsTests(TenancyTestCase):
+
+    def test_claims(self):
+        self.assertEqual(tenant_claims_for_user(self.member), {
+            'credit_union_id': self.credit_union.pk,
+            'tenant_version': self.credit_union.policy_version,
+            'profile_version': 1,
+        })
+        self.assertEqual(tenant_claims_for_user(self.loner), {
+            'credit_union_id': None, 'tenant_version': None, 'profile_version': 1,
+        })
+
+    def test_bump_policy_version(self):
+        before = tenant_policy_version(self.credit_union.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_tenant_policy_version(self.credit_union.pk, None)
+        self.assertEqual(tenant_policy_version(self.credit_union.pk), before + 1)
+        self.other_credit_union.refresh_from_db()
+        self.assertEqual(tenant_policy_version(self.other_credit_union.pk), self.other_credit_union.policy_version)
+        self.assertIsNone(tenant_policy_version(0))
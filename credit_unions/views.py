@@ -6,7 +6,11 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from .models import CreditUnion, UserProfile
 from .serializers import CreditUnionSerializer,UserCreditSerializer
 from django.http import Http404
-class CreditUnionAPIView(APIView):
+from loan_appraiser_project.db_routing import ReplicaReadMixin
+from loan_appraiser_project.conditional import ConditionalGetMixin
+from loan_appraiser_project.response_cache import ResponseCacheMixin
+from .tenancy import tenant_scope_for_user
+class CreditUnionAPIView(ConditionalGetMixin, ResponseCacheMixin, APIView):
     def get_permissions(self):
 
         if self.request.method == 'POST':
@@ -14,9 +18,12 @@ class CreditUnionAPIView(APIView):
         return [AllowAny()]
 
     def get(self, request, format=None):
+        # 304 when no credit union was added, changed or removed since the client's copy
+        not_modified = self.not_modified(request, CreditUnion.objects.all(), scope='credit-unions')
+        if not_modified is not None:
+            return not_modified
         credit = CreditUnion.objects.all()
-        serializer = CreditUnionSerializer(credit, many=True)
-        return Response(serializer.data)
+        return self.cached_response(request, 'credit-unions', lambda: CreditUnionSerializer(credit, many=True).data)
 
     def post(self, request, format=None):
         serializer = CreditUnionSerializer(data=request.data, context={'request': request})
@@ -25,9 +32,16 @@ class CreditUnionAPIView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class CreditAPIView(APIView):
-    permission_classes = (AllowAny,)
+class CreditAPIView(ConditionalGetMixin, ResponseCacheMixin, ReplicaReadMixin, APIView):
+    # Lists the user <-> credit union links of the caller's own credit union only
+    permission_classes = (IsAuthenticated,)
     def get(self, request, format=None):
-        relationuc = UserProfile.objects.all()
-        serializer = UserCreditSerializer(relationuc, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        relationuc = UserProfile.objects.for_user(request.user)
+        not_modified = self.not_modified(request, relationuc, scope=f'credit-relations:{request.user.pk}')
+        if not_modified is not None:
+            return not_modified
+        return self.cached_response(
+            request,
+            tenant_scope_for_user(request.user),
+            lambda: UserCreditSerializer(relationuc, many=True).data,
+        )
\ No newline at end of file
@@ -0,0 +1,63 @@
+# loan_appraiser_project/conditional.py
+"""
+Conditional GET (ETag / Last-Modified) for list endpoints the frontend polls.
+
+The validators come from one aggregate query over the list's scope:
+COUNT(*) and MAX(updated_at), answered from a (credit_union, updated_at) index.
+Any save moves updated_at (auto_now) and any delete lowers the count, so the ETag
+changes whenever the list could have changed. When the client's copy is current
+the view returns 304 before running the list query or the serializer.
+
+Code that changes rows with QuerySet.update() must set updated_at itself.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def list_validators(queryset, scope=''):
+    """
+    Returns (etag, last_modified) for the rows of `queryset`. `scope` (e.g. the tenant)
+    keeps two scopes with the same count and timestamp from sharing an ETag.
+    """
+    stats = queryset.order_by().aggregate(count=Count('pk'), last_modified=Max('updated_at'))
+    last_modified = stats['last_modified']
+    version = f"{scope}:{stats['count']}:{last_modified.isoformat() if last_modified else ''}"
+    return f'"{hashlib.sha256(version.encode()).hexdigest()[:32]}"', last_modified
+
+
+class ConditionalGetMixin:
+    """
+    For APIViews serving polled lists. get() starts with
+
+        not_modified = self.not_modified(request, <validator queryset>, scope=...)
+        if not_modified is not None:
+            return not_modified
+
+    and the ETag / Last-Modified headers are added to the full response as well.
+    Clients are asked to revalidate on every use (Cache-Control: private, no-cache).
+    """
+    conditional_etag = None
+    conditional_last_modified = None
+
+    def not_modified(self, request, queryset, scope=''):
+        self.conditional_etag, last_modified = list_validators(queryset, scope)
+        # HTTP dates have one-second resolution; the ETag catches changes within the same second
+        self.conditional_last_modified = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(
+            request,
+            etag=self.conditional_etag,
+            last_modified=self.conditional_last_modified,
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.conditional_etag is not None and response.status_code in (200, 304):
+            response['ETag'] = self.conditional_etag
+            if self.conditional_last_modified is not None:
+                response['Last-Modified'] = http_date(self.conditional_last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,226 @@
+# loan_appraiser_project/db_routing.py
+"""
+Read-replica and per-tenant routing.
+
+Reporting and list views opt in with ReplicaReadMixin (APIViews), @replica_reads
+(function views) or ReplicaReadAdminMixin (admin changelists); every other query
+keeps using 'default'. A user who just wrote something (any successful POST, PUT,
+PATCH or DELETE, recorded by ReplicaStickyMiddleware) reads from 'default' for
+REPLICA_STICKY_SECONDS, so they always see their own submission even while the
+replica lags behind.
+
+Without a 'replica' entry in settings.DATABASES all of this is a no-op.
+
+Optionally, settings.TENANT_DATABASES ({credit_union_id: alias}) moves the loan
+data (TENANT_ROUTED_APPS) of large credit unions to their own database. The
+tenant is taken from credit_unions.tenancy.TenantScopedMixin. Users and credit
+unions stay on 'default', so a tenant database needs copies of the auth_user and
+credit union rows its loans reference (SQLite and Postgres enforce foreign keys).
+"""
+
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Defaults, overridable in settings.py
+DEFAULT_REPLICA_DATABASE_ALIAS = 'replica'
+DEFAULT_REPLICA_STICKY_SECONDS = 5
+
+# True while the current request (or job) may read from the replica
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+# Credit union id of the current request (or job), for per-tenant routing
+_current_tenant = contextvars.ContextVar('current_tenant', default=None)
+
+# Apps whose models follow the tenant to its own database
+DEFAULT_TENANT_ROUTED_APPS = ('calculator',)
+
+
+def replica_alias():
+    """
+    The replica database alias, or None when no replica is configured.
+    """
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', DEFAULT_REPLICA_DATABASE_ALIAS)
+    return alias if alias in settings.DATABASES else None
+
+
+def _sticky_key(user):
+    return f'replica-sticky:{user.pk}'
+
+
+def mark_recent_write(user):
+    """
+    Pins the user's reads to the primary database for REPLICA_STICKY_SECONDS.
+    Stored in the cache framework, so it is shared by all workers when the cache is.
+    """
+    if user is not None and user.is_authenticated:
+        timeout = getattr(settings, 'REPLICA_STICKY_SECONDS', DEFAULT_REPLICA_STICKY_SECONDS)
+        cache.set(_sticky_key(user), True, timeout=timeout)
+
+
+def recently_wrote(user):
+    return user is not None and user.is_authenticated and cache.get(_sticky_key(user), False)
+
+
+def _may_use_replica(request):
+    return (
+        replica_alias() is not None
+        and request.method in SAFE_METHODS
+        and not recently_wrote(getattr(request, 'user', None))
+    )
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    """
+    Sends reads made inside the block to the replica (when one is configured).
+    Usable directly by export jobs and management commands.
+    """
+    token = _replica_reads.set(enabled and replica_alias() is not None)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def set_current_tenant(tenant_id):
+    return _current_tenant.set(tenant_id)
+
+
+def reset_current_tenant(token):
+    _current_tenant.reset(token)
+
+
+@contextmanager
+def tenant_context(tenant_id):
+    """
+    Routes tenant data used inside the block to the tenant's database, if it has one.
+    """
+    token = _current_tenant.set(tenant_id)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+def tenant_alias(tenant_id):
+    """
+    The database alias holding a tenant's loan data, or None for 'default'.
+    """
+    if tenant_id is None:
+        return None
+    return getattr(settings, 'TENANT_DATABASES', {}).get(tenant_id)
+
+
+class TenantRouter:
+    """
+    Sends reads and writes of TENANT_ROUTED_APPS models to the current tenant's
+    database when settings.TENANT_DATABASES lists one. Listed before ReplicaRouter.
+    """
+
+    def _alias(self, model):
+        routed_apps = getattr(settings, 'TENANT_ROUTED_APPS', DEFAULT_TENANT_ROUTED_APPS)
+        if model._meta.app_label not in routed_apps:
+            return None
+        return tenant_alias(_current_tenant.get())
+
+    def db_for_read(self, model, **hints):
+        return self._alias(model)
+
+    def db_for_write(self, model, **hints):
+        return self._alias(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Loans on a tenant database still point at users and credit unions on 'default'
+        tenant_databases = set(getattr(settings, 'TENANT_DATABASES', {}).values())
+        if obj1._state.db in tenant_databases or obj2._state.db in tenant_databases:
+            return True
+        return None
+
+
+class ReplicaRouter:
+    """
+    Routes reads to the replica only inside read_from_replica(); writes, and reads
+    inside a transaction on the primary, always go to 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    For read-only APIViews. The decision is taken after DRF authentication, so the
+    JWT user is known when checking the sticky window.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _replica_reads.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        _replica_reads.set(_may_use_replica(request))
+
+
+def replica_reads(view_func):
+    """
+    Decorator for read-only function views (place it below @login_required).
+    """
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        with read_from_replica(_may_use_replica(request)):
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadAdminMixin:
+    """
+    Serves ModelAdmin changelists (GET only) from the replica.
+    """
+
+    def changelist_view(self, request, extra_context=None):
+        with read_from_replica(_may_use_replica(request)):
+            response = super().changelist_view(request, extra_context)
+            # The result list is only evaluated while the TemplateResponse renders
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
+
+class ReplicaStickyMiddleware:
+    """
+    Records users who made a successful write, so their next reads hit the primary.
+    Runs after the view, when DRF has already set request.user from the JWT.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if replica_alias() is not None and request.method not in SAFE_METHODS and response.status_code < 400:
+            mark_recent_write(getattr(request, 'user', None))
+        return response
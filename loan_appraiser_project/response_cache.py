@@ -0,0 +1,123 @@
+# loan_appraiser_project/response_cache.py
+"""
+Versioned response cache for read endpoints.
+
+Cached payloads are keyed by view, scope (a tenant, a user or a shared list),
+the scope's current version and the query parameters. Writes never delete cache
+entries: save/delete signals (calculator/signals.py, credit_unions/signals.py)
+call invalidate(), which moves the version of every scope the row belongs to,
+so the old entries are simply never read again and age out.
+
+Scopes used by the apps:
+    'all'                  every loan/profile (superusers' lists)
+    'tenant:<id>'          one credit union's loans and profiles
+    'user:<id>'            one user's own loans/profile
+    'credit-unions'        the credit union list
+
+Versions are set after the transaction commits, and a request reads the version
+before it computes the payload, so a payload is never stored under a version
+newer than the data it was built from.
+
+Works with any cache backend. With the default local-memory cache the entries
+are per process, so with several workers either point RESPONSE_CACHE_ALIAS at a
+shared cache (FileBasedCache needs no extra service) or rely on
+RESPONSE_CACHE_SECONDS to bound how long another worker may serve an old payload.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.response import Response
+
+# Defaults, overridable in settings.py
+DEFAULT_RESPONSE_CACHE_ALIAS = 'default'
+DEFAULT_RESPONSE_CACHE_SECONDS = 60
+
+VERSION_KEY = 'response-cache-version:{scope}'
+
+
+def _cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', DEFAULT_RESPONSE_CACHE_ALIAS)]
+
+
+def scope_version(scope):
+    """
+    Current version of a scope. Versions are nanosecond timestamps rather than
+    counters, so a version key evicted from the cache never comes back with a value
+    that old entries were stored under.
+    """
+    cache = _cache()
+    key = VERSION_KEY.format(scope=scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(scopes):
+    cache = _cache()
+    version = time.time_ns()
+    cache.set_many({VERSION_KEY.format(scope=scope): version for scope in scopes}, timeout=None)
+
+
+def invalidate(*scopes, using=DEFAULT_DB_ALIAS):
+    """
+    Moves the version of `scopes` once the current transaction on `using` commits
+    (immediately outside a transaction).
+    """
+    scopes = {scope for scope in scopes if scope}
+    if scopes:
+        transaction.on_commit(lambda: _bump(scopes), using=using)
+
+
+def cached_value(name, scope, compute, params=None):
+    """
+    Returns compute(), from the cache while `scope` keeps its version.
+    `params` (e.g. the query parameters) become part of the key.
+    """
+    version = scope_version(scope)
+    params_digest = ''
+    if params:
+        canonical = '&'.join(f'{key}={value}' for key, value in sorted(params))
+        params_digest = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+    key = f'response-cache:{name}:{scope}:{version}:{params_digest}'
+
+    cache = _cache()
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=getattr(settings, 'RESPONSE_CACHE_SECONDS', DEFAULT_RESPONSE_CACHE_SECONDS))
+    return value
+
+
+class ResponseCacheMixin:
+    """
+    For read-only APIViews: get() returns
+
+        self.cached_response(request, scope, lambda: Serializer(queryset, many=True).data)
+
+    so the queryset and serializer only run when the scope changed since the last
+    request with the same query parameters.
+    """
+
+    def cached_response(self, request, scope, compute):
+        data = cached_value(
+            type(self).__name__,
+            scope,
+            # Plain lists/dicts pickle smaller than DRF's ReturnList/ReturnDict
+            lambda: _plain(compute()),
+            params=list(request.query_params.lists()),
+        )
+        return Response(data)
+
+
+def _plain(data):
+    if isinstance(data, list):
+        return list(data)
+    if isinstance(data, dict):
+        return dict(data)
+    return data
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'credit_unions',
     'corsheaders',
     'django.contrib.humanize',
+    'django_filters',
 ]
 
 MIDDLEWARE = [
@@ -44,6 +45,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'loan_appraiser_project.db_routing.ReplicaStickyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,6 +85,26 @@ DATABASES = {
     }
 }
 
+# Optional read replica for reporting and list views (see loan_appraiser_project/db_routing.py).
+# Locally, point DATABASE_REPLICA_NAME at a copy of db.sqlite3 (or a Postgres database
+# with DATABASE_REPLICA_ENGINE) to exercise the routing.
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': os.environ.get('DATABASE_REPLICA_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': os.environ['DATABASE_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = [
+    'loan_appraiser_project.db_routing.TenantRouter',
+    'loan_appraiser_project.db_routing.ReplicaRouter',
+]
+REPLICA_DATABASE_ALIAS = 'replica'
+# Seconds a user keeps reading from 'default' after a write (read-your-writes)
+REPLICA_STICKY_SECONDS = 5
+# Optional per-tenant databases for loan data: {credit_union_id: 'database alias'}
+TENANT_DATABASES = {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -155,11 +177,17 @@ CORS_ALLOW_CREDENTIALS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication with an in-process user cache (Authentication/authentication.py)
+        'Authentication.authentication.CachedJWTAuthentication',
     ),
     "DEFAULT_PERMISSION_CLASSES":[
         'rest_framework.permissions.IsAuthenticated'
-    ]
+    ],
+    # Only views with a throttle_scope are limited (loan_appraiser_project/throttling.py)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'loan_appraiser_project.throttling.UserBucketThrottle',
+        'loan_appraiser_project.throttling.TenantBucketThrottle',
+    ],
 }
 
 # Simple JWT configuration
@@ -186,4 +214,64 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    # Re-reads the credit_union_id / tenant_version claims on refresh (Authentication/serializers.py)
+    'TOKEN_REFRESH_SERIALIZER': 'Authentication.serializers.TenantTokenRefreshSerializer',
 }
+
+# Archival of decided loan applications (python manage.py archive_decided_loans)
+LOAN_ARCHIVE_AFTER_DAYS = 365
+LOAN_ARCHIVE_BATCH_SIZE = 500
+
+# Soft-deleted loan applications are hard-deleted by a background thread started after
+# each soft delete; set LOAN_PURGE_IN_BACKGROUND = False to run
+# `python manage.py purge_deleted_loans` from a scheduler instead.
+LOAN_PURGE_IN_BACKGROUND = True
+LOAN_PURGE_BATCH_SIZE = 500
+
+# Maximum number of applications in one POST to api/calculator/submit/batch/
+BATCH_SUBMIT_MAX_ITEMS = 500
+# Applications one decisions/ request may approve or decline
+BULK_DECISION_MAX_IDS = 1000
+# Users one api/auth/users/activation/ request may activate or deactivate
+USER_ACTIVATION_MAX_IDS = 1000
+# Bulk user provisioning (Authentication/provisioning.py): CSV rows per api/auth/users/provision/
+# request, users per INSERT, and processes hashing passwords (None: one per CPU)
+PROVISION_MAX_ROWS = 500
+PROVISION_BATCH_SIZE = 500
+PASSWORD_HASH_PROCESSES = None
+
+# Seconds a dry-run quote (api/calculator/quote/<loan_type>/) is cached
+QUOTE_CACHE_SECONDS = 300
+
+# Seconds an Idempotency-Key on submit/* is remembered (python manage.py purge_idempotency_keys removes expired keys)
+IDEMPOTENCY_KEY_TTL_SECONDS = 24 * 60 * 60
+
+# Threads running appraisals for the async views (calculator/async_views.py)
+APPRAISAL_EXECUTOR_WORKERS = 4
+
+# Versioned response cache of the read APIs (loan_appraiser_project/response_cache.py).
+# With several workers, point the alias at a shared cache, e.g. FileBasedCache.
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_SECONDS = 60
+
+# Token-bucket budgets per throttle_scope, per user and per credit union ('N/s|min|hour|day')
+THROTTLE_BUDGETS = {
+    'submit': {'user': '30/min', 'tenant': '300/min'},
+    'quote': {'user': '120/min', 'tenant': '1200/min'},
+    'export': {'user': '10/min', 'tenant': '60/min'},
+}
+# None keeps the buckets in each worker's memory; a cache alias (database or file cache) shares them
+THROTTLE_CACHE_ALIAS = None
+
+# Review-queue event stream (api/calculator/async/events/, ASGI): seconds between database
+# polls per credit union, and between keepalive comments on an idle stream
+LIVE_EVENTS_POLL_SECONDS = 2
+LIVE_EVENTS_KEEPALIVE_SECONDS = 15
+
+# Seconds an authenticated user is kept in each worker's JWT user cache (0 disables it);
+# saves and deletes drop the entry at once in the worker that made them
+AUTH_USER_CACHE_SECONDS = 60
+
+# Seconds a credit union's policy_version is cached when checking the tenant_version claim
+# of tokens; bumping the version makes the union's tokens stale after at most this long
+TENANT_POLICY_VERSION_CACHE_SECONDS = 60
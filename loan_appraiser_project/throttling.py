@@ -0,0 +1,222 @@
+# loan_appraiser_project/throttling.py
+"""
+Token-bucket throttling with separate budgets per scope ('submit', 'quote',
+'export'), each enforced per user and per credit union.
+
+A view opts in with `throttle_scope = 'submit'`; UserBucketThrottle and
+TenantBucketThrottle are the default DRF throttle classes and ignore views
+without a scope. Budgets come from settings.THROTTLE_BUDGETS:
+
+    THROTTLE_BUDGETS = {'submit': {'user': '30/min', 'tenant': '300/min'}, ...}
+
+'30/min' is a bucket of 30 tokens refilled at 30 per minute: bursts of up to
+30 requests pass at once, sustained traffic is held to the rate. A refused
+request gets 429 with Retry-After (seconds until the next token).
+
+Buckets live in process memory (one dict and one lock; nothing to install).
+Setting THROTTLE_CACHE_ALIAS to a cache shared by the workers (database or
+file cache) makes the budgets global instead; reads and writes of a bucket are
+then not atomic, so simultaneous requests in different workers may overshoot a
+budget by a few requests.
+"""
+
+import functools
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from rest_framework.throttling import BaseThrottle
+
+from credit_unions.tenancy import tenant_id_for_user
+
+# Defaults, overridable in settings.py
+DEFAULT_THROTTLE_BUDGETS = {
+    'submit': {'user': '30/min', 'tenant': '300/min'},
+    'quote': {'user': '120/min', 'tenant': '1200/min'},
+    'export': {'user': '10/min', 'tenant': '60/min'},
+}
+# Buckets kept in memory per process; the least recently used ones are dropped
+MAX_LOCAL_BUCKETS = 10000
+
+PERIODS = {'s': 1, 'sec': 1, 'second': 1, 'm': 60, 'min': 60, 'minute': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate):
+    """
+    '30/min' -> (capacity 30, refill 0.5 tokens per second).
+    """
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period]
+
+
+class TokenBucketStore:
+    """
+    Buckets as key -> (tokens, last refill time). In memory by default; in the
+    cache `alias` when given.
+    """
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        """
+        Takes `cost` tokens if available. Returns 0 when allowed, otherwise the
+        seconds until enough tokens will have accumulated.
+        """
+        cost = min(cost, capacity)
+        now = time.monotonic() if self.alias is None else time.time()
+        if self.alias is None:
+            with self._lock:
+                state = self._buckets.pop(key, None)
+                tokens, wait = self._take(state, now, capacity, refill_rate, cost)
+                self._buckets[key] = (tokens, now)
+                if len(self._buckets) > MAX_LOCAL_BUCKETS:
+                    self._buckets.popitem(last=False)
+            return wait
+
+        cache = caches[self.alias]
+        tokens, wait = self._take(cache.get(key), now, capacity, refill_rate, cost)
+        # A full bucket is the same as no bucket, so the entry may expire then
+        cache.set(key, (tokens, now), timeout=int(capacity / refill_rate) + 1)
+        return wait
+
+    @staticmethod
+    def _take(state, now, capacity, refill_rate, cost):
+        if state is None:
+            tokens = capacity
+        else:
+            tokens, last = state
+            tokens = min(capacity, tokens + (now - last) * refill_rate)
+        if tokens >= cost:
+            return tokens - cost, 0
+        return tokens, (cost - tokens) / refill_rate
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def bucket_store():
+    alias = getattr(settings, 'THROTTLE_CACHE_ALIAS', None)
+    with _stores_lock:
+        if alias not in _stores:
+            _stores[alias] = TokenBucketStore(alias)
+        return _stores[alias]
+
+
+def budget(scope, level):
+    """
+    The rate string for (scope, level), or None when that budget is not limited.
+    """
+    budgets = getattr(settings, 'THROTTLE_BUDGETS', DEFAULT_THROTTLE_BUDGETS)
+    return budgets.get(scope, {}).get(level)
+
+
+def request_tenant_id(request):
+    """
+    The caller's credit union: from a 'credit_union_id' token claim when the JWT has
+    one (no database access), else from the user's profile.
+    """
+    claims = getattr(request, 'auth', None)
+    if claims is not None and hasattr(claims, 'get') and claims.get('credit_union_id') is not None:
+        return claims.get('credit_union_id')
+    user = getattr(request, 'user', None)
+    # TokenUser (stateless JWT auth) has no profile to look up
+    if user is None or not hasattr(user, '_meta'):
+        return None
+    return tenant_id_for_user(user)
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    Base class: subclasses set `level` and implement get_ident_for().
+    """
+    level = None
+
+    def get_ident_for(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = getattr(view, 'throttle_scope', None)
+        rate = budget(scope, self.level) if scope else None
+        if rate is None:
+            return True
+        ident = self.get_ident_for(request)
+        if ident is None:
+            return True
+        # Once one budget refused the request, the others keep their tokens
+        if getattr(request, '_bucket_throttled', False):
+            return True
+
+        capacity, refill_rate = parse_rate(rate)
+        cost = view.get_throttle_cost(request) if hasattr(view, 'get_throttle_cost') else 1
+        wait = bucket_store().consume(f'throttle:{scope}:{self.level}:{ident}', capacity, refill_rate, cost)
+        if wait:
+            self.wait_seconds = wait
+            request._bucket_throttled = True
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserBucketThrottle(BucketThrottle):
+    """
+    Budget per user (per client IP for anonymous requests).
+    """
+    level = 'user'
+
+    def get_ident_for(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return self.get_ident(request)
+
+
+class TenantBucketThrottle(BucketThrottle):
+    """
+    Budget shared by all users of a credit union. Users without one only have the user budget.
+    """
+    level = 'tenant'
+
+    def get_ident_for(self, request):
+        return request_tenant_id(request)
+
+
+def throttle_scope(scope):
+    """
+    Applies the same budgets to a plain Django view (e.g. the PDF export); place it
+    below @login_required. Answers 429 with Retry-After when a budget is spent.
+    """
+    throttles = (UserBucketThrottle, TenantBucketThrottle)
+
+    def decorator(view_func):
+        view_stub = type('ThrottledView', (), {'throttle_scope': scope})()
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            waits = []
+            for throttle_class in throttles:
+                throttle = throttle_class()
+                if not throttle.allow_request(request, view_stub):
+                    waits.append(throttle.wait())
+            if waits:
+                retry_after = math.ceil(max(waits))
+                response = JsonResponse(
+                    {'detail': f'Request was throttled. Expected available in {retry_after} seconds.'},
+                    status=429
+                )
+                response['Retry-After'] = str(retry_after)
+                return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator